@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Load Test - Нагрузочное тестирование REST API чата
+Реализация - sectest.load_test (main), скрипт оставлен для командной строки
+"""
+
+from sectest.load_test import main
+
+if __name__ == "__main__":
+    main()
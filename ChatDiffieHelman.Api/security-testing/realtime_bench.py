@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Realtime Bench - Нагрузочный тест WebSocket шлюзов API (ChatGateway и /diffie-hellman)
+Реализация - sectest.realtime_bench (main), скрипт оставлен для командной строки
+"""
+
+from sectest.realtime_bench import main
+
+if __name__ == "__main__":
+    main()
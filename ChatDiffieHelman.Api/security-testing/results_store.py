@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Results Store - CLI просмотра хранилища результатов SQLMap (SQLite)
+Реализация - sectest.results_store (main), скрипт оставлен для командной строки
+"""
+
+from sectest.results_store import main
+
+if __name__ == "__main__":
+    main()
@@ -79,7 +79,10 @@ if [ $? -eq 0 ]; then
     echo -e "Логи доступны в файле: ${YELLOW}sqlmap_automation.log${NC}"
     
     # Подсчет результатов
-    if [ -d "sqlmap_results" ]; then
+    if [ -f "sqlmap_results/results.sqlite3" ]; then
+        total_tests=$(python3 results_store.py sqlmap_results/results.sqlite3 jobs latest | wc -l)
+        echo -e "\nВсего проведено тестов: ${YELLOW}$total_tests${NC}"
+    elif [ -d "sqlmap_results" ]; then
         total_tests=$(find sqlmap_results -name "request_info.json" | wc -l)
         echo -e "\nВсего проведено тестов: ${YELLOW}$total_tests${NC}"
     fi
@@ -0,0 +1,41 @@
+"""
+sectest - Библиотека тестирования безопасности Chat Diffie-Hellman API
+Импорт пакета не читает config.env, не настраивает логирование и не создает
+файлы; модули загружаются при первом обращении к их именам:
+
+    from sectest import Scanner, Reporter, load_config
+
+    config = load_config(SQLMAP_JOBS=4, WS_FUZZ=1)
+    report = Scanner.from_config(config).run()
+    Reporter().write(report, 'report.html')
+
+Скрипты в security-testing/ (sqlmap_automation.py, generate_report.py, ...) -
+тонкие обертки над main() модулей пакета.
+"""
+
+import importlib
+
+# Имя -> модуль пакета, из которого оно загружается при первом обращении
+_EXPORTS = {
+    'Scanner': 'scanner',
+    'Reporter': 'reporter',
+    'load_config': 'config',
+    'ConfigError': 'config',
+    'DEFAULTS': 'config',
+    'ResultsStore': 'results_store',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Async HTTP - Минимальный asyncio HTTP/1.1 клиент с пулом keep-alive соединений
+Без внешних зависимостей (aiohttp не требуется), для массовых коротких запросов к API
+"""
+
+import asyncio
+import json
+import ssl
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Коды ответов без тела
+NO_BODY_STATUSES = (204, 304)
+
+
+class HTTPError(Exception):
+    """Некорректный ответ сервера или разрыв соединения"""
+
+
+class Response:
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], body: bytes, elapsed: float):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Пул keep-alive соединений: не более limit_per_host одновременных запросов к хосту
+
+    Соединение после ответа возвращается в пул и используется следующим
+    запросом к тому же хосту - без нового TCP (и TLS) рукопожатия.
+    """
+
+    def __init__(self, limit_per_host: int = 8, timeout: float = 10.0, headers: Optional[Dict[str, str]] = None):
+        self.limit_per_host = max(1, limit_per_host)
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.requests = 0
+        self.connections_opened = 0
+        self._idle: Dict[Tuple[str, str, int], List[_Connection]] = {}
+        self._semaphores: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._ssl = ssl.create_default_context()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+    async def _open(self, key: Tuple[str, str, int]) -> _Connection:
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self._ssl if scheme == 'https' else None
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      body: Optional[bytes] = None) -> Response:
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == 'https' else 80))
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        semaphore = self._semaphores.setdefault(key, asyncio.Semaphore(self.limit_per_host))
+        async with semaphore:
+            idle = self._idle.setdefault(key, [])
+            # Сервер мог закрыть простаивающее соединение: одна повторная попытка на новом
+            for attempt in range(2):
+                reused = bool(idle) and attempt == 0
+                connection = idle.pop() if reused else await self._open(key)
+                try:
+                    response, keep_alive = await asyncio.wait_for(
+                        self._exchange(connection, method, parts.netloc, target, headers, body), self.timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError, HTTPError) as e:
+                    connection.close()
+                    if reused:
+                        continue
+                    raise HTTPError(f"{method} {url}: {e}") from e
+                except BaseException:
+                    connection.close()
+                    raise
+                self.requests += 1
+                if keep_alive:
+                    idle.append(connection)
+                else:
+                    connection.close()
+                return response
+        raise HTTPError(f"{method} {url}: соединение закрыто сервером")
+
+    async def _exchange(self, connection: _Connection, method: str, host: str, target: str,
+                        headers: Optional[Dict[str, str]], body: Optional[bytes]) -> Tuple[Response, bool]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        request_headers = {'Host': host, 'Connection': 'keep-alive', 'Accept': '*/*'}
+        request_headers.update(self.headers)
+        request_headers.update(headers or {})
+        if body is not None or method in ('POST', 'PUT', 'PATCH'):
+            request_headers['Content-Length'] = str(len(body or b''))
+        head = f"{method} {target} HTTP/1.1\r\n"
+        head += ''.join(f"{name}: {value}\r\n" for name, value in request_headers.items())
+        connection.writer.write(head.encode('latin-1') + b"\r\n" + (body or b''))
+        await connection.writer.drain()
+
+        reader = connection.reader
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("пустой ответ")
+        try:
+            version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+            status = int(status)
+        except ValueError:
+            raise HTTPError(f"некорректная строка статуса: {status_line!r}")
+
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        connection_header = response_headers.get('connection', '').lower()
+        keep_alive = connection_header != 'close' and not (version == 'HTTP/1.0' and connection_header != 'keep-alive')
+
+        if method == 'HEAD' or status in NO_BODY_STATUSES or 100 <= status < 200:
+            data = b''
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            data = await self._read_chunked(reader)
+        elif 'content-length' in response_headers:
+            data = await reader.readexactly(int(response_headers['content-length']))
+        else:
+            # Длина не указана: тело до закрытия соединения
+            data = await reader.read()
+            keep_alive = False
+
+        return Response(status, reason, response_headers, data, loop.time() - started), keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                # Трейлеры до пустой строки
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Auth Flows - Сканирование многошаговых потоков входа (Fiat-Shamir, BMC)
+Шаги start/finish работают только с живой сессией от предыдущего шага:
+прокси подставляет вместо метки FLOW_SID готовые сессии из пула
+"""
+
+import http.client
+import json
+import logging
+import queue
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .fixtures import registration_body
+
+logger = logging.getLogger(__name__)
+
+# Метка в поле sid тела запроса, прокси заменяет ее живой сессией
+FLOW_SID = 'FLOW-SID-PLACEHOLDER'
+
+# Значение обязательства/ответа: сервис проверяет только формат hex
+FLOW_HEX = '1f'
+
+# Поток входа: сессия из /auth/login (поле login_field) у пользователя с
+# включенным протоколом, шаг start принимает обязательство, finish - ответ
+FLOWS = {
+    'fiat': {
+        'login_field': 'fiat_session_id',
+        'enable': '/auth/fiat/enable/{userId}',
+        'params': {'n': '3233', 'v': '4'},
+        'start': '/auth/fiat/start',
+        'commitment': 't',
+        'finish': '/auth/fiat/finish',
+        'response': 'r',
+    },
+    'bmc': {
+        'login_field': 'bmc_session_id',
+        'enable': '/auth/bmc/enable/{userId}',
+        'params': {'n': '3233', 'g': '2', 'y': '8'},
+        'start': '/auth/bmc/start',
+        'commitment': 'a',
+        'finish': '/auth/bmc/finish',
+        'response': 'e',
+    },
+}
+
+# Шаги, сессию для которых локально не получить
+UNSUPPORTED = {
+    '/auth/uniauth/exchange-token-3': 'token3 выдает внешний UniAuth bridge после входа в браузере',
+}
+
+
+class FlowError(Exception):
+    """API отклонил шаг подготовки сессии"""
+
+
+def flow_step(url: str) -> Optional[Tuple[str, str]]:
+    """(поток, шаг) эндпоинта или None: /auth/fiat/finish -> ('fiat', 'finish')"""
+    path = urlsplit(url).path
+    for name, flow in FLOWS.items():
+        for step in ('start', 'finish'):
+            if path.endswith(flow[step]):
+                return name, step
+    return None
+
+
+def flow_body(url: str, body: Optional[Dict]) -> Optional[Dict]:
+    """Тело шага потока: метка сессии и корректный hex вместо примеров из схемы"""
+    step = flow_step(url)
+    if step is None:
+        return body
+    flow = FLOWS[step[0]]
+    field = flow['commitment'] if step[1] == 'start' else flow['response']
+    return dict(body or {}, sid=FLOW_SID, **{field: FLOW_HEX})
+
+
+class FlowClient:
+    """Синхронный клиент API для подготовки сессий: соединение на поток переиспользуется"""
+
+    def __init__(self, base_url: str, headers: Dict[str, str], timeout: float = 10.0, limiter=None):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers = headers
+        self.timeout = timeout
+        self.limiter = limiter
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def call(self, method: str, path: str, body: Optional[Dict] = None, auth: bool = True) -> Dict:
+        headers = dict(self.headers) if auth else {}
+        headers['Content-Type'] = 'application/json'
+        data = json.dumps(body or {}).encode('utf-8')
+        if self.limiter is not None:
+            self.limiter.acquire()
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if attempt or not isinstance(e, (ConnectionResetError, BrokenPipeError)):
+                    raise FlowError(f"{method} {path}: {e or type(e).__name__}") from e
+        if response.status >= 400:
+            raise FlowError(f"{method} {path}: {response.status} {payload[:200].decode('utf-8', 'replace')}")
+        try:
+            return json.loads(payload.decode('utf-8')) if payload else {}
+        except ValueError as e:
+            raise FlowError(f"{method} {path}: ответ не JSON") from e
+
+
+class FlowSessions:
+    """Сессии одного потока для шагов start и finish
+
+    start сессию не расходует - одна сессия после входа кэшируется и
+    переиспользуется всеми запросами шага. finish удаляет сессию при любом
+    исходе, поэтому каждому запросу нужна новая, уже прошедшая start:
+    фоновый поток держит size таких сессий наготове.
+    """
+
+    def __init__(self, name: str, client: FlowClient, credentials: Dict[str, str], size: int = 8):
+        self.name = name
+        self.flow = FLOWS[name]
+        self.client = client
+        self.credentials = credentials
+        self.size = max(1, size)
+        self.stats = {'logins': 0, 'pooled': 0, 'on_demand': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+        self._ready: queue.Queue = queue.Queue()
+        self._start_sid: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _login(self) -> str:
+        result = self.client.call('POST', '/auth/login', self.credentials, auth=False)
+        self._count('logins')
+        sid = result.get(self.flow['login_field'])
+        if not sid:
+            raise FlowError(f"/auth/login не вернул {self.flow['login_field']}: протокол {self.name} не включен")
+        return sid
+
+    def _prepare(self) -> str:
+        """Сессия, прошедшая start: finish дойдет до проверки ответа"""
+        sid = self._login()
+        self.client.call('POST', self.flow['start'], {'sid': sid, self.flow['commitment']: FLOW_HEX}, auth=False)
+        return sid
+
+    def start_sid(self) -> str:
+        with self._lock:
+            if self._start_sid is None:
+                self._start_sid = self._login()
+            return self._start_sid
+
+    def finish_sid(self) -> str:
+        try:
+            sid = self._ready.get_nowait()
+            self._count('pooled')
+        except queue.Empty:
+            # Пул не успел пополниться - готовим сессию в потоке запроса
+            sid = self._prepare()
+            self._count('on_demand')
+        self._wakeup.set()
+        return sid
+
+    def _refill(self):
+        while not self._stopped.is_set():
+            if self._ready.qsize() >= self.size:
+                self._wakeup.wait(0.5)
+                self._wakeup.clear()
+                continue
+            try:
+                self._ready.put(self._prepare())
+            except FlowError as e:
+                self._count('errors')
+                logger.warning(f"Сессия {self.name} не подготовлена: {e}")
+                self._stopped.wait(1.0)
+
+    def start(self) -> 'FlowSessions':
+        self._thread = threading.Thread(target=self._refill, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class AuthFlows:
+    """Пользователи с включенными Fiat-Shamir и BMC и пулы их сессий
+
+    Для каждого потока регистрируется отдельный пользователь: включение
+    одного протокола выключает другой. rewrite подключается к ScanProxy
+    и заменяет FLOW_SID в теле запросов SQLMap живой сессией.
+    """
+
+    def __init__(self, base_url: str, headers: Dict[str, str], pool_size: int = 8,
+                 timeout: float = 10.0, limiter=None):
+        self.client = FlowClient(base_url, headers, timeout=timeout, limiter=limiter)
+        self.pool_size = pool_size
+        self.sessions: Dict[str, FlowSessions] = {}
+        self.stats = {'rewritten': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+
+    def setup(self) -> Dict[str, FlowSessions]:
+        for name, flow in FLOWS.items():
+            try:
+                credentials = registration_body(f'sqlmap-{name}')
+                user = self.client.call('POST', '/users/registration', credentials)
+                self.client.call('POST', flow['enable'].format(userId=user['id']), flow['params'])
+            except (FlowError, KeyError, TypeError) as e:
+                logger.warning(f"Поток {name} не подготовлен, шаги сканируются со статическим телом: {e}")
+                continue
+            login = {'email': credentials['email'], 'password': credentials['password']}
+            self.sessions[name] = FlowSessions(name, self.client, login, self.pool_size).start()
+            logger.info(f"Поток {name}: пользователь {credentials['email']}, пул {self.pool_size} сессий")
+        for path, reason in UNSUPPORTED.items():
+            logger.warning(f"{path} сканируется со статическим телом: {reason}")
+        return self.sessions
+
+    def stop(self):
+        for sessions in self.sessions.values():
+            sessions.stop()
+            logger.info(f"Сессии {sessions.name}: {sessions.stats}")
+
+    def rewrite(self, method: str, url: str, body: bytes) -> bytes:
+        """Подстановка живой сессии вместо FLOW_SID (хук ScanProxy перед отправкой в API)"""
+        marker = FLOW_SID.encode('utf-8')
+        step = flow_step(url)
+        if step is None or marker not in body or step[0] not in self.sessions:
+            return body
+        sessions = self.sessions[step[0]]
+        # Пейлоад в самом sid: сессия не найдется и не расходуется - хватает кэшированной
+        intact = b'"' + marker + b'"' in body
+        try:
+            sid = sessions.finish_sid() if step[1] == 'finish' and intact else sessions.start_sid()
+        except FlowError as e:
+            with self._stats_lock:
+                self.stats['errors'] += 1
+            logger.debug(f"Нет сессии {step[0]} для {method} {url}: {e}")
+            return body
+        with self._stats_lock:
+            self.stats['rewritten'] += 1
+        return body.replace(marker, sid.encode('utf-8'))
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Bulk Scan - Несколько эндпоинтов в одном процессе SQLMap
+Задания пакета пишутся в лог запросов Burp (sqlmap -l), вывод процесса
+разбирается обратно по заданиям, находки - из CSV результатов (--results-file)
+"""
+
+import csv
+import json
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+BURP_SEPARATOR = '=' * 54
+
+# Начало очередной цели в выводе SQLMap: "URL 3:" (до 1.5) или "[3/10] URL:"
+TARGET_MARKER_RE = re.compile(r'^(?:URL \d+:|\[\d+/[\d?]+\] (?:URL|Form):)\s*$')
+TARGET_LINE_RE = re.compile(r'^([A-Z]+) (\S+)')
+
+
+def target_key(url: str) -> str:
+    """Путь и query цели: SQLMap дописывает к URL из лога порт по умолчанию"""
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else '')
+
+
+def burp_log(jobs: List[Dict], headers: Dict[str, str]) -> str:
+    """Запросы заданий в формате лога Burp для sqlmap -l
+
+    Строка запроса - абсолютный URL (SQLMap берет его как есть, с портом и
+    схемой). Content-Length не пишется: SQLMap считает строки после него телом.
+    """
+    blocks = []
+    for job in jobs:
+        parts = urlsplit(job['url'])
+        request_headers = dict(headers, Host=parts.netloc)
+        body = ''
+        if job.get('data') and job['method'] in ('POST', 'PUT', 'PATCH'):
+            request_headers['Content-Type'] = 'application/json'
+            body = json.dumps(job['data'])
+        lines = [f"{job['method']} {job['url']} HTTP/1.1"]
+        lines += [f"{name}: {value}" for name, value in request_headers.items()]
+        blocks.append('\n'.join([
+            BURP_SEPARATOR,
+            f"{datetime.now().strftime('%H:%M:%S')}  {parts.scheme}://{parts.netloc}  [{parts.hostname}]",
+            BURP_SEPARATOR,
+            *lines,
+            '',
+            body,
+            BURP_SEPARATOR,
+            '', '',
+        ]))
+    return '\n'.join(blocks)
+
+
+def read_results_csv(path: str) -> Dict[str, List[Dict]]:
+    """Строки CSV результатов SQLMap по target_key: место, параметр, техники"""
+    injections: Dict[str, List[Dict]] = {}
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                url = row.get('Target URL')
+                if not url:
+                    continue
+                injections.setdefault(target_key(url), []).append({
+                    "place": row.get('Place', ''),
+                    "parameter": row.get('Parameter', ''),
+                    "techniques": row.get('Technique(s)', ''),
+                    "note": row.get('Note(s)', ''),
+                })
+    except FileNotFoundError:
+        # SQLMap пишет файл только при найденных инъекциях
+        pass
+    return injections
+
+
+class TargetRouter:
+    """Текущее задание пакета по маркерам целей в stdout SQLMap
+
+    SQLMap проходит цели лога по порядку и перед каждой печатает маркер и
+    строку "<метод> <URL>". Одинаковые URL SQLMap из лога отбрасывает, поэтому
+    URL в пакете уникальны и задание находится по target_key.
+    """
+
+    def __init__(self, jobs: List[Dict]):
+        self.jobs = jobs
+        self.current = 0
+        self._keys = {target_key(job['url']): index for index, job in enumerate(jobs)}
+
+    def switch(self, url: str) -> bool:
+        index = self._keys.get(target_key(url))
+        if index is None:
+            return False
+        self.current = index
+        return True
+
+    def finished(self, index: int) -> bool:
+        """Задание завершено (или пропущено SQLMap): процесс перешел к следующим целям"""
+        return index < self.current
+
+
+class RoutedLog:
+    """Лог процесса SQLMap, построчно разложенный по логам заданий пакета
+
+    Интерфейс CompressedLogWriter (write_line, close) - подставляется в
+    run_captured вместо одного лога. Маркер цели придерживается до строки
+    с URL и уходит в лог нового задания. Вывод до первой цели (баннер,
+    разбор лога) попадает в лог первого задания.
+    """
+
+    def __init__(self, router: TargetRouter, writers: List, follow_markers: bool = True):
+        self.router = router
+        self.writers = writers
+        self.follow_markers = follow_markers
+        self._pending: Optional[str] = None
+
+    def write_line(self, line: str):
+        if self.follow_markers:
+            if self._pending is not None:
+                marker, self._pending = self._pending, None
+                match = TARGET_LINE_RE.match(line)
+                if match:
+                    self.router.switch(match.group(2))
+                self.writers[self.router.current].write_line(marker)
+            elif TARGET_MARKER_RE.match(line.strip()):
+                self._pending = line
+                return
+        self.writers[self.router.current].write_line(line)
+
+    def close(self):
+        if self._pending is not None:
+            self.writers[self.router.current].write_line(self._pending)
+            self._pending = None
+        for writer in self.writers:
+            writer.close()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+DB Snapshot - Снимок базы API и восстановление между группами заданий
+Stacked queries и пейлоады risk 3 меняют данные: после группы заданий база
+возвращается к снимку, и следующие эндпоинты сканируются на исходных данных
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Журнал отката SQLite рядом с базой
+SQLITE_JOURNAL = '-journal'
+
+
+class SnapshotError(Exception):
+    """Снимок не создан или база не восстановлена"""
+
+
+class DatabaseSnapshot(ABC):
+    """Общий интерфейс снимка: take() один раз, restore() между группами, drop() в конце"""
+
+    def __init__(self):
+        self.stats = {'restores': 0, 'restore_ms_total': 0.0, 'restore_ms_max': 0.0}
+
+    @abstractmethod
+    def take(self):
+        """Снимок текущего состояния базы"""
+
+    @abstractmethod
+    def _restore(self):
+        """Возврат базы к снимку (restore() добавляет замер времени)"""
+
+    def drop(self):
+        pass
+
+    def restore(self):
+        started = time.monotonic()
+        self._restore()
+        elapsed = (time.monotonic() - started) * 1000
+        self.stats['restores'] += 1
+        self.stats['restore_ms_total'] += elapsed
+        self.stats['restore_ms_max'] = max(self.stats['restore_ms_max'], elapsed)
+
+    def summary(self) -> Dict:
+        restores = self.stats['restores']
+        return {
+            'restores': restores,
+            'restore_ms_avg': round(self.stats['restore_ms_total'] / restores, 1) if restores else 0.0,
+            'restore_ms_max': round(self.stats['restore_ms_max'], 1),
+        }
+
+
+class PostgresTemplateSnapshot(DatabaseSnapshot):
+    """Снимок Postgres как база-шаблон, восстановление - переименованием готовой копии
+
+    take(): CREATE DATABASE <db>_sqlmap_template TEMPLATE <db> и запасная копия
+    <db>_sqlmap_spare из шаблона. restore(): соединения API с базой
+    разрываются, база удаляется, запасная копия переименовывается в <db> -
+    время не зависит от размера базы. Следующая запасная копия создается из
+    шаблона в фоне, пока идет очередная группа заданий.
+
+    Команды выполняются через psql к служебной базе postgres: драйвер Python
+    не нужен. TypeORM переподключается сам - разорванные простаивающие
+    соединения пул pg заменяет новыми.
+    """
+
+    def __init__(self, database: str, host: str = 'localhost', port: int = 5432,
+                 user: str = 'postgres', password: str = '', psql: str = 'psql', retries: int = 3):
+        super().__init__()
+        self.database = database
+        self.template = f"{database}_sqlmap_template"
+        self.spare = f"{database}_sqlmap_spare"
+        self.psql = psql
+        self.retries = max(1, retries)
+        self._args = [psql, '-X', '-q', '-v', 'ON_ERROR_STOP=1',
+                      '-h', host, '-p', str(port), '-U', user, '-d', 'postgres']
+        self._env = dict(os.environ, PGPASSWORD=password) if password else None
+        self._spare_thread: Optional[threading.Thread] = None
+        self._spare_error: Optional[str] = None
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def _terminate_sql(self, database: str) -> str:
+        literal = database.replace("'", "''")
+        return ("SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                f"WHERE datname = '{literal}' AND pid <> pg_backend_pid()")
+
+    def _run(self, *statements: str):
+        """Каждая команда отдельным -c: CREATE/DROP DATABASE не работают в транзакции"""
+        cmd = list(self._args)
+        for statement in statements:
+            cmd += ['-c', statement]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, env=self._env, timeout=120)
+        except FileNotFoundError as e:
+            raise SnapshotError(f"{self.psql} не найден: нужен клиент PostgreSQL (psql)") from e
+        except subprocess.TimeoutExpired as e:
+            raise SnapshotError(f"psql не завершился за {e.timeout} с") from e
+        if result.returncode != 0:
+            raise SnapshotError(result.stderr.strip() or f"psql завершился с кодом {result.returncode}")
+
+    def _retry(self, *statements: str):
+        """Между разрывом соединений и командой API может успеть переподключиться - повтор"""
+        for attempt in range(self.retries):
+            try:
+                self._run(*statements)
+                return
+            except SnapshotError as e:
+                if attempt == self.retries - 1 or 'being accessed by other users' not in str(e):
+                    raise
+                logger.debug(f"База занята, повтор: {e}")
+
+    def _create_spare(self):
+        try:
+            self._run(f"DROP DATABASE IF EXISTS {self._quote(self.spare)}",
+                      f"CREATE DATABASE {self._quote(self.spare)} TEMPLATE {self._quote(self.template)}")
+        except SnapshotError as e:
+            self._spare_error = str(e)
+
+    def _wait_spare(self):
+        if self._spare_thread is not None:
+            self._spare_thread.join()
+            self._spare_thread = None
+        if self._spare_error is not None:
+            error, self._spare_error = self._spare_error, None
+            raise SnapshotError(f"Запасная копия {self.spare} не создана: {error}")
+
+    def take(self):
+        self._run(f"DROP DATABASE IF EXISTS {self._quote(self.template)}")
+        # Шаблон копируется только без активных соединений с исходной базой
+        self._retry(self._terminate_sql(self.database),
+                    f"CREATE DATABASE {self._quote(self.template)} TEMPLATE {self._quote(self.database)}")
+        self._create_spare()
+        self._wait_spare()
+
+    def _restore(self):
+        self._wait_spare()
+        self._retry(self._terminate_sql(self.database),
+                    f"DROP DATABASE IF EXISTS {self._quote(self.database)}",
+                    f"ALTER DATABASE {self._quote(self.spare)} RENAME TO {self._quote(self.database)}")
+        self._spare_thread = threading.Thread(target=self._create_spare, daemon=True)
+        self._spare_thread.start()
+
+    def drop(self):
+        try:
+            self._wait_spare()
+        except SnapshotError as e:
+            logger.warning(str(e))
+        self._run(f"DROP DATABASE IF EXISTS {self._quote(self.spare)}",
+                  f"DROP DATABASE IF EXISTS {self._quote(self.template)}")
+
+
+class FileSnapshot(DatabaseSnapshot):
+    """Снимок файловой базы (SQLite локального стенда) копией файла
+
+    restore() переписывает содержимое файла на месте - inode тот же, и
+    открытые процессом API соединения перечитывают страницы по счетчику
+    изменений в заголовке. Это верно для журнала отката (режим SQLite по
+    умолчанию): в режиме WAL соединения кэшируют индекс -shm в памяти.
+    API не должен держать открытую транзакцию между группами заданий.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.snapshot_dir = f"{path}.sqlmap-snapshot"
+
+    def _files(self) -> List[str]:
+        return [self.path, self.path + SQLITE_JOURNAL]
+
+    def take(self):
+        if not os.path.isfile(self.path):
+            raise SnapshotError(f"Файл базы {self.path} не найден")
+        if os.path.exists(self.path + '-wal'):
+            logger.warning(f"{self.path} в режиме WAL: восстановление копией файла для него ненадежно")
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+        os.makedirs(self.snapshot_dir)
+        for path in self._files():
+            if os.path.exists(path):
+                shutil.copyfile(path, os.path.join(self.snapshot_dir, os.path.basename(path)))
+
+    def _restore(self):
+        for path in self._files():
+            saved = os.path.join(self.snapshot_dir, os.path.basename(path))
+            try:
+                if os.path.exists(saved):
+                    shutil.copyfile(saved, path)
+                elif os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                raise SnapshotError(f"{path} не восстановлен: {e}") from e
+
+    def drop(self):
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+DH Engine - Обмен ключами ECDH P-256 для симуляции клиентов /diffie-hellman
+Ключи в формате JWK, как у Web Crypto API клиентов. Генерация пар ключей и
+вычисление секретов выполняются пачками в пуле процессов, вне event loop;
+cryptography используется, если установлен, иначе - реализация на Python
+"""
+
+import asyncio
+import base64
+import json
+import os
+import secrets
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from cryptography.hazmat.primitives.asymmetric import ec
+except ImportError:  # cryptography необязателен: без него - кривая на Python
+    ec = None
+
+# Параметры кривой P-256 (secp256r1), FIPS 186-4
+P = 0xffffffff00000001000000000000000000000000ffffffffffffffffffffffff
+B = 0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b
+N = 0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551
+GX = 0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296
+GY = 0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5
+
+BACKEND = 'cryptography' if ec is not None else 'python'
+
+# Ширина окна умножения на произвольную точку
+WINDOW = 4
+
+
+class KeyPair(NamedTuple):
+    private: str   # JWK приватного ключа (JSON)
+    public: str    # JWK публичного ключа (JSON) - поле publicKey в DiffieHellmanMessageDto
+
+
+# --- арифметика кривой (якобиевы координаты, a = -3) ---
+
+def _double(point):
+    x, y, z = point
+    if not y:
+        return None
+    delta = z * z % P
+    gamma = y * y % P
+    beta = x * gamma % P
+    alpha = 3 * (x - delta) * (x + delta) % P
+    x3 = (alpha * alpha - 8 * beta) % P
+    z3 = ((y + z) ** 2 - gamma - delta) % P
+    y3 = (alpha * (4 * beta - x3) - 8 * gamma * gamma) % P
+    return x3, y3, z3
+
+
+def _add(p1, p2):
+    if p1 is None:
+        return p2
+    if p2 is None:
+        return p1
+    x1, y1, z1 = p1
+    x2, y2, z2 = p2
+    z1z1 = z1 * z1 % P
+    z2z2 = z2 * z2 % P
+    u1 = x1 * z2z2 % P
+    u2 = x2 * z1z1 % P
+    s1 = y1 * z2 * z2z2 % P
+    s2 = y2 * z1 * z1z1 % P
+    h = (u2 - u1) % P
+    r = (s2 - s1) % P
+    if not h:
+        return _double(p1) if not r else None
+    hh = h * h % P
+    hhh = h * hh % P
+    v = u1 * hh % P
+    x3 = (r * r - hhh - 2 * v) % P
+    y3 = (r * (v - x3) - s1 * hhh) % P
+    z3 = z1 * z2 * h % P
+    return x3, y3, z3
+
+
+def _affine(point) -> Tuple[int, int]:
+    x, y, z = point
+    z_inv = pow(z, -1, P)
+    z_inv2 = z_inv * z_inv % P
+    return x * z_inv2 % P, y * z_inv2 * z_inv % P
+
+
+# G * 2^i - генерация ключа только сложениями; считается один раз в процессе
+_G_TABLE: List = []
+
+
+def _base_multiply(k: int) -> Tuple[int, int]:
+    if not _G_TABLE:
+        point = (GX, GY, 1)
+        for _ in range(256):
+            _G_TABLE.append(point)
+            point = _double(point)
+    result = None
+    for i in range(k.bit_length()):
+        if k >> i & 1:
+            result = _add(result, _G_TABLE[i])
+    return _affine(result)
+
+
+def _multiply(k: int, x: int, y: int) -> Tuple[int, int]:
+    """k * (x, y) оконным методом"""
+    table = [None, (x, y, 1)]
+    for _ in range(2, 1 << WINDOW):
+        table.append(_add(table[-1], table[1]))
+    result = None
+    for shift in range((k.bit_length() + WINDOW - 1) // WINDOW * WINDOW - WINDOW, -1, -WINDOW):
+        for _ in range(WINDOW):
+            if result is not None:
+                result = _double(result)
+        result = _add(result, table[k >> shift & ((1 << WINDOW) - 1)])
+    if result is None:
+        raise ValueError("точка на бесконечности")
+    return _affine(result)
+
+
+def _on_curve(x: int, y: int) -> bool:
+    return 0 <= x < P and 0 <= y < P and (y * y - x * x * x + 3 * x - B) % P == 0
+
+
+# --- JWK ---
+
+def _b64(value: int) -> str:
+    return base64.urlsafe_b64encode(value.to_bytes(32, 'big')).rstrip(b'=').decode('ascii')
+
+
+def _unb64(text: str) -> int:
+    return int.from_bytes(base64.urlsafe_b64decode(text + '=' * (-len(text) % 4)), 'big')
+
+
+def _jwk(x: int, y: int, d: Optional[int] = None) -> str:
+    """JWK в том же виде, что exportKey('jwk') Web Crypto"""
+    key = {'crv': 'P-256', 'ext': True, 'key_ops': [], 'kty': 'EC', 'x': _b64(x), 'y': _b64(y)}
+    if d is not None:
+        key['d'] = _b64(d)
+        key['key_ops'] = ['deriveKey', 'deriveBits']
+    return json.dumps(key, separators=(',', ':'))
+
+
+def _parse_public(jwk: str) -> Tuple[int, int]:
+    key = json.loads(jwk)
+    if key.get('kty') != 'EC' or key.get('crv') != 'P-256':
+        raise ValueError("ожидается JWK EC P-256")
+    x, y = _unb64(key['x']), _unb64(key['y'])
+    if not _on_curve(x, y):
+        raise ValueError("публичный ключ не лежит на кривой P-256")
+    return x, y
+
+
+# --- задания пула процессов (функции модуля, чтобы передаваться в процессы) ---
+
+def generate_key_pairs(count: int) -> List[KeyPair]:
+    pairs = []
+    for _ in range(count):
+        if ec is not None:
+            numbers = ec.generate_private_key(ec.SECP256R1()).private_numbers()
+            d, x, y = numbers.private_value, numbers.public_numbers.x, numbers.public_numbers.y
+        else:
+            d = secrets.randbelow(N - 1) + 1
+            x, y = _base_multiply(d)
+        pairs.append(KeyPair(_jwk(x, y, d), _jwk(x, y)))
+    return pairs
+
+
+def derive_secret(private_jwk: str, public_jwk: str) -> str:
+    """Общий секрет - координата x (256 бит, hex), как deriveBits(ECDH, 256) у клиента"""
+    own = json.loads(private_jwk)
+    d = _unb64(own['d'])
+    x, y = _parse_public(public_jwk)
+    if ec is not None:
+        curve = ec.SECP256R1()
+        # Публичная часть своего ключа есть в JWK - не пересчитываем d*G
+        own_public = ec.EllipticCurvePublicNumbers(_unb64(own['x']), _unb64(own['y']), curve)
+        private = ec.EllipticCurvePrivateNumbers(d, own_public).private_key()
+        return private.exchange(ec.ECDH(), ec.EllipticCurvePublicNumbers(x, y, curve).public_key()).hex()
+    shared_x, _ = _multiply(d, x, y)
+    return shared_x.to_bytes(32, 'big').hex()
+
+
+def derive_secrets(requests: List[Tuple[str, str]]) -> List:
+    """Пачка вычислений секрета; ошибка одного запроса возвращается как исключение на его месте"""
+    results = []
+    for private_jwk, public_jwk in requests:
+        try:
+            results.append(derive_secret(private_jwk, public_jwk))
+        except (ValueError, KeyError, TypeError) as e:
+            results.append(ValueError(str(e)))
+    return results
+
+
+class DHEngine:
+    """Пул пар ключей и пакетное вычисление секретов в процессах
+
+    Пары генерируются пачками по batch_size заранее (pool_size при старте).
+    С reuse=True пары раздаются по кругу и переиспользуются виртуальными
+    пользователями - сервер ключи только ретранслирует, а генерация не
+    ограничивает нагрузку. Запросы derive() копятся derive_delay секунд или
+    до derive_batch штук и уходят в процесс одной пачкой.
+    """
+
+    def __init__(self, workers: Optional[int] = None, pool_size: int = 1024, batch_size: int = 128,
+                 reuse: bool = True, derive_batch: int = 64, derive_delay: float = 0.002):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool_size = max(1, pool_size)
+        self.batch_size = max(1, batch_size)
+        self.reuse = reuse
+        self.derive_batch = max(1, derive_batch)
+        self.derive_delay = derive_delay
+        self.stats = {'backend': BACKEND, 'workers': self.workers, 'generated': 0, 'handed_out': 0,
+                      'derived': 0, 'derive_batches': 0, 'pool_misses': 0}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pairs: deque = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._pending: List[Tuple[Tuple[str, str], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches = set()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Начальный пул - параллельно всеми процессами
+        loop = asyncio.get_running_loop()
+        sizes = [self.batch_size] * (self.pool_size // self.batch_size)
+        if self.pool_size % self.batch_size:
+            sizes.append(self.pool_size % self.batch_size)
+        for batch in await asyncio.gather(*(loop.run_in_executor(self._executor, generate_key_pairs, n) for n in sizes)):
+            self._pairs.extend(batch)
+        self.stats['generated'] += self.pool_size
+
+    async def close(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush()
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _refill(self):
+        loop = asyncio.get_running_loop()
+        batch = await loop.run_in_executor(self._executor, generate_key_pairs, self.batch_size)
+        self._pairs.extend(batch)
+        self.stats['generated'] += len(batch)
+
+    async def key_pair(self) -> KeyPair:
+        self.stats['handed_out'] += 1
+        if self.reuse:
+            pair = self._pairs[0]
+            self._pairs.rotate(-1)
+            return pair
+        # Новые пары: пул пополняется в фоне, когда остается меньше одной пачки
+        if len(self._pairs) < self.batch_size and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.ensure_future(self._refill())
+        while not self._pairs:
+            self.stats['pool_misses'] += 1
+            await asyncio.shield(self._refill_task)
+            if not self._pairs:
+                self._refill_task = asyncio.ensure_future(self._refill())
+        return self._pairs.popleft()
+
+    def derive(self, private_jwk: str, public_jwk: str) -> asyncio.Future:
+        """Future с общим секретом (hex); ValueError для некорректного публичного ключа"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((private_jwk, public_jwk), future))
+        if len(self._pending) >= self.derive_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.derive_delay, self._flush)
+        return future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending or self._executor is None:
+            return
+        pending, self._pending = self._pending, []
+        self.stats['derive_batches'] += 1
+        batch = asyncio.get_running_loop().run_in_executor(
+            self._executor, derive_secrets, [request for request, _ in pending]
+        )
+        self._batches.add(batch)
+        batch.add_done_callback(lambda done: self._resolve(done, pending))
+
+    def _resolve(self, batch: asyncio.Future, pending: List):
+        self._batches.discard(batch)
+        if batch.cancelled():
+            results = [asyncio.CancelledError()] * len(pending)
+        elif batch.exception() is not None:
+            results = [batch.exception()] * len(pending)
+        else:
+            results = batch.result()
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                self.stats['derived'] += 1
+                future.set_result(result)
+
+
+class DHParticipant:
+    """Участник кольцевого обмена ключами чата - повторяет DiffieHellmanService клиента
+
+    Участники упорядочены по userId. Каждый отправляет свой публичный ключ
+    следующему (stage 1). Получив ключ с этапом меньше n-1, участник
+    вычисляет промежуточный секрет, генерирует новый публичный ключ и
+    пересылает его следующему с этапом +1; на этапе n-1 вычисляет общий секрет.
+    """
+
+    def __init__(self, engine: DHEngine, user_id: str, chat_id: str, users: List[str]):
+        self.engine = engine
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.users = sorted(users)
+        self.next_user = self.users[(self.users.index(user_id) + 1) % len(self.users)]
+        self.keys: Optional[KeyPair] = None
+        self.shared_secret: Optional[str] = None
+
+    def _message(self, public_key: str, stage: int) -> Dict:
+        return {
+            'chatId': self.chat_id,
+            'fromClientId': self.user_id,
+            'toClientId': self.next_user,
+            'publicKey': public_key,
+            'stage': stage,
+        }
+
+    async def start(self) -> Dict:
+        self.keys = await self.engine.key_pair()
+        return self._message(self.keys.public, 1)
+
+    async def handle(self, message: Dict) -> Optional[Dict]:
+        """Ответное сообщение для dh-send или None, если обмен завершен"""
+        if self.keys is None:
+            raise ValueError("обмен ключами не начат")
+        stage = int(message['stage'])
+        if stage >= len(self.users) - 1:
+            self.shared_secret = await self.engine.derive(self.keys.private, message['publicKey'])
+            return None
+        # Промежуточный секрет клиент использует только как основу нового ключа
+        await self.engine.derive(self.keys.private, message['publicKey'])
+        new_keys = await self.engine.key_pair()
+        return self._message(new_keys.public, stage + 1)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+File Watcher - Отслеживание изменений файлов с debounce
+inotify через watchdog (если установлен), иначе периодический опрос mtime
+"""
+
+import fnmatch
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Set, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog необязателен: без него работает опрос
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+
+def matches(path: str, patterns: Iterable[str]) -> bool:
+    name = os.path.basename(path)
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def snapshot(root: str, patterns: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+    """(mtime_ns, размер) всех подходящих файлов дерева"""
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if matches(path, patterns):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+# Изменения содержимого; открытие/закрытие файла (opened, closed_no_write) не в счет -
+# иначе чтение отчета при пересборке вызывает следующую пересборку
+CHANGE_EVENTS = ('created', 'modified', 'moved', 'deleted')
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, patterns, notify):
+        self.patterns = patterns
+        self.notify = notify
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in CHANGE_EVENTS:
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if path and matches(path, self.patterns):
+                self.notify(os.path.normpath(path))
+
+
+class FileWatcher:
+    """Сбор изменений в пачку: on_change(пути) вызывается после debounce секунд без новых событий
+
+    Серия записей (SQLMap дописывает базу, редактор сохраняет файл в несколько
+    шагов) дает одну пересборку, а не по пересборке на каждое событие.
+    """
+
+    def __init__(self, root: str, patterns: Iterable[str], on_change: Callable[[Set[str]], None],
+                 debounce: float = 1.0, poll_interval: float = 1.0, use_inotify: bool = True):
+        self.root = root
+        self.patterns = tuple(patterns)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and Observer is not None
+        self._pending: Set[str] = set()
+        self._last_event = 0.0
+        self._lock = threading.Lock()
+
+    def _notify(self, path: str):
+        with self._lock:
+            self._pending.add(path)
+            self._last_event = time.monotonic()
+
+    def _take_batch(self) -> Set[str]:
+        with self._lock:
+            if not self._pending or time.monotonic() - self._last_event < self.debounce:
+                return set()
+            batch, self._pending = self._pending, set()
+            return batch
+
+    def run(self):
+        """Блокирующий цикл до Ctrl+C"""
+        observer = None
+        state = snapshot(self.root, self.patterns)
+        if self.use_inotify:
+            observer = Observer()
+            observer.schedule(_EventHandler(self.patterns, self._notify), self.root, recursive=True)
+            observer.start()
+            logger.info(f"Отслеживание {self.root} (inotify), debounce {self.debounce:g} с")
+        else:
+            logger.info(f"Отслеживание {self.root} (опрос каждые {self.poll_interval:g} с), debounce {self.debounce:g} с")
+
+        tick = min(self.poll_interval, self.debounce / 2) if self.debounce > 0 else self.poll_interval
+        try:
+            while True:
+                time.sleep(tick)
+                if observer is None:
+                    current = snapshot(self.root, self.patterns)
+                    # Новые, измененные и удаленные файлы
+                    for path in set(state) | set(current):
+                        if state.get(path) != current.get(path):
+                            self._notify(path)
+                    state = current
+                batch = self._take_batch()
+                if batch and observer is not None:
+                    # Событие inotify - повод сравнить (mtime, размер), как при опросе
+                    current = snapshot(self.root, self.patterns)
+                    batch = {path for path in batch if state.get(path) != current.get(path)}
+                    state = current
+                if batch:
+                    try:
+                        self.on_change(batch)
+                    except Exception as e:
+                        logger.error(f"Ошибка пересборки: {e}")
+                    if observer is not None:
+                        # Запись самой пересборки не изменение: чтение базы в WAL режиме
+                        # создает и удаляет -wal, при закрытии - checkpoint в базу
+                        state = snapshot(self.root, self.patterns)
+        except KeyboardInterrupt:
+            logger.info("Отслеживание остановлено")
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
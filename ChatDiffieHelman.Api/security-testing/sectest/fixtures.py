@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Fixtures - Тестовые данные для сканирования: чат, сообщение и приглашение
+Создаются через API один раз за прогон, их идентификаторы подставляются
+в path-параметры и поля тела - запросы SQLMap доходят до запросов к базе
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+import string
+from datetime import datetime
+from typing import Dict, Optional
+
+from .async_http import ConnectionPool, HTTPError
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_FILE = 'fixtures.json'
+
+# Path-параметр -> ключ фикстуры
+PATH_PARAMS = {
+    'id': 'userId',
+    'userId': 'userId',
+    'chatId': 'chatId',
+    'messageId': 'messageId',
+    'inviteId': 'inviteId',
+}
+
+# Поле JSON тела -> ключ фикстуры (id тела не подставляется: у MessageDto это новый первичный ключ)
+BODY_FIELDS = {
+    'chatId': 'chatId',
+    'userId': 'userId',
+    'inviteId': 'inviteId',
+    'userReceiverId': 'receiverId',
+}
+
+
+class FixtureError(Exception):
+    """API отклонил создание фикстуры"""
+
+
+def registration_body(prefix: str) -> Dict[str, str]:
+    """Тело /users/registration: имя только из букв и дефисов (RegisterDto), уникальный email"""
+    suffix = ''.join(secrets.choice(string.ascii_lowercase) for _ in range(8))
+    return {
+        'username': f'{prefix}-{suffix}',
+        'email': f'{prefix}-{suffix}@example.com',
+        'password': secrets.token_urlsafe(12),
+    }
+
+
+class FixtureProvisioner:
+    """Создание фикстур от имени сканирующего пользователя
+
+    Чат (POST /chats), сообщение в нем (POST /messages/{chatId}) и
+    приглашение в него другого пользователя (POST /invites/create). Получатель
+    приглашения - любой другой пользователь из /users/all, если его нет -
+    регистрируется новый. Шаг, отклоненный API, пропускается: его параметры
+    получают прежние тестовые значения.
+    """
+
+    def __init__(self, base_url: str, headers: Dict[str, str], timeout: float = 10.0):
+        self.base_url = base_url.rstrip('/')
+        self.headers = headers
+        self.timeout = timeout
+
+    async def _call(self, pool: ConnectionPool, method: str, path: str, body: Optional[Dict] = None):
+        headers = {'Content-Type': 'application/json'} if body is not None else None
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        try:
+            response = await pool.request(method, self.base_url + path, headers=headers, body=data)
+        except (HTTPError, OSError, asyncio.TimeoutError) as e:
+            raise FixtureError(f"{method} {path}: {e or type(e).__name__}") from e
+        if response.status >= 400:
+            raise FixtureError(f"{method} {path}: {response.status} {response.text[:200]}")
+        try:
+            return response.json()
+        except ValueError as e:
+            raise FixtureError(f"{method} {path}: ответ не JSON") from e
+
+    async def _receiver(self, pool: ConnectionPool, user_id: Optional[str]) -> str:
+        users = await self._call(pool, 'GET', '/users/all')
+        for user in users if isinstance(users, list) else []:
+            if user.get('id') and user['id'] != user_id:
+                return user['id']
+        registered = await self._call(pool, 'POST', '/users/registration', registration_body('sqlmap-fixture'))
+        return registered['id']
+
+    async def provision(self) -> Dict[str, str]:
+        fixtures = {}
+        async with ConnectionPool(limit_per_host=1, timeout=self.timeout, headers=self.headers) as pool:
+            steps = (
+                ('userId', lambda: self._call(pool, 'GET', '/users/me')),
+                ('chatId', lambda: self._call(pool, 'POST', '/chats', {
+                    'name': f"sqlmap-fixture-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                })),
+                ('messageId', lambda: self._call(pool, 'POST', f"/messages/{fixtures['chatId']}", {
+                    'content': 'sqlmap fixture', 'type': 'text'
+                })),
+                ('receiverId', lambda: self._receiver(pool, fixtures.get('userId'))),
+                ('inviteId', lambda: self._call(pool, 'POST', '/invites/create', {
+                    'chatId': fixtures['chatId'], 'userReceiverId': fixtures['receiverId']
+                })),
+            )
+            # Следующие шаги зависят от предыдущих: сообщение и приглашение - от чата
+            requires = {'messageId': ('chatId',), 'inviteId': ('chatId', 'receiverId')}
+            for key, step in steps:
+                missing = [name for name in requires.get(key, ()) if name not in fixtures]
+                if missing:
+                    logger.warning(f"Фикстура {key} пропущена: нет {', '.join(missing)}")
+                    continue
+                try:
+                    created = await step()
+                    fixtures[key] = created if isinstance(created, str) else created['id']
+                except (FixtureError, KeyError, TypeError) as e:
+                    logger.warning(f"Фикстура {key} не создана: {e}")
+        return fixtures
+
+    def run(self) -> Dict[str, str]:
+        return asyncio.run(self.provision())
+
+
+def fixture_value(fixtures: Dict[str, str], name: str, location: str = 'path') -> Optional[str]:
+    """Идентификатор фикстуры для path-параметра или поля тела"""
+    key = (PATH_PARAMS if location == 'path' else BODY_FIELDS).get(name)
+    return fixtures.get(key) if key else None
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Load Test - Нагрузочное тестирование REST API чата
+N виртуальных пользователей на asyncio: регистрация и вход, список чатов,
+отправка и чтение сообщений. Операции сценария берутся из swagger-spec.json
+по operationId; отчет - перцентили задержки и пропускная способность по операциям
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .async_http import ConnectionPool, HTTPError
+from .quick_test import example_body
+
+# Конфигурация
+API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:3001')
+SWAGGER_SPEC_PATH = os.getenv('SWAGGER_SPEC_PATH', str(Path(__file__).resolve().parents[2] / 'swagger-spec.json'))
+LOAD_USERS = int(os.getenv('LOAD_USERS', '20'))
+LOAD_DURATION = int(os.getenv('LOAD_DURATION', '60'))
+LOAD_RAMP_UP = int(os.getenv('LOAD_RAMP_UP', '10'))
+LOAD_THINK_TIME = float(os.getenv('LOAD_THINK_TIME', '1.0'))
+LOAD_TIMEOUT = int(os.getenv('LOAD_TIMEOUT', '30'))
+LOAD_RESULTS_DIR = os.getenv('LOAD_RESULTS_DIR', './load_results')
+LOAD_PASSWORD = os.getenv('LOAD_PASSWORD', 'loadTestPassword123')
+
+# Операции сценария (operationId в swagger-spec.json)
+SETUP_OPERATIONS = (
+    'UserController_registerUser',
+    'AuthController_login',
+    'UserController_getMe',
+    'ChatController_createChat',
+)
+
+# Действия основного цикла и их веса: чтение сообщений - самая частая операция клиента
+ACTIONS = {
+    'ChatController_getMyChats': 3,
+    'MessageController_getMessages': 4,
+    'MessageController_sendMessage': 3,
+    'ChatController_getChat': 1,
+    'ChatController_getChatUsers': 1,
+}
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Operation:
+    """Операция API из спецификации: метод, шаблон пути и пример тела"""
+
+    def __init__(self, operation_id: str, method: str, path: str, body: Optional[Dict]):
+        self.operation_id = operation_id
+        self.method = method
+        self.path = path
+        self.body = body
+
+    def url(self, base_url: str, **params) -> str:
+        return base_url.rstrip('/') + self.path.format(**params)
+
+
+def load_operations(spec: dict) -> Dict[str, Operation]:
+    """Операции сценария по operationId; отсутствующая в спецификации - ошибка"""
+    operations = {}
+    for path, methods in spec.get('paths', {}).items():
+        for method, endpoint_info in methods.items():
+            operation_id = endpoint_info.get('operationId')
+            if operation_id in SETUP_OPERATIONS or operation_id in ACTIONS:
+                operations[operation_id] = Operation(operation_id, method.upper(), path,
+                                                     example_body(spec, endpoint_info))
+    missing = [op for op in SETUP_OPERATIONS + tuple(ACTIONS) if op not in operations]
+    if missing:
+        raise KeyError(f"В спецификации нет операций: {', '.join(missing)}")
+    return operations
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Перцентиль по ближайшему рангу (values отсортированы)"""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+class OperationStats:
+    """Задержки, статусы и объем ответов одной операции"""
+
+    def __init__(self):
+        self.samples = []          # (время от старта, задержка)
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+        self.bytes = 0
+
+    def add(self, at: float, latency: float, status: Optional[int], size: int = 0):
+        self.samples.append((at, latency))
+        key = str(status) if status is not None else 'error'
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+        self.bytes += size
+
+    def summary(self, duration: float) -> Dict:
+        latencies = sorted(latency for _, latency in self.samples)
+        count = len(latencies)
+        result = {
+            'count': count,
+            'errors': self.errors,
+            'rps': round(count / duration, 2) if duration > 0 else 0.0,
+            'mean_ms': round(sum(latencies) / count * 1000, 1) if count else 0.0,
+            'max_ms': round(latencies[-1] * 1000, 1) if count else 0.0,
+            'avg_bytes': self.bytes // count if count else 0,
+            'statuses': self.statuses,
+        }
+        for p in PERCENTILES:
+            result[f'p{p}_ms'] = round(percentile(latencies, p) * 1000, 1)
+        # Рост задержки к концу прогона (накопились сообщения, выросли таблицы)
+        third = duration / 3
+        early = sorted(latency for at, latency in self.samples if at < third)
+        late = sorted(latency for at, latency in self.samples if at >= 2 * third)
+        if early and late:
+            result['p50_growth'] = round(percentile(late, 50) / max(percentile(early, 50), 1e-6), 2)
+        return result
+
+
+class LoadTest:
+    """Прогон: виртуальные пользователи с общим пулом соединений и общей статистикой"""
+
+    def __init__(self, base_url: str, operations: Dict[str, Operation], users: int, duration: float,
+                 ramp_up: float, think_time: float, timeout: float):
+        self.base_url = base_url
+        self.operations = operations
+        self.users = users
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.timeout = timeout
+        self.run_tag = uuid.uuid4().hex[:8]
+        self.stats: Dict[str, OperationStats] = {}
+        self.failed_users = 0
+        self._started = 0.0
+
+    async def _call(self, pool: ConnectionPool, operation_id: str, token: Optional[str] = None,
+                    body: Optional[Dict] = None, **params):
+        operation = self.operations[operation_id]
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        data = None
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+            data = json.dumps(body).encode('utf-8')
+        stats = self.stats.setdefault(operation_id, OperationStats())
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            response = await pool.request(operation.method, operation.url(self.base_url, **params),
+                                          headers=headers, body=data)
+        except (HTTPError, OSError, asyncio.TimeoutError):
+            stats.add(started - self._started, loop.time() - started, None)
+            return None
+        stats.add(started - self._started, response.elapsed, response.status, len(response.body))
+        return response
+
+    async def _login(self, pool: ConnectionPool, number: int) -> Optional[str]:
+        """Новый пользователь на каждый прогон: без включенных Fiat/BMC вход сразу выдает токен"""
+        email = f"load-{self.run_tag}-{number}@example.com"
+        register = dict(self.operations['UserController_registerUser'].body or {},
+                        username=f"load-{number}", email=email, password=LOAD_PASSWORD)
+        await self._call(pool, 'UserController_registerUser', body=register)
+        login = dict(self.operations['AuthController_login'].body or {}, email=email, password=LOAD_PASSWORD)
+        response = await self._call(pool, 'AuthController_login', body=login)
+        if response is None or response.status >= 400:
+            return None
+        try:
+            return response.json().get('access_token')
+        except ValueError:
+            return None
+
+    async def _user(self, pool: ConnectionPool, number: int, deadline: float):
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(self.ramp_up * number / max(self.users, 1))
+
+        token = await self._login(pool, number)
+        if not token:
+            self.failed_users += 1
+            return
+        await self._call(pool, 'UserController_getMe', token)
+        chat_body = dict(self.operations['ChatController_createChat'].body or {}, name=f"load-{self.run_tag}-{number}")
+        response = await self._call(pool, 'ChatController_createChat', token, chat_body)
+        try:
+            chat_id = response.json()['id']
+        except (AttributeError, ValueError, KeyError, TypeError):
+            self.failed_users += 1
+            return
+
+        actions, weights = list(ACTIONS), list(ACTIONS.values())
+        sent = 0
+        while loop.time() < deadline:
+            action = random.choices(actions, weights)[0]
+            if action == 'MessageController_sendMessage':
+                sent += 1
+                message = {'content': f"load message {sent} from user {number}", 'type': 'text'}
+                await self._call(pool, action, token, message, chatId=chat_id)
+            else:
+                await self._call(pool, action, token, chatId=chat_id)
+            # Пауза пользователя между действиями (экспоненциальная, среднее think_time)
+            if self.think_time > 0:
+                await asyncio.sleep(min(random.expovariate(1 / self.think_time), deadline - loop.time()))
+
+    async def run(self) -> Dict:
+        loop = asyncio.get_running_loop()
+        self._started = loop.time()
+        deadline = self._started + self.ramp_up + self.duration
+        async with ConnectionPool(limit_per_host=self.users, timeout=self.timeout) as pool:
+            await asyncio.gather(*(self._user(pool, number, deadline) for number in range(self.users)))
+            connections = pool.connections_opened
+        elapsed = loop.time() - self._started
+
+        return {
+            'summary': {
+                'base_url': self.base_url,
+                'test_date': datetime.now().isoformat(),
+                'users': self.users,
+                'failed_users': self.failed_users,
+                'duration_sec': round(elapsed, 1),
+                'ramp_up_sec': self.ramp_up,
+                'think_time_sec': self.think_time,
+                'requests': sum(len(s.samples) for s in self.stats.values()),
+                'errors': sum(s.errors for s in self.stats.values()),
+                'connections_opened': connections,
+            },
+            'operations': {op: stats.summary(elapsed) for op, stats in sorted(self.stats.items())},
+        }
+
+
+def print_report(report: Dict):
+    summary = report['summary']
+    print(f"\n{'=' * 118}")
+    print(f"Пользователей: {summary['users']} (не вошли: {summary['failed_users']}), "
+          f"длительность: {summary['duration_sec']} с, запросов: {summary['requests']}, "
+          f"ошибок: {summary['errors']}, соединений: {summary['connections_opened']}")
+    print(f"{'=' * 118}")
+    print(f"{'operationId':<34} {'запросов':>8} {'ошибок':>7} {'rps':>7} {'p50':>8} {'p90':>8} "
+          f"{'p95':>8} {'p99':>8} {'max':>8} {'байт':>8} {'рост':>6}")
+    for operation_id, s in report['operations'].items():
+        growth = f"x{s['p50_growth']}" if 'p50_growth' in s else '-'
+        print(f"{operation_id:<34} {s['count']:>8} {s['errors']:>7} {s['rps']:>7} {s['p50_ms']:>8} "
+              f"{s['p90_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8} {s['max_ms']:>8} {s['avg_bytes']:>8} {growth:>6}")
+    print("\nЗадержки в мс; рост - p50 последней трети прогона к p50 первой трети")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест REST API чата")
+    parser.add_argument('--users', type=int, default=LOAD_USERS, help=f"Виртуальных пользователей (по умолчанию {LOAD_USERS})")
+    parser.add_argument('--duration', type=int, default=LOAD_DURATION, help=f"Длительность после разгона, с (по умолчанию {LOAD_DURATION})")
+    parser.add_argument('--ramp-up', type=int, default=LOAD_RAMP_UP, help=f"Разгон: пользователи стартуют равномерно за N с (по умолчанию {LOAD_RAMP_UP})")
+    parser.add_argument('--think-time', type=float, default=LOAD_THINK_TIME, help=f"Средняя пауза между действиями, с (по умолчанию {LOAD_THINK_TIME:g})")
+    parser.add_argument('--url', default=API_BASE_URL, help=f"URL API (по умолчанию {API_BASE_URL})")
+    parser.add_argument('--spec', default=SWAGGER_SPEC_PATH, help="Путь к swagger-spec.json")
+    args = parser.parse_args()
+
+    try:
+        with open(args.spec, 'r', encoding='utf-8') as f:
+            operations = load_operations(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Не удалось загрузить сценарий из {args.spec}: {e}")
+        sys.exit(1)
+
+    print(f"🚀 Нагрузочный тест {args.url}: {args.users} пользователей, "
+          f"{args.duration} с (+{args.ramp_up} с разгон)")
+    test = LoadTest(args.url, operations, args.users, args.duration, args.ramp_up, args.think_time, LOAD_TIMEOUT)
+    report = asyncio.run(test.run())
+    print_report(report)
+
+    os.makedirs(LOAD_RESULTS_DIR, exist_ok=True)
+    report_path = os.path.join(LOAD_RESULTS_DIR, f"load_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"📄 Отчет: {report_path}")
+    sys.exit(1 if report['summary']['requests'] == 0 or test.failed_users == args.users else 0)
+
+
+if __name__ == "__main__":
+    main()
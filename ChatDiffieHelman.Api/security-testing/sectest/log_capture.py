@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Log Capture - Потоковая запись вывода SQLMap со сжатием
+Вывод сжимается по мере поступления, блоки найденных инъекций индексируются для быстрого чтения
+"""
+
+import io
+import subprocess
+import threading
+import zlib
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
+
+# Строка, с которой начинается блок найденной инъекции в выводе SQLMap
+FINDING_MARKERS = (
+    "sqlmap identified the following injection point",
+    "sqlmap resumed the following injection point",
+)
+
+# gzip-контейнер для zlib (wbits = 16 + MAX_WBITS)
+GZIP_WBITS = 31
+
+
+class CompressedLogWriter:
+    """Запись текста в gzip из нескольких членов с индексом по смещениям
+
+    Новый gzip-член начинается каждые member_size несжатых байт и перед
+    каждым блоком найденной инъекции. Член можно распаковать отдельно,
+    поэтому фрагмент читается по индексу без распаковки всего лога.
+    Результат - обычный .gz файл (gzip.open / zcat читают его целиком).
+    """
+
+    def __init__(self, fileobj: BinaryIO, member_size: int = 256 * 1024, level: int = 6,
+                 markers=FINDING_MARKERS):
+        self.fileobj = fileobj
+        self.member_size = member_size
+        self.level = level
+        self.markers = tuple(m.lower() for m in markers)
+        self.findings: List[Dict] = []
+        self.lines = 0
+        self._compressed = 0       # Сжатых байт записано
+        self._uncompressed = 0     # Несжатых байт записано
+        self._member_start = 0     # Несжатое смещение начала текущего члена
+        self._compressor = None
+        self._lock = threading.Lock()
+
+    def _write(self, data: bytes):
+        if data:
+            self.fileobj.write(data)
+            self._compressed += len(data)
+
+    def _finish_member(self):
+        if self._compressor is not None:
+            self._write(self._compressor.flush(zlib.Z_FINISH))
+            self._compressor = None
+
+    def _start_member(self):
+        self._finish_member()
+        self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, GZIP_WBITS)
+        self._member_start = self._uncompressed
+
+    def write_line(self, line: str):
+        """Запись одной строки вывода (с переводом строки)"""
+        data = line.encode('utf-8', errors='replace')
+        with self._lock:
+            is_finding = any(marker in line.lower() for marker in self.markers)
+            if (self._compressor is None or is_finding
+                    or self._uncompressed - self._member_start >= self.member_size):
+                self._start_member()
+            if is_finding:
+                self.findings.append({
+                    "offset": self._compressed,
+                    "line": self.lines + 1,
+                })
+            self._write(self._compressor.compress(data))
+            self._uncompressed += len(data)
+            self.lines += 1
+
+    def close(self):
+        with self._lock:
+            self._finish_member()
+
+    @property
+    def index(self) -> Dict:
+        return {
+            "lines": self.lines,
+            "size": self._uncompressed,
+            "compressed_size": self._compressed,
+            "findings": self.findings,
+        }
+
+
+class StreamCapture:
+    """Чтение потока процесса построчно в CompressedLogWriter в отдельном потоке"""
+
+    def __init__(self, stream, writer: CompressedLogWriter,
+                 on_line: Optional[Callable[[str], None]] = None):
+        self.writer = writer
+        self._stream = stream
+        self._on_line = on_line
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+        self._thread.start()
+
+    def _pump(self):
+        for line in iter(self._stream.readline, ''):
+            self.writer.write_line(line)
+            if self._on_line is not None:
+                self._on_line(line)
+        self._stream.close()
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+
+def run_captured(cmd: List[str], stdout_writer: CompressedLogWriter,
+                 stderr_writer: CompressedLogWriter, timeout: float,
+                 on_line: Optional[Callable[[str], None]] = None) -> int:
+    """Запуск процесса с потоковой записью stdout/stderr; TimeoutExpired после kill"""
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, encoding='utf-8', errors='replace', bufsize=1
+    )
+    captures = [
+        StreamCapture(process.stdout, stdout_writer, on_line),
+        StreamCapture(process.stderr, stderr_writer, on_line),
+    ]
+    try:
+        return process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        # Дочитываем остаток вывода: частичный лог сохраняется и при таймауте
+        for capture in captures:
+            capture.join()
+        stdout_writer.close()
+        stderr_writer.close()
+
+
+def read_excerpt(source: Union[bytes, BinaryIO], offset: int, max_lines: int = 40) -> str:
+    """Чтение фрагмента лога с gzip-члена по смещению из индекса"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    source.seek(offset)
+
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    text = b''
+    while text.count(b'\n') < max_lines:
+        chunk = source.read(64 * 1024)
+        if not chunk:
+            break
+        while chunk:
+            text += decompressor.decompress(chunk)
+            if not decompressor.eof:
+                break
+            # Член закончился: остаток - начало следующего члена
+            chunk = decompressor.unused_data
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+
+    lines = text.decode('utf-8', errors='replace').splitlines()
+    return '\n'.join(lines[:max_lines])
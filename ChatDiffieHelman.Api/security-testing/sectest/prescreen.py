@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+SQLi Pre-screener - Быстрая проверка эндпоинтов перед запуском SQLMap
+Несколько кавычечных/булевых проб на параметр через asyncio и пул соединений;
+в SQLMap уходят только эндпоинты с аномалиями ответа
+"""
+
+import asyncio
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .async_http import ConnectionPool, HTTPError, Response
+
+logger = logging.getLogger(__name__)
+
+# Сообщения СУБД/ORM в ответе: PostgreSQL, TypeORM и общие
+SQL_ERROR_SIGNATURES = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"syntax error at or near",
+        r"unterminated quoted (string|identifier)",
+        r"QueryFailedError",
+        r"SQLSTATE\[?\w*",
+        r"PostgreSQL.*ERROR",
+        r"pg_query\(|pg_exec\(",
+        r"ERROR:\s+(column|relation|operator|function) .* does not exist",
+        r"You have an error in your SQL syntax",
+        r"unclosed quotation mark",
+        r"SQLite3?::|sqlite_error",
+    )
+]
+
+# Сегменты пути, похожие на идентификаторы (подставленные path-параметры)
+PATH_PARAM_RE = re.compile(r'^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+|test-value)$')
+
+# Пробы: суффикс к исходному значению параметра
+PROBES = {
+    'control': 'x',            # Безобидное изменение: так API реагирует на любое "чужое" значение
+    'quote': "'",
+    'dquote': '"',
+    'bool_true': "' AND '1'='1",
+    'bool_false': "' AND '1'='2",
+}
+
+# Заголовки, которые SQLMap проверяет начиная с --level 3, и их исходные значения
+HEADER_POINTS = {
+    'User-Agent': 'Mozilla/5.0',
+    'Referer': 'http://localhost/',
+}
+
+# Относительная разница длины тела, считающаяся отличием
+LENGTH_TOLERANCE = 0.1
+LENGTH_MIN_DELTA = 20
+
+
+def sql_error(text: str) -> Optional[str]:
+    """Первое сообщение СУБД/ORM в тексте ответа"""
+    for pattern in SQL_ERROR_SIGNATURES:
+        match = pattern.search(text)
+        if match:
+            return match.group(0)
+    return None
+
+
+def error_signature(response: Response) -> Optional[str]:
+    return sql_error(response.text)
+
+
+def differs(a: Response, b: Response) -> bool:
+    """Ответы различаются по статусу или заметно по длине"""
+    if a.status != b.status:
+        return True
+    delta = abs(len(a.body) - len(b.body))
+    return delta > LENGTH_MIN_DELTA and delta > LENGTH_TOLERANCE * max(len(a.body), len(b.body), 1)
+
+
+def injection_points(job: Dict, headers: bool = True) -> List[Tuple[str, str]]:
+    """Точки внедрения задания: (query|body|path|header, имя или индекс сегмента)"""
+    points = []
+    parts = urlsplit(job['url'])
+    points += [('query', name) for name, _ in parse_qsl(parts.query, keep_blank_values=True)]
+    if isinstance(job.get('data'), dict):
+        points += [('body', name) for name, value in job['data'].items() if isinstance(value, (str, int, float))]
+    segments = parts.path.split('/')
+    points += [('path', str(index)) for index, segment in enumerate(segments) if PATH_PARAM_RE.match(segment)]
+    if headers:
+        points += [('header', name) for name in HEADER_POINTS]
+    return points
+
+
+def mutate(job: Dict, point: Tuple[str, str], suffix: str) -> Tuple[str, Optional[Dict], Dict[str, str]]:
+    """URL, тело и заголовки запроса с суффиксом пробы в одной точке"""
+    location, name = point
+    parts = urlsplit(job['url'])
+    data = job.get('data')
+    headers = dict(HEADER_POINTS)
+    if location == 'query':
+        query = [(k, f"{v}{suffix}" if k == name else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+        return urlunsplit(parts._replace(query=urlencode(query))), data, headers
+    if location == 'body':
+        return job['url'], dict(data, **{name: f"{data[name]}{suffix}"}), headers
+    if location == 'header':
+        headers[name] += suffix
+        return job['url'], data, headers
+    segments = parts.path.split('/')
+    segments[int(name)] += suffix
+    return urlunsplit(parts._replace(path='/'.join(segments))), data, headers
+
+
+class PreScreener:
+    """Асинхронный пре-скрининг заданий SQLMap
+
+    Для каждой точки внедрения: базовый запрос, контрольная проба и
+    кавычечные/булевы пробы. Аномалия - SQL-ошибка в ответе, 5xx только на
+    кавычку, отличие кавычки от контрольной пробы или расхождение
+    bool_true/bool_false. Эндпоинт без аномалий SQLMap не проверяет.
+    """
+
+    def __init__(self, headers: Dict[str, str], concurrency: int = 8, timeout: float = 10.0, limiter=None,
+                 probe_headers: bool = True):
+        self.headers = headers
+        self.probe_headers = probe_headers
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.limiter = limiter
+
+    async def _send(self, pool: ConnectionPool, method: str, url: str, data: Optional[Dict],
+                    headers: Optional[Dict[str, str]] = None) -> Response:
+        if self.limiter is not None:
+            # Общий с SQLMap лимит частоты - блокирующий, ждем его вне event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.limiter.acquire)
+        body = json.dumps(data).encode('utf-8') if data is not None and method in ('POST', 'PUT', 'PATCH') else None
+        headers = dict(headers or HEADER_POINTS)
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        response = await pool.request(method, url, headers=headers, body=body)
+        if self.limiter is not None:
+            self.limiter.observe(response.elapsed)
+        return response
+
+    async def _screen_point(self, pool: ConnectionPool, job: Dict, point: Tuple[str, str],
+                            baseline: Response) -> List[Dict]:
+        responses = {}
+        for probe, suffix in PROBES.items():
+            url, data, headers = mutate(job, point, suffix)
+            responses[probe] = await self._send(pool, job['method'], url, data, headers)
+
+        anomalies = []
+        where = f"{point[0]}:{point[1]}"
+        control = responses['control']
+        control_error = error_signature(control) or error_signature(baseline)
+        for probe in ('quote', 'dquote', 'bool_true', 'bool_false'):
+            signature = error_signature(responses[probe])
+            if signature and signature != control_error:
+                anomalies.append({"point": where, "probe": probe, "reason": "sql-error", "detail": signature})
+        quote = responses['quote']
+        if quote.status >= 500 and control.status < 500:
+            anomalies.append({"point": where, "probe": "quote", "reason": "status",
+                              "detail": f"{control.status} -> {quote.status}"})
+        elif differs(quote, control):
+            anomalies.append({"point": where, "probe": "quote", "reason": "response-diff",
+                              "detail": f"{control.status}/{len(control.body)} -> {quote.status}/{len(quote.body)}"})
+        if differs(responses['bool_true'], responses['bool_false']) and not differs(control, quote):
+            anomalies.append({"point": where, "probe": "bool", "reason": "boolean-diff",
+                              "detail": f"true {responses['bool_true'].status}/{len(responses['bool_true'].body)}, "
+                                        f"false {responses['bool_false'].status}/{len(responses['bool_false'].body)}"})
+        return anomalies
+
+    async def _screen_job(self, pool: ConnectionPool, semaphore: asyncio.Semaphore, job: Dict) -> Dict:
+        async with semaphore:
+            points = injection_points(job, self.probe_headers)
+            result = {"points": len(points), "anomalies": [], "error": None}
+            try:
+                baseline = await self._send(pool, job['method'], job['url'], job.get('data'))
+                for point in points:
+                    result["anomalies"] += await self._screen_point(pool, job, point, baseline)
+            except (HTTPError, OSError, asyncio.TimeoutError) as e:
+                # Не удалось проверить - эндпоинт отдается SQLMap
+                result["error"] = str(e) or type(e).__name__
+            return result
+
+    async def screen(self, jobs: List[Dict]) -> List[Dict]:
+        """Результат для каждого задания (в том же порядке)"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with ConnectionPool(limit_per_host=self.concurrency, timeout=self.timeout,
+                                  headers=self.headers) as pool:
+            results = await asyncio.gather(*(self._screen_job(pool, semaphore, job) for job in jobs))
+            logger.info(f"Пре-скрининг: {pool.requests} запросов, {pool.connections_opened} соединений")
+        return results
+
+    def run(self, jobs: List[Dict]) -> List[Dict]:
+        return asyncio.run(self.screen(jobs))
+
+
+def needs_sqlmap(result: Dict) -> bool:
+    """Эндпоинт отдается SQLMap: найдены аномалии, нет точек внедрения для проб или проверка не удалась"""
+    return bool(result["anomalies"]) or result["points"] == 0 or result["error"] is not None
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - Глобальное ограничение частоты запросов к API
+Token bucket, общий для всех процессов SQLMap, с адаптивным backpressure по задержке ответов
+"""
+
+import logging
+import threading
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Потокобезопасный token bucket: rate токенов в секунду, не более burst накоплено"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate должен быть больше 0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def acquire(self):
+        """Блокирующее получение одного токена"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter:
+    """Token bucket с AIMD-регулировкой по задержке ответов API
+
+    Базовая задержка - минимальное сглаженное (EWMA) значение за прогон.
+    Если текущая EWMA превышает базовую в latency_factor раз (и не меньше
+    чем на min_latency_delta секунд - защита от дрожания на быстрых ответах), частота
+    умножается на decrease_ratio (не ниже min_rate, не чаще раза в
+    cooldown секунд); иначе частота растет на increase_step до max_rate.
+    """
+
+    def __init__(self, max_rate: float, burst: int = 1, min_rate: float = 1.0,
+                 latency_factor: float = 2.0, decrease_ratio: float = 0.5,
+                 increase_step: float = 0.5, smoothing: float = 0.2,
+                 min_latency_delta: float = 0.05, cooldown: float = 1.0):
+        self.max_rate = float(max_rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.latency_factor = latency_factor
+        self.decrease_ratio = decrease_ratio
+        self.increase_step = increase_step
+        self.smoothing = smoothing
+        self.min_latency_delta = min_latency_delta
+        self.cooldown = cooldown
+        self._last_decrease = 0.0
+        self.bucket = TokenBucket(max_rate, burst)
+        self._ewma = None
+        self._baseline = None
+        self._throttled = 0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def acquire(self):
+        self.bucket.acquire()
+
+    def observe(self, latency: float):
+        """Учет задержки одного ответа API (в секундах)"""
+        if self.latency_factor <= 0:
+            return
+        with self._lock:
+            if self._ewma is None:
+                self._ewma = latency
+            else:
+                self._ewma += self.smoothing * (latency - self._ewma)
+            if self._baseline is None or self._ewma < self._baseline:
+                self._baseline = self._ewma
+
+            rate = self.bucket.rate
+            threshold = max(self._baseline * self.latency_factor, self._baseline + self.min_latency_delta)
+            if self._ewma > threshold:
+                now = time.monotonic()
+                new_rate = rate
+                if now - self._last_decrease >= self.cooldown:
+                    new_rate = max(self.min_rate, rate * self.decrease_ratio)
+                if new_rate < rate:
+                    self._last_decrease = now
+                    self._throttled += 1
+                    logger.warning(
+                        f"Рост задержки API: {self._ewma * 1000:.0f} мс "
+                        f"(база {self._baseline * 1000:.0f} мс), частота {rate:.1f} -> {new_rate:.1f} req/s"
+                    )
+            else:
+                new_rate = min(self.max_rate, rate + self.increase_step)
+            if new_rate != rate:
+                self.bucket.set_rate(new_rate)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "rate": round(self.bucket.rate, 2),
+                "max_rate": self.max_rate,
+                "latency_ewma_ms": round((self._ewma or 0) * 1000, 1),
+                "latency_baseline_ms": round((self._baseline or 0) * 1000, 1),
+                "throttled": self._throttled,
+            }
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Realtime Bench - Нагрузочный тест WebSocket шлюзов API (ChatGateway и /diffie-hellman)
+Тысячи аутентифицированных соединений Socket.IO из одного процесса на asyncio:
+вход в чаты, рассылка newMessage участникам комнаты, кольцевой обмен ключами ECDH
+в namespace /diffie-hellman, как у клиентов (dh_engine.py).
+Измеряются задержки подключения и доставки, память на соединение
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .async_http import ConnectionPool, HTTPError
+from .dh_engine import DHEngine, DHParticipant
+from .load_test import PERCENTILES, percentile
+from .socketio_client import SocketIOClient, SocketIOError
+
+try:
+    import resource
+except ImportError:  # не Unix: лимит дескрипторов не поднимается
+    resource = None
+
+# Конфигурация
+API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:3001')
+WS_CONNECTIONS = int(os.getenv('WS_CONNECTIONS', '1000'))
+WS_CHAT_SIZE = int(os.getenv('WS_CHAT_SIZE', '50'))
+WS_ACCOUNTS = int(os.getenv('WS_ACCOUNTS', '100'))
+WS_MESSAGES = int(os.getenv('WS_MESSAGES', '20'))
+WS_MESSAGE_INTERVAL = float(os.getenv('WS_MESSAGE_INTERVAL', '0.5'))
+WS_DH_GROUPS = int(os.getenv('WS_DH_GROUPS', '20'))
+WS_DH_GROUP_SIZE = int(os.getenv('WS_DH_GROUP_SIZE', '2'))
+WS_DH_ROUNDS = int(os.getenv('WS_DH_ROUNDS', '5'))
+WS_DH_WORKERS = int(os.getenv('WS_DH_WORKERS', '0'))
+WS_DH_FRESH_KEYS = int(os.getenv('WS_DH_FRESH_KEYS', '0'))
+WS_CONNECT_CONCURRENCY = int(os.getenv('WS_CONNECT_CONCURRENCY', '100'))
+LOAD_TIMEOUT = int(os.getenv('LOAD_TIMEOUT', '30'))
+LOAD_RESULTS_DIR = os.getenv('LOAD_RESULTS_DIR', './load_results')
+LOAD_PASSWORD = os.getenv('LOAD_PASSWORD', 'loadTestPassword123')
+
+DH_NAMESPACE = '/diffie-hellman'
+
+
+def raise_fd_limit(needed: int):
+    """Мягкий лимит открытых файлов до жесткого: одно соединение - один дескриптор"""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        target = hard if hard == resource.RLIM_INFINITY else min(hard, max(needed, soft))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        if target < needed:
+            print(f"⚠️  Лимит открытых файлов {target} меньше {needed}: увеличьте ulimit -n")
+
+
+def rss_kb(pid='self') -> Optional[int]:
+    """Resident память процесса (Linux /proc), None если недоступна"""
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def jwt_subject(token: str) -> Optional[str]:
+    """userId (sub) из JWT без проверки подписи - нужен для fromClientId/toClientId"""
+    try:
+        payload = token.split('.')[1]
+        return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))).get('sub')
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+def latency_summary(values: List[float]) -> Dict:
+    values = sorted(values)
+    result = {'count': len(values)}
+    for p in PERCENTILES:
+        result[f'p{p}_ms'] = round(percentile(values, p) * 1000, 1)
+    result['max_ms'] = round(values[-1] * 1000, 1) if values else 0.0
+    return result
+
+
+class Account:
+    def __init__(self, email: str, token: str):
+        self.email = email
+        self.token = token
+        self.user_id = jwt_subject(token)
+
+
+class Connection:
+    """Соединение бенчмарка: клиент, пользователь и чат, в который оно входит"""
+
+    def __init__(self, index: int, account: Account, client: SocketIOClient, chat_id: str):
+        self.index = index
+        self.account = account
+        self.client = client
+        self.chat_id = chat_id
+        self.joined: Optional[asyncio.Future] = None
+        self.dh_joined: Optional[asyncio.Future] = None
+        self.dh_participant: Optional[DHParticipant] = None
+        self.dh_finished: Optional[asyncio.Future] = None
+
+
+class RealtimeBench:
+    def __init__(self, base_url: str, connections: int, chat_size: int, accounts: int, messages: int,
+                 interval: float, dh_groups: int, dh_group_size: int, dh_rounds: int, connect_concurrency: int,
+                 timeout: float, server_pid: Optional[int] = None, dh_workers: Optional[int] = None,
+                 dh_fresh_keys: bool = False):
+        self.base_url = base_url.rstrip('/')
+        self.connections = connections
+        self.chat_size = max(1, chat_size)
+        self.account_count = max(1, min(accounts, connections))
+        self.messages = messages
+        self.interval = interval
+        # Участники группы DH - разные пользователи, у каждого единственное соединение с /diffie-hellman
+        self.dh_group_size = max(2, dh_group_size)
+        self.dh_groups = min(dh_groups, self.account_count // self.dh_group_size, connections // self.dh_group_size)
+        self.dh_rounds = dh_rounds
+        self.dh_workers = dh_workers
+        self.dh_fresh_keys = dh_fresh_keys
+        self.dh_handshakes = 0
+        self.dh_matched = 0
+        self.engine: Optional[DHEngine] = None
+        self.connect_concurrency = max(1, connect_concurrency)
+        self.timeout = timeout
+        self.server_pid = server_pid
+        self.run_tag = uuid.uuid4().hex[:8]
+
+        self.accounts: List[Account] = []
+        self.chats: List[str] = []
+        self.conns: List[Connection] = []
+        self.errors = Counter()
+        self.latencies: Dict[str, List[float]] = {name: [] for name in (
+            'connect', 'join', 'rest_send', 'fanout', 'fanout_last', 'dh_hop', 'dh_handshake')}
+        self.memory: Dict[str, Optional[int]] = {}
+        self.users_updates = 0
+        # Отправленные сообщения: id -> [время отправки, ожидается получателей, получено, время последней доставки]
+        self._sent: Dict[str, list] = {}
+        # Отправленные сообщения DH: (чат, от, кому, этап) -> время отправки
+        self._dh_sent: Dict[tuple, float] = {}
+        self._tasks = set()
+
+    async def _rest(self, pool: ConnectionPool, method: str, path: str, body: Dict, token: Optional[str] = None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        return await pool.request(method, self.base_url + path, headers=headers,
+                                  body=json.dumps(body).encode('utf-8'))
+
+    async def _account(self, pool: ConnectionPool, number: int) -> Optional[Account]:
+        email = f"ws-{self.run_tag}-{number}@example.com"
+        try:
+            await self._rest(pool, 'POST', '/users/registration',
+                             {'username': f"ws-{number}", 'email': email, 'password': LOAD_PASSWORD})
+            response = await self._rest(pool, 'POST', '/auth/login', {'email': email, 'password': LOAD_PASSWORD})
+            token = response.json().get('access_token') if response.status < 400 else None
+        except (HTTPError, OSError, ValueError, asyncio.TimeoutError) as e:
+            self.errors[f"account: {e}"] += 1
+            return None
+        return Account(email, token) if token else None
+
+    async def setup(self, pool: ConnectionPool):
+        """Пользователи и чаты через REST: чат на каждые chat_size соединений"""
+        accounts = await asyncio.gather(*(self._account(pool, n) for n in range(self.account_count)))
+        self.accounts = [a for a in accounts if a is not None]
+        if not self.accounts:
+            raise SocketIOError("не удалось создать ни одного пользователя")
+
+        async def create_chat(number: int) -> Optional[str]:
+            owner = self.accounts[number % len(self.accounts)]
+            try:
+                response = await self._rest(pool, 'POST', '/chats', {'name': f"ws-{self.run_tag}-{number}"}, owner.token)
+                return response.json()['id']
+            except (HTTPError, OSError, ValueError, KeyError, TypeError, asyncio.TimeoutError) as e:
+                self.errors[f"chat: {e}"] += 1
+                return None
+
+        self.chats = await asyncio.gather(*(create_chat(n) for n in range(math.ceil(self.connections / self.chat_size))))
+        if None in self.chats:
+            raise SocketIOError("не удалось создать чаты")
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # --- обработчики событий ---
+
+    def _on_users_update(self, conn: Connection, data):
+        self.users_updates += 1
+        if conn.joined is not None and not conn.joined.done() and isinstance(data, dict) \
+                and data.get('chatId') == conn.chat_id:
+            conn.joined.set_result(time.perf_counter())
+
+    def _on_new_message(self, data):
+        received = time.perf_counter()
+        content = data.get('content', '') if isinstance(data, dict) else ''
+        sent = self._sent.get(content)
+        if sent is None:
+            return
+        self.latencies['fanout'].append(received - sent[0])
+        sent[2] += 1
+        sent[3] = received
+
+    def _on_dh_joined(self, conn: Connection):
+        if conn.dh_joined is not None and not conn.dh_joined.done():
+            conn.dh_joined.set_result(time.perf_counter())
+
+    def _on_dh_message(self, conn: Connection, data):
+        received = time.perf_counter()
+        if not isinstance(data, dict):
+            return
+        sent = self._dh_sent.pop((data.get('chatId'), data.get('fromClientId'), data.get('toClientId'),
+                                  data.get('stage')), None)
+        if sent is not None:
+            self.latencies['dh_hop'].append(received - sent)
+        if conn.dh_participant is not None:
+            self._spawn(self._dh_handle(conn, data))
+
+    async def _dh_send(self, conn: Connection, message: Dict):
+        self._dh_sent[(message['chatId'], message['fromClientId'], message['toClientId'],
+                       message['stage'])] = time.perf_counter()
+        await conn.client.emit('dh-send', message, DH_NAMESPACE)
+
+    async def _dh_handle(self, conn: Connection, message: Dict):
+        """Этап обмена: секрет вычисляется в пуле процессов, ответ пересылается следующему участнику"""
+        participant, finished = conn.dh_participant, conn.dh_finished
+        try:
+            reply = await participant.handle(message)
+        except (ValueError, KeyError, TypeError) as e:
+            self.errors[f"dh: {e}"] += 1
+            return
+        if reply is not None:
+            await self._dh_send(conn, reply)
+        elif not finished.done():
+            finished.set_result(participant.shared_secret)
+
+    def _on_dh_error(self, data):
+        message = data.get('message') if isinstance(data, dict) else data
+        self.errors[f"dh-error: {message}"] += 1
+
+    # --- этапы ---
+
+    async def _open(self, index: int, semaphore: asyncio.Semaphore) -> Optional[Connection]:
+        account = self.accounts[index % len(self.accounts)]
+        client = SocketIOClient(self.base_url, account.token, self.timeout)
+        conn = Connection(index, account, client, self.chats[index // self.chat_size])
+        client.on('chatUsersUpdate', lambda data: self._on_users_update(conn, data))
+        client.on('newMessage', self._on_new_message)
+        namespaces = ['/']
+        if index < self.dh_groups * self.dh_group_size:
+            namespaces.append(DH_NAMESPACE)
+            client.on('dh-joined', lambda data: self._on_dh_joined(conn), DH_NAMESPACE)
+            client.on('dh-message', lambda data: self._on_dh_message(conn, data), DH_NAMESPACE)
+            client.on('dh-error', self._on_dh_error, DH_NAMESPACE)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.connect(namespaces)
+            except (SocketIOError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                self.errors[f"connect: {e or type(e).__name__}"] += 1
+                await client.close()
+                return None
+        self.latencies['connect'].append(time.perf_counter() - started)
+        return conn
+
+    async def connect_all(self):
+        semaphore = asyncio.Semaphore(self.connect_concurrency)
+        self.memory['client_rss_before_kb'] = rss_kb()
+        if self.server_pid:
+            self.memory['server_rss_before_kb'] = rss_kb(self.server_pid)
+        conns = await asyncio.gather(*(self._open(i, semaphore) for i in range(self.connections)))
+        self.conns = [c for c in conns if c is not None]
+        # Даем серверу завершить обработку подключений перед замером памяти
+        await asyncio.sleep(1)
+        self.memory['client_rss_after_kb'] = rss_kb()
+        if self.server_pid:
+            self.memory['server_rss_after_kb'] = rss_kb(self.server_pid)
+
+    async def join_all(self):
+        loop = asyncio.get_running_loop()
+
+        async def join(conn: Connection):
+            conn.joined = loop.create_future()
+            started = time.perf_counter()
+            await conn.client.emit('joinChat', {'chatId': conn.chat_id})
+            try:
+                self.latencies['join'].append(await asyncio.wait_for(conn.joined, self.timeout) - started)
+            except asyncio.TimeoutError:
+                conn.joined = None
+                self.errors['join: timeout'] += 1
+
+        await asyncio.gather(*(join(conn) for conn in self.conns))
+
+    async def send_messages(self, pool: ConnectionPool):
+        """Сообщения через REST: сервис сохраняет их и ChatGateway рассылает newMessage комнате"""
+        members = Counter(conn.chat_id for conn in self.conns if conn.joined is not None)
+
+        async def chat_sender(number: int, chat_id: str):
+            owner = self.accounts[number % len(self.accounts)]
+            for n in range(self.messages):
+                content = f"bench:{self.run_tag}:{number}:{n}"
+                started = time.perf_counter()
+                self._sent[content] = [started, members[chat_id], 0, None]
+                try:
+                    response = await self._rest(pool, 'POST', f'/messages/{chat_id}',
+                                                {'content': content, 'type': 'text'}, owner.token)
+                    if response.status >= 400:
+                        self.errors[f"send: HTTP {response.status}"] += 1
+                except (HTTPError, OSError, asyncio.TimeoutError) as e:
+                    self.errors[f"send: {e}"] += 1
+                self.latencies['rest_send'].append(time.perf_counter() - started)
+                await asyncio.sleep(self.interval)
+
+        await asyncio.gather(*(chat_sender(n, chat_id) for n, chat_id in enumerate(self.chats)))
+
+        # Ожидание оставшихся доставок
+        deadline = time.perf_counter() + self.timeout
+        while time.perf_counter() < deadline and any(s[2] < s[1] for s in self._sent.values()):
+            await asyncio.sleep(0.1)
+        for started, expected, received, last in self._sent.values():
+            if last is not None and received >= expected:
+                self.latencies['fanout_last'].append(last - started)
+
+    async def exchange_keys(self):
+        """Группы соединений: dh-join всех участников, затем кольцевой обмен ключами dh_rounds раз"""
+        loop = asyncio.get_running_loop()
+        by_index = {conn.index: conn for conn in self.conns}
+        size = self.dh_group_size
+        groups = [[by_index.get(g * size + i) for i in range(size)] for g in range(self.dh_groups)]
+        groups = [members for members in groups if None not in members]
+
+        async def group_exchange(members: List[Connection]):
+            chat_id = members[0].chat_id
+            for conn in members:
+                conn.dh_joined = loop.create_future()
+                await conn.client.emit('dh-join', {'chatId': chat_id}, DH_NAMESPACE)
+            try:
+                await asyncio.wait_for(asyncio.gather(*(conn.dh_joined for conn in members)), self.timeout)
+            except asyncio.TimeoutError:
+                self.errors['dh-join: timeout'] += 1
+                return
+            users = [conn.account.user_id for conn in members]
+            for _ in range(self.dh_rounds):
+                started = time.perf_counter()
+                for conn in members:
+                    conn.dh_participant = DHParticipant(self.engine, conn.account.user_id, chat_id, users)
+                    conn.dh_finished = loop.create_future()
+                # Ключи всех участников готовы до первой отправки: этап 1 может прийти раньше своего старта
+                first_messages = await asyncio.gather(*(conn.dh_participant.start() for conn in members))
+                for conn, message in zip(members, first_messages):
+                    await self._dh_send(conn, message)
+                try:
+                    secrets = await asyncio.wait_for(
+                        asyncio.gather(*(conn.dh_finished for conn in members)), self.timeout)
+                except asyncio.TimeoutError:
+                    self.errors['dh: timeout'] += 1
+                    continue
+                self.latencies['dh_handshake'].append(time.perf_counter() - started)
+                self.dh_handshakes += 1
+                # Вдвоем секреты совпадают; в кольце больше двух клиент пересылает ключ новой случайной пары
+                if size == 2 and secrets[0] == secrets[1]:
+                    self.dh_matched += 1
+            for conn in members:
+                conn.dh_participant = None
+
+        await asyncio.gather(*(group_exchange(members) for members in groups))
+
+    async def close_all(self):
+        await asyncio.gather(*(conn.client.close() for conn in self.conns), return_exceptions=True)
+
+    async def run(self) -> Dict:
+        raise_fd_limit(self.connections + 256)
+        started = time.perf_counter()
+        async with ConnectionPool(limit_per_host=32, timeout=self.timeout) as pool:
+            print(f"👤 Пользователи и чаты: {self.account_count} пользователей, {math.ceil(self.connections / self.chat_size)} чатов")
+            await self.setup(pool)
+            print(f"🔌 Подключение {self.connections} соединений (одновременно {self.connect_concurrency})")
+            await self.connect_all()
+            print(f"💬 Вход в чаты: {len(self.conns)} соединений")
+            await self.join_all()
+            if self.messages:
+                print(f"📨 Рассылка: {self.messages} сообщений в каждый из {len(self.chats)} чатов")
+                await self.send_messages(pool)
+            if self.dh_groups and self.dh_rounds:
+                members = self.dh_groups * self.dh_group_size
+                print(f"🔑 Обмен ключами DH: {self.dh_groups} групп по {self.dh_group_size} x {self.dh_rounds}")
+                async with DHEngine(self.dh_workers, pool_size=min(1024, max(64, 2 * members)),
+                                    reuse=not self.dh_fresh_keys) as engine:
+                    self.engine = engine
+                    await self.exchange_keys()
+            await self.close_all()
+
+        expected = sum(s[1] for s in self._sent.values())
+        delivered = sum(min(s[2], s[1]) for s in self._sent.values())
+        connected = len(self.conns)
+        memory = dict(self.memory)
+        for side in ('client', 'server'):
+            before, after = memory.get(f'{side}_rss_before_kb'), memory.get(f'{side}_rss_after_kb')
+            if before is not None and after is not None and connected:
+                memory[f'{side}_kb_per_connection'] = round((after - before) / connected, 1)
+
+        return {
+            'summary': {
+                'base_url': self.base_url,
+                'test_date': datetime.now().isoformat(),
+                'duration_sec': round(time.perf_counter() - started, 1),
+                'connections': self.connections,
+                'connected': connected,
+                'chats': len(self.chats),
+                'chat_size': self.chat_size,
+                'accounts': len(self.accounts),
+                'messages_sent': len(self._sent),
+                'deliveries_expected': expected,
+                'deliveries': delivered,
+                'delivery_ratio': round(delivered / expected, 4) if expected else None,
+                'chat_users_updates': self.users_updates,
+                'dh_groups': self.dh_groups,
+                'dh_group_size': self.dh_group_size,
+                'dh_handshakes': self.dh_handshakes,
+                'dh_secrets_matched': self.dh_matched if self.dh_group_size == 2 else None,
+            },
+            'dh_engine': self.engine.stats if self.engine is not None else None,
+            'latency': {name: latency_summary(values) for name, values in self.latencies.items() if values},
+            'memory': memory,
+            'errors': dict(self.errors.most_common()),
+        }
+
+
+def print_report(report: Dict):
+    s = report['summary']
+    print(f"\n{'=' * 100}")
+    print(f"Соединений: {s['connected']}/{s['connections']}, чатов: {s['chats']} по {s['chat_size']}, "
+          f"длительность: {s['duration_sec']} с")
+    print(f"Доставлено newMessage: {s['deliveries']}/{s['deliveries_expected']}, "
+          f"chatUsersUpdate получено: {s['chat_users_updates']}")
+    if s['dh_groups']:
+        engine = report['dh_engine'] or {}
+        matched = f", секреты совпали: {s['dh_secrets_matched']}" if s['dh_secrets_matched'] is not None else ''
+        print(f"Обменов DH: {s['dh_handshakes']} ({s['dh_groups']} групп по {s['dh_group_size']}){matched}; "
+              f"ECDH: {engine.get('backend')}, процессов {engine.get('workers')}, "
+              f"пар ключей {engine.get('generated')}, секретов {engine.get('derived')} за {engine.get('derive_batches')} пачек")
+    print(f"{'=' * 100}")
+    print(f"{'этап':<16} {'кол-во':>8} {'p50':>9} {'p90':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, l in report['latency'].items():
+        print(f"{name:<16} {l['count']:>8} {l['p50_ms']:>9} {l['p90_ms']:>9} {l['p95_ms']:>9} "
+              f"{l['p99_ms']:>9} {l['max_ms']:>9}")
+    print("\nЗадержки в мс; fanout - каждая доставка, fanout_last - до последнего участника комнаты,")
+    print("dh_hop - пересылка dh-send получателю, dh_handshake - обмен до секрета у всех участников группы")
+    memory = report['memory']
+    for side, title in (('client', 'Клиент'), ('server', 'Сервер')):
+        if f'{side}_kb_per_connection' in memory:
+            print(f"{title}: {memory[f'{side}_rss_before_kb']} -> {memory[f'{side}_rss_after_kb']} КБ RSS, "
+                  f"~{memory[f'{side}_kb_per_connection']} КБ на соединение")
+    if report['errors']:
+        print("\nОшибки:")
+        for error, count in report['errors'].items():
+            print(f"  {count:>6}  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест WebSocket шлюзов (Socket.IO)")
+    parser.add_argument('--connections', type=int, default=WS_CONNECTIONS, help=f"Соединений (по умолчанию {WS_CONNECTIONS})")
+    parser.add_argument('--chat-size', type=int, default=WS_CHAT_SIZE, help=f"Соединений в одном чате (по умолчанию {WS_CHAT_SIZE})")
+    parser.add_argument('--accounts', type=int, default=WS_ACCOUNTS, help=f"Пользователей, соединения распределяются между ними (по умолчанию {WS_ACCOUNTS})")
+    parser.add_argument('--messages', type=int, default=WS_MESSAGES, help=f"Сообщений в каждый чат (по умолчанию {WS_MESSAGES})")
+    parser.add_argument('--interval', type=float, default=WS_MESSAGE_INTERVAL, help=f"Пауза между сообщениями чата, с (по умолчанию {WS_MESSAGE_INTERVAL:g})")
+    parser.add_argument('--dh-groups', type=int, default=WS_DH_GROUPS, help=f"Групп для обмена ключами DH (по умолчанию {WS_DH_GROUPS})")
+    parser.add_argument('--dh-group-size', type=int, default=WS_DH_GROUP_SIZE, help=f"Участников в группе (по умолчанию {WS_DH_GROUP_SIZE})")
+    parser.add_argument('--dh-rounds', type=int, default=WS_DH_ROUNDS, help=f"Обменов на группу (по умолчанию {WS_DH_ROUNDS})")
+    parser.add_argument('--dh-workers', type=int, default=WS_DH_WORKERS, help="Процессов для вычислений ECDH (по умолчанию: число CPU)")
+    parser.add_argument('--dh-fresh-keys', action='store_true', default=bool(WS_DH_FRESH_KEYS),
+                        help="Новая пара ключей на каждый обмен вместо пула переиспользуемых")
+    parser.add_argument('--concurrency', type=int, default=WS_CONNECT_CONCURRENCY, help=f"Одновременных подключений (по умолчанию {WS_CONNECT_CONCURRENCY})")
+    parser.add_argument('--server-pid', type=int, help="PID процесса API на этой машине - замер его памяти")
+    parser.add_argument('--url', default=API_BASE_URL, help=f"URL API (по умолчанию {API_BASE_URL})")
+    args = parser.parse_args()
+
+    bench = RealtimeBench(args.url, args.connections, args.chat_size, args.accounts, args.messages, args.interval,
+                          args.dh_groups, args.dh_group_size, args.dh_rounds, args.concurrency, LOAD_TIMEOUT,
+                          args.server_pid, args.dh_workers or None, args.dh_fresh_keys)
+    try:
+        report = asyncio.run(bench.run())
+    except (SocketIOError, HTTPError, OSError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print_report(report)
+
+    os.makedirs(LOAD_RESULTS_DIR, exist_ok=True)
+    report_path = os.path.join(LOAD_RESULTS_DIR, f"realtime_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"📄 Отчет: {report_path}")
+    sys.exit(0 if report['summary']['connected'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""
+SQLMap Report Generator - Генератор HTML отчетов
+Reporter строит отчет из JSON файла, из отчета Scanner.run() или из базы результатов
+"""
+
+import html
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+def technique_label(result: dict) -> str:
+    """Подпись с техниками SQLMap задания (отчеты до разделения по полосам ее не содержат)"""
+    if not result.get('technique'):
+        return ''
+    return f" · Техники: {result['technique']}"
+
+
+def details_link(result: dict) -> str:
+    """Ссылка на детальные результаты: каталог задания или запись в базе результатов"""
+    if result.get('job_id'):
+        db_path = result['output_dir'].split('#', 1)[0]
+        return (f"<code>python3 results_store.py {html.escape(db_path)} show {result['job_id']}</code>")
+    return f"""<a href="file://{result['output_dir']}" target="_blank">
+                            Открыть детальный отчет
+                        </a>"""
+
+
+def finding_excerpts(result: dict, max_lines: int = 40) -> list:
+    """Фрагменты вывода SQLMap с найденными инъекциями по индексу сжатого лога"""
+    from .log_capture import read_excerpt
+    
+    findings = result.get('findings')
+    if not findings:
+        return []
+    try:
+        if result.get('job_id'):
+            from .results_store import ResultsStore
+            store = ResultsStore(result['output_dir'].split('#', 1)[0])
+            try:
+                return store.job_excerpts(result['job_id'], max_lines)
+            finally:
+                store.close()
+        with open(os.path.join(result['output_dir'], 'stdout.log.gz'), 'rb') as f:
+            return [read_excerpt(f, finding['offset'], max_lines) for finding in findings]
+    except (OSError, KeyError) as e:
+        # Лог удален или перенесен: отчет строится без фрагментов
+        logger.warning(f"Фрагменты для {result['endpoint']} недоступны: {e}")
+        return []
+
+
+def excerpts_html(result: dict) -> str:
+    """Блоки найденных инъекций, встроенные в карточку эндпоинта"""
+    blocks = ''
+    for number, excerpt in enumerate(finding_excerpts(result), 1):
+        line = result['findings'][number - 1].get('line', '?')
+        blocks += f"""
+                    <details class="excerpt">
+                        <summary>Фрагмент вывода SQLMap #{number} (строка {line})</summary>
+                        <pre>{html.escape(excerpt)}</pre>
+                    </details>"""
+    return blocks
+
+
+def anomalies_html(result: dict) -> str:
+    """Аномалии WS-фаззинга события: точка, нагрузка, причина"""
+    anomalies = result.get('anomalies')
+    if not anomalies:
+        return ''
+    rows = '\n'.join(
+        f"{a['point']:<14} {a['probe']:<10} {a['reason']:<14} {a['detail']}" for a in anomalies
+    )
+    return f"""
+                    <details class="excerpt">
+                        <summary>Аномалии WS-фаззинга: {len(anomalies)} (проб: {result.get('probes', '?')})</summary>
+                        <pre>{html.escape(rows)}</pre>
+                    </details>"""
+
+
+def render_html(report: dict) -> str:
+    """HTML отчета прогона (summary и results, как в final_report_*.json)"""
+    summary = report['summary']
+    results = report['results']
+    
+    # Подсчет статистики
+    vulnerable_count = summary['vulnerable_endpoints']
+    safe_count = summary['safe_endpoints']
+    total_count = summary['total_endpoints']
+    # Прогон из базы сразу после start_run еще без заданий
+    safe_percent = safe_count / total_count * 100 if total_count else 0.0
+    
+    vulnerable_results = [r for r in results if r.get('vulnerable', False)]
+    
+    # HTML шаблон
+    html = f"""
+<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>SQLMap Security Report - Chat Diffie-Hellman API</title>
+    <style>
+        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }}
+        
+        body {{
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 20px;
+            color: #333;
+        }}
+        
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 10px;
+            box-shadow: 0 10px 40px rgba(0,0,0,0.2);
+            overflow: hidden;
+        }}
+        
+        .header {{
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 40px;
+            text-align: center;
+        }}
+        
+        .header h1 {{
+            font-size: 2.5em;
+            margin-bottom: 10px;
+        }}
+        
+        .header p {{
+            font-size: 1.1em;
+            opacity: 0.9;
+        }}
+        
+        .summary {{
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+            gap: 20px;
+            padding: 40px;
+            background: #f8f9fa;
+        }}
+        
+        .summary-card {{
+            background: white;
+            padding: 25px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            text-align: center;
+            transition: transform 0.3s;
+        }}
+        
+        .summary-card:hover {{
+            transform: translateY(-5px);
+        }}
+        
+        .summary-card h3 {{
+            color: #666;
+            font-size: 0.9em;
+            text-transform: uppercase;
+            margin-bottom: 10px;
+            letter-spacing: 1px;
+        }}
+        
+        .summary-card .number {{
+            font-size: 3em;
+            font-weight: bold;
+            margin: 10px 0;
+        }}
+        
+        .summary-card.total .number {{
+            color: #667eea;
+        }}
+        
+        .summary-card.vulnerable .number {{
+            color: #e74c3c;
+        }}
+        
+        .summary-card.safe .number {{
+            color: #27ae60;
+        }}
+        
+        .content {{
+            padding: 40px;
+        }}
+        
+        .section {{
+            margin-bottom: 40px;
+        }}
+        
+        .section h2 {{
+            color: #667eea;
+            border-bottom: 3px solid #667eea;
+            padding-bottom: 10px;
+            margin-bottom: 20px;
+        }}
+        
+        .endpoint-card {{
+            background: #f8f9fa;
+            border-left: 4px solid #e74c3c;
+            padding: 20px;
+            margin-bottom: 20px;
+            border-radius: 5px;
+        }}
+        
+        .endpoint-header {{
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-bottom: 15px;
+        }}
+        
+        .endpoint-name {{
+            font-size: 1.3em;
+            font-weight: bold;
+            color: #333;
+        }}
+        
+        .method {{
+            display: inline-block;
+            padding: 5px 15px;
+            border-radius: 20px;
+            font-weight: bold;
+            font-size: 0.85em;
+            color: white;
+        }}
+        
+        .method.GET {{
+            background: #3498db;
+        }}
+        
+        .method.POST {{
+            background: #27ae60;
+        }}
+        
+        .method.PUT {{
+            background: #f39c12;
+        }}
+        
+        .method.DELETE {{
+            background: #e74c3c;
+        }}
+        
+        .method.WS {{
+            background: #8e44ad;
+        }}
+        
+        .endpoint-url {{
+            color: #666;
+            font-family: 'Courier New', monospace;
+            margin-bottom: 10px;
+            word-break: break-all;
+        }}
+        
+        .timestamp {{
+            color: #999;
+            font-size: 0.9em;
+        }}
+        
+        .status {{
+            display: inline-block;
+            padding: 5px 15px;
+            border-radius: 20px;
+            font-weight: bold;
+            font-size: 0.85em;
+        }}
+        
+        .status.vulnerable {{
+            background: #e74c3c;
+            color: white;
+        }}
+        
+        .status.safe {{
+            background: #27ae60;
+            color: white;
+        }}
+        
+        .no-vulnerabilities {{
+            text-align: center;
+            padding: 40px;
+            color: #27ae60;
+            font-size: 1.2em;
+        }}
+        
+        .no-vulnerabilities::before {{
+            content: "✓";
+            display: block;
+            font-size: 4em;
+            margin-bottom: 20px;
+        }}
+        
+        .footer {{
+            background: #2c3e50;
+            color: white;
+            text-align: center;
+            padding: 20px;
+            font-size: 0.9em;
+        }}
+        
+        .chart {{
+            max-width: 400px;
+            margin: 30px auto;
+        }}
+        
+        .excerpt {{
+            margin-top: 10px;
+        }}
+        
+        .excerpt summary {{
+            cursor: pointer;
+            color: #e74c3c;
+        }}
+        
+        .excerpt pre {{
+            background: #2c3e50;
+            color: #ecf0f1;
+            padding: 15px;
+            border-radius: 5px;
+            overflow-x: auto;
+            font-size: 0.85em;
+            margin-top: 10px;
+        }}
+        
+        @media print {{
+            body {{
+                background: white;
+                padding: 0;
+            }}
+            
+            .container {{
+                box-shadow: none;
+            }}
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🔒 SQLMap Security Report</h1>
+            <p>Chat Diffie-Hellman API Security Testing</p>
+            <p style="margin-top: 10px;">Дата тестирования: {summary['test_date']}</p>
+        </div>
+        
+        <div class="summary">
+            <div class="summary-card total">
+                <h3>Всего эндпоинтов</h3>
+                <div class="number">{total_count}</div>
+                <p>Протестировано</p>
+            </div>
+            
+            <div class="summary-card vulnerable">
+                <h3>Уязвимые</h3>
+                <div class="number">{vulnerable_count}</div>
+                <p>Требуют внимания</p>
+            </div>
+            
+            <div class="summary-card safe">
+                <h3>Безопасные</h3>
+                <div class="number">{safe_count}</div>
+                <p>Защищены</p>
+            </div>
+        </div>
+        
+        <div class="content">
+            <div class="section">
+                <h2>📊 Статистика безопасности</h2>
+                <p><strong>Базовый URL:</strong> {summary['base_url']}</p>
+                <p><strong>Процент безопасности:</strong> {safe_percent:.1f}%</p>
+            </div>
+"""
+    
+    if vulnerable_count > 0:
+        html += """
+            <div class="section">
+                <h2>⚠️ Обнаруженные уязвимости</h2>
+                <p style="color: #e74c3c; margin-bottom: 20px;">
+                    <strong>Внимание!</strong> Найдены потенциальные SQL-инъекции. 
+                    Требуется немедленное исправление.
+                </p>
+"""
+        
+        for result in vulnerable_results:
+            html += f"""
+                <div class="endpoint-card">
+                    <div class="endpoint-header">
+                        <div class="endpoint-name">{result['endpoint']}</div>
+                        <span class="status vulnerable">УЯЗВИМ</span>
+                    </div>
+                    <div>
+                        <span class="method {result['method']}">{result['method']}</span>
+                        <span class="endpoint-url">{result['url']}</span>
+                    </div>
+                    <div class="timestamp">Тестирование: {result['timestamp']}{technique_label(result)}</div>
+                    <p style="margin-top: 10px;">
+                        <strong>Результаты:</strong> 
+                        {details_link(result)}
+                    </p>{excerpts_html(result)}{anomalies_html(result)}
+                </div>
+"""
+        
+        html += """
+            </div>
+"""
+    else:
+        html += """
+            <div class="section">
+                <div class="no-vulnerabilities">
+                    <strong>Поздравляем!</strong><br>
+                    SQL-инъекции не обнаружены.<br>
+                    Все протестированные эндпоинты безопасны.
+                </div>
+            </div>
+"""
+    
+    html += """
+            <div class="section">
+                <h2>📋 Все результаты тестирования</h2>
+"""
+    
+    for result in results:
+        is_vulnerable = result.get('vulnerable', False)
+        status_class = 'vulnerable' if is_vulnerable else 'safe'
+        status_text = 'УЯЗВИМ' if is_vulnerable else 'БЕЗОПАСЕН'
+        card_style = 'border-left-color: #e74c3c;' if is_vulnerable else 'border-left-color: #27ae60;'
+        
+        html += f"""
+                <div class="endpoint-card" style="{card_style}">
+                    <div class="endpoint-header">
+                        <div class="endpoint-name">{result['endpoint']}</div>
+                        <span class="status {status_class}">{status_text}</span>
+                    </div>
+                    <div>
+                        <span class="method {result['method']}">{result['method']}</span>
+                        <span class="endpoint-url">{result['url']}</span>
+                    </div>
+                    <div class="timestamp">Тестирование: {result['timestamp']}{technique_label(result)}</div>{anomalies_html(result) if not is_vulnerable else ''}
+                </div>
+"""
+    
+    html += f"""
+            </div>
+        </div>
+        
+        <div class="footer">
+            <p>Отчет сгенерирован автоматически SQLMap Automation Script</p>
+            <p>© 2025 Chat Diffie-Hellman API Security Testing</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+    
+    return html
+
+
+def generate_html_report(report_json_path: Optional[str], output_html_path: str, report: dict = None):
+    """Генерация HTML отчета из JSON (или из готового отчета, например из базы результатов)"""
+    
+    # Загрузка JSON отчета
+    if report is None:
+        with open(report_json_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    
+    # HTML строим до открытия файла: ошибка рендера не затирает прежний отчет
+    html = render_html(report)
+
+    # Сохранение HTML
+    with open(output_html_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    
+    logger.info(f"HTML отчет сохранен: {output_html_path}")
+
+
+def generate_store_report(db_path: str, run_id: str = 'latest', output_html_path: str = None) -> str:
+    """Генерация HTML отчета прогона из базы результатов (results_store.py)"""
+    from .results_store import ResultsStore
+    
+    store = ResultsStore(db_path)
+    try:
+        run_id = store.latest_run_id() if run_id == 'latest' else int(run_id)
+        if run_id is None:
+            raise KeyError(f"В базе {db_path} нет прогонов")
+        report = store.report(run_id)
+    finally:
+        store.close()
+    
+    if not output_html_path:
+        output_html_path = os.path.join(os.path.dirname(db_path) or '.', f"run_{run_id}.html")
+    generate_html_report(db_path, output_html_path, report=report)
+    return output_html_path
+
+
+def watch_results(results_dir: str, debounce: float = 2.0, use_inotify: bool = True):
+    """Пересборка HTML при появлении отчетов и заданий в sqlmap_results/"""
+    import fnmatch
+    from .file_watcher import FileWatcher
+    
+    def rebuild(paths):
+        databases = set()
+        for path in sorted(paths):
+            name = os.path.basename(path)
+            if fnmatch.fnmatch(name, 'final_report_*.json') and os.path.exists(path):
+                # Пересобирается только HTML измененного отчета
+                generate_html_report(path, path.replace('.json', '.html'))
+            elif '.sqlite3' in name:
+                # Запись в WAL режиме меняет results.sqlite3-wal, а не саму базу
+                databases.add(path.split('.sqlite3', 1)[0] + '.sqlite3')
+        for db_path in sorted(databases):
+            if os.path.exists(db_path):
+                generate_store_report(db_path, 'latest')
+    
+    FileWatcher(results_dir, ['final_report_*.json', '*.sqlite3', '*.sqlite3-wal'], rebuild,
+                debounce=debounce, use_inotify=use_inotify).run()
+
+
+class Reporter:
+    """HTML отчеты прогонов для вызова из Python (CI, нагрузочные тесты)
+
+    report - словарь финального отчета: результат Scanner.run(),
+    содержимое final_report_*.json или ResultsStore.report().
+    """
+
+    def render(self, report: Dict) -> str:
+        return render_html(report)
+
+    def write(self, report: Dict, output_html_path: str) -> str:
+        generate_html_report(None, output_html_path, report=report)
+        return output_html_path
+
+    def from_json(self, report_json_path: str, output_html_path: Optional[str] = None) -> str:
+        output_html_path = output_html_path or report_json_path.replace('.json', '.html')
+        generate_html_report(report_json_path, output_html_path)
+        return output_html_path
+
+    def from_store(self, db_path: str, run_id: str = 'latest', output_html_path: Optional[str] = None) -> str:
+        return generate_store_report(db_path, run_id, output_html_path)
+
+    def watch(self, results_dir: str, debounce: float = 2.0, use_inotify: bool = True):
+        watch_results(results_dir, debounce=debounce, use_inotify=use_inotify)
+
+
+def main():
+    """Главная функция"""
+    
+    # Сообщения генератора - в консоль, при --watch с временем пересборки
+    watch = len(sys.argv) >= 2 and sys.argv[1] == '--watch'
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout,
+                        format='%(asctime)s - %(message)s' if watch else '%(message)s')
+    
+    if len(sys.argv) < 2:
+        print("SQLMap Report Generator")
+        print("\nИспользование:")
+        print("  python3 generate_report.py <json_report_path> [output_html_path]")
+        print("  python3 generate_report.py --store <results_db> [run_id|latest] [output_html_path]")
+        print("  python3 generate_report.py --watch [results_dir] [--poll]")
+        print("\nПример:")
+        print("  python3 generate_report.py sqlmap_results/final_report_20251111_150000.json")
+        print("  python3 generate_report.py --store sqlmap_results/results.sqlite3")
+        print("  python3 generate_report.py --watch sqlmap_results")
+        return
+    
+    if sys.argv[1] == '--watch':
+        args = [arg for arg in sys.argv[2:] if arg != '--poll']
+        results_dir = args[0] if args else 'sqlmap_results'
+        if not os.path.isdir(results_dir):
+            print(f"Ошибка: каталог {results_dir} не найден")
+            return
+        watch_results(results_dir, use_inotify='--poll' not in sys.argv)
+        return
+    
+    if sys.argv[1] == '--store':
+        if len(sys.argv) < 3 or not os.path.exists(sys.argv[2]):
+            print("Ошибка: укажите существующую базу результатов")
+            return
+        run_id = sys.argv[3] if len(sys.argv) >= 4 else 'latest'
+        html_path = sys.argv[4] if len(sys.argv) >= 5 else None
+        try:
+            html_path = generate_store_report(sys.argv[2], run_id, html_path)
+            print(f"\nОткройте отчет в браузере:")
+            print(f"  file://{os.path.abspath(html_path)}")
+        except Exception as e:
+            print(f"Ошибка при генерации отчета: {e}")
+        return
+    
+    json_path = sys.argv[1]
+    
+    if not os.path.exists(json_path):
+        print(f"Ошибка: Файл {json_path} не найден")
+        return
+    
+    # Определение пути для HTML
+    if len(sys.argv) >= 3:
+        html_path = sys.argv[2]
+    else:
+        html_path = json_path.replace('.json', '.html')
+    
+    try:
+        generate_html_report(json_path, html_path)
+        print(f"\nОткройте отчет в браузере:")
+        print(f"  file://{os.path.abspath(html_path)}")
+    except Exception as e:
+        print(f"Ошибка при генерации отчета: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
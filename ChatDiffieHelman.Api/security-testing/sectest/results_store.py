@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Results Store - Единое хранилище результатов SQLMap (SQLite)
+Задания индексируются по прогону, operationId и статусу, логи хранятся сжатыми
+"""
+
+import gzip
+import json
+import sqlite3
+import sys
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
+
+from .log_capture import read_excerpt
+
+# Статусы заданий
+STATUS_VULNERABLE = 'vulnerable'
+STATUS_SAFE = 'safe'
+STATUS_TIMEOUT = 'timeout'
+STATUS_ERROR = 'error'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  TEXT NOT NULL,
+    finished_at TEXT,
+    base_url    TEXT NOT NULL,
+    summary     TEXT
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id        INTEGER NOT NULL REFERENCES runs(id),
+    operation_id  TEXT NOT NULL,
+    technique     TEXT,
+    lane          TEXT,
+    method        TEXT NOT NULL,
+    url           TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    return_code   INTEGER,
+    timestamp     TEXT NOT NULL,
+    request_info  TEXT NOT NULL,
+    stdout        BLOB,
+    stderr        BLOB,
+    log_index     TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_run ON jobs(run_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_operation ON jobs(operation_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+"""
+
+
+def redact(text: str, secrets: Iterable[str]) -> str:
+    """Удаление секретов (JWT токен и т.п.) из строки перед сохранением"""
+    for secret in secrets:
+        if secret:
+            text = text.replace(secret, '***')
+    return text
+
+
+def compress_log(text: Union[str, bytes]) -> bytes:
+    """Сжатие лога; bytes - уже сжатый gzip поток из log_capture, хранится как есть"""
+    if isinstance(text, bytes):
+        return text
+    return zlib.compress(text.encode('utf-8'), 6)
+
+
+def decompress_log(blob: Optional[bytes]) -> str:
+    if not blob:
+        return ''
+    if blob[:2] == b'\x1f\x8b':
+        return gzip.decompress(blob).decode('utf-8', errors='replace')
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def job_status(result: Dict) -> str:
+    """Статус задания по результату _run_sqlmap"""
+    if result.get('error') == 'timeout':
+        return STATUS_TIMEOUT
+    if result.get('error'):
+        return STATUS_ERROR
+    return STATUS_VULNERABLE if result.get('vulnerable') else STATUS_SAFE
+
+
+class ResultsStore:
+    """Append-only хранилище прогонов и заданий SQLMap
+
+    Одна база вместо каталога на задание: request_info, stdout и stderr
+    каждого задания - одна строка таблицы jobs, логи сжаты (gzip из
+    log_capture или zlib), log_index - смещения блоков найденных инъекций
+    (для событий WS-фаззинга - найденные аномалии).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        # Базы, созданные до появления индекса логов
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if 'log_index' not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN log_index TEXT")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def start_run(self, base_url: str) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, base_url) VALUES (?, ?)",
+                (datetime.now().isoformat(), base_url)
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def finish_run(self, run_id: int, summary: Dict):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, summary = ? WHERE id = ?",
+                (datetime.now().isoformat(), json.dumps(summary, ensure_ascii=False), run_id)
+            )
+            self._conn.commit()
+
+    def add_job(self, run_id: int, result: Dict, request_info: Dict,
+                stdout: Union[str, bytes] = '', stderr: Union[str, bytes] = '',
+                log_index: Optional[Dict] = None) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                """INSERT INTO jobs (run_id, operation_id, technique, lane, method, url, status,
+                                     return_code, timestamp, request_info, stdout, stderr, log_index)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    run_id, result['endpoint'], result.get('technique'), result.get('lane'),
+                    result['method'], result['url'], job_status(result),
+                    result.get('return_code'), result['timestamp'],
+                    json.dumps(request_info, ensure_ascii=False),
+                    compress_log(stdout), compress_log(stderr),
+                    json.dumps(log_index) if log_index else None,
+                )
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def runs(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT r.id, r.started_at, r.finished_at, r.base_url,
+                          COUNT(j.id) AS jobs,
+                          SUM(j.status = 'vulnerable') AS vulnerable
+                   FROM runs r LEFT JOIN jobs j ON j.run_id = r.id
+                   GROUP BY r.id ORDER BY r.id"""
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def latest_run_id(self) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(id) FROM runs").fetchone()
+        return row[0]
+
+    def jobs(self, run_id: Optional[int] = None, operation_id: Optional[str] = None,
+             status: Optional[str] = None) -> List[Dict]:
+        """Задания по фильтрам (без логов)"""
+        query = ("SELECT id, run_id, operation_id, technique, lane, method, url, status, "
+                 "return_code, timestamp, log_index FROM jobs WHERE 1 = 1")
+        params = []
+        for column, value in (('run_id', run_id), ('operation_id', operation_id), ('status', status)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+        query += " ORDER BY id"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job['log_index'] = json.loads(job['log_index']) if job['log_index'] else None
+            jobs.append(job)
+        return jobs
+
+    def job_logs(self, job_id: int) -> Dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT request_info, stdout, stderr FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Задание {job_id} не найдено")
+        return {
+            "request_info": json.loads(row['request_info']),
+            "stdout": decompress_log(row['stdout']),
+            "stderr": decompress_log(row['stderr']),
+        }
+
+    def job_excerpts(self, job_id: int, max_lines: int = 40) -> List[str]:
+        """Фрагменты stdout с блоками найденных инъекций (без распаковки всего лога)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stdout, log_index FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Задание {job_id} не найдено")
+        if not row['log_index'] or not row['stdout']:
+            return []
+        findings = json.loads(row['log_index']).get('findings', [])
+        return [read_excerpt(row['stdout'], finding['offset'], max_lines) for finding in findings]
+
+    def report(self, run_id: int) -> Dict:
+        """Отчет прогона в формате final_report_*.json"""
+        with self._lock:
+            run = self._conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise KeyError(f"Прогон {run_id} не найден")
+
+        results = []
+        for job in self.jobs(run_id=run_id):
+            results.append({
+                "endpoint": job['operation_id'],
+                "url": job['url'],
+                "method": job['method'],
+                "technique": job['technique'],
+                "lane": job['lane'],
+                "timestamp": job['timestamp'],
+                "vulnerable": job['status'] == STATUS_VULNERABLE,
+                "status": job['status'],
+                "return_code": job['return_code'],
+                "job_id": job['id'],
+                "output_dir": f"{self.path}#job={job['id']}",
+                "findings": (job['log_index'] or {}).get('findings', []),
+                "anomalies": (job['log_index'] or {}).get('anomalies', []),
+            })
+
+        if run['summary']:
+            summary = json.loads(run['summary'])
+        else:
+            # Прогон не завершен: сводка по уже сохраненным заданиям
+            total = len({r['endpoint'] for r in results})
+            vulnerable = len({r['endpoint'] for r in results if r['vulnerable']})
+            summary = {
+                "total_endpoints": total,
+                "vulnerable_endpoints": vulnerable,
+                "safe_endpoints": total - vulnerable,
+                "test_date": run['started_at'],
+                "base_url": run['base_url'],
+            }
+        summary['run_id'] = run_id
+        return {"summary": summary, "results": results}
+
+
+def main():
+    """CLI для просмотра хранилища без обхода файловой системы"""
+    if len(sys.argv) < 3:
+        print("SQLMap Results Store")
+        print("\nИспользование:")
+        print("  python3 results_store.py <db> runs")
+        print("  python3 results_store.py <db> jobs [run_id|latest] [status]")
+        print("  python3 results_store.py <db> show <job_id> [stdout|stderr|request|findings]")
+        print("\nПример:")
+        print("  python3 results_store.py sqlmap_results/results.sqlite3 jobs latest vulnerable")
+        return
+
+    store = ResultsStore(sys.argv[1])
+    command = sys.argv[2]
+
+    if command == 'runs':
+        for run in store.runs():
+            print(f"#{run['id']:<5} {run['started_at']:<28} {run['base_url']:<30} "
+                  f"заданий: {run['jobs']:<5} уязвимых: {run['vulnerable'] or 0}")
+    elif command == 'jobs':
+        run_id = sys.argv[3] if len(sys.argv) > 3 else 'latest'
+        run_id = store.latest_run_id() if run_id == 'latest' else int(run_id)
+        status = sys.argv[4] if len(sys.argv) > 4 else None
+        for job in store.jobs(run_id=run_id, status=status):
+            print(f"#{job['id']:<6} {job['status']:<11} {job['method']:<7} "
+                  f"{job['technique'] or '':<7} {job['operation_id']:<45} {job['url']}")
+    elif command == 'show':
+        part = sys.argv[4] if len(sys.argv) > 4 else 'stdout'
+        if part == 'findings':
+            for excerpt in store.job_excerpts(int(sys.argv[3])):
+                print(excerpt)
+                print('-' * 80)
+            return
+        logs = store.job_logs(int(sys.argv[3]))
+        if part == 'request':
+            print(json.dumps(logs['request_info'], indent=2, ensure_ascii=False))
+        else:
+            print(logs[part])
+    else:
+        print(f"Неизвестная команда: {command}")
+
+
+if __name__ == "__main__":
+    main()
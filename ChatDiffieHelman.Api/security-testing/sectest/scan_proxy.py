@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Scan Proxy - Локальный HTTP прокси для трафика SQLMap
+Запись HTTP обменов в компактное хранилище и их воспроизведение без backend,
+глобальное ограничение частоты запросов к API, подстановка состояния в запросы
+"""
+
+import base64
+import gzip
+import hashlib
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Режимы работы прокси
+MODE_LIVE = 'live'        # Прозрачная передача запросов в API
+MODE_RECORD = 'record'    # Передача в API + запись обменов
+MODE_REPLAY = 'replay'    # Ответы только из хранилища, API не нужен
+
+MODES = (MODE_LIVE, MODE_RECORD, MODE_REPLAY)
+
+# Hop-by-hop заголовки, которые прокси не должен пересылать
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'proxy-connection', 'te', 'trailers', 'transfer-encoding', 'upgrade',
+}
+
+
+def request_key(method: str, url: str, body: bytes = b'') -> str:
+    """Хэш запроса для индекса хранилища (заголовки не учитываются: --random-agent)"""
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode('utf-8'))
+    digest.update(b'\n')
+    digest.update(url.encode('utf-8'))
+    digest.update(b'\n')
+    digest.update(body or b'')
+    return digest.hexdigest()[:32]
+
+
+def job_key(method: str, url: str, data: Optional[Dict], options: Dict) -> str:
+    """Хэш задания SQLMap: запрос + параметры сканирования"""
+    payload = json.dumps(
+        {'method': method, 'url': url, 'data': data, 'options': options},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class ExchangeStore:
+    """Хранилище записанных обменов одного эндпоинта
+
+    Файл <store_dir>/<endpoint>.jsonl.gz - последовательность gzip-членов
+    с JSON-строками. Новые записи дописываются отдельным членом при flush(),
+    поэтому файл только растет и никогда не переписывается целиком.
+    """
+
+    def __init__(self, store_dir: str, endpoint: str):
+        self.path = os.path.join(store_dir, f"{endpoint}.jsonl.gz")
+        self._index: Dict[str, Dict] = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Построение индекса по хэшу запроса (последняя запись побеждает)"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        record = json.loads(line)
+                        self._index[record['key']] = record
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning(f"Хранилище {self.path} повреждено, прочитано записей: {len(self._index)} ({e})")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self._index.get(key)
+
+    def put(self, record: Dict):
+        with self._lock:
+            self._index[record['key']] = record
+            self._pending.append(record)
+
+    def flush(self):
+        """Дозапись накопленных записей одним gzip-членом"""
+        with self._lock:
+            if not self._pending:
+                return
+            lines = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in self._pending)
+            with gzip.open(self.path, 'ab', compresslevel=6) as f:
+                f.write(lines.encode('utf-8'))
+            self._pending = []
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов в формате forward-прокси (абсолютный URI)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Вывод http.server засоряет лог сканера
+        pass
+
+    def _handle(self):
+        self.server.scan_proxy.handle(self)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+    def do_CONNECT(self):
+        self.send_error(501, 'CONNECT не поддерживается (API работает по HTTP)')
+
+
+class ScanProxy:
+    """Прокси между SQLMap и API с режимами live/record/replay"""
+
+    def __init__(self, store: Optional[ExchangeStore], mode: str = MODE_LIVE,
+                 timeout: float = 30.0, limiter=None,
+                 rewrite: Optional[Callable[[str, str, bytes], bytes]] = None):
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим прокси: {mode}")
+        if mode != MODE_LIVE and store is None:
+            raise ValueError(f"Режим {mode} требует хранилище обменов")
+        self.store = store
+        self.mode = mode
+        self.timeout = timeout
+        # Общий для всех заданий AdaptiveRateLimiter (rate_limiter.py) или None
+        self.limiter = limiter
+        # Хук перед отправкой в API: (метод, URL, тело) -> тело (auth_flows.AuthFlows.rewrite)
+        self.rewrite = rewrite
+        self.stats = {'requests': 0, 'recorded': 0, 'replayed': 0, 'misses': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'ScanProxy':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _ProxyHandler)
+        self._server.daemon_threads = True
+        self._server.scan_proxy = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.store is not None and self.mode == MODE_RECORD:
+            self.store.flush()
+
+    def __enter__(self) -> 'ScanProxy':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        """Обработка одного запроса от SQLMap"""
+        self._count('requests')
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        method = handler.command
+        url = handler.path
+        key = request_key(method, url, body)
+
+        if self.mode == MODE_REPLAY:
+            record = self.store.get(key)
+            if record is None:
+                self._count('misses')
+                self._send(handler, 504, [['X-Replay-Miss', key]], b'')
+                return
+            self._count('replayed')
+            response = record['response']
+            self._send(handler, response['status'], response['headers'],
+                       base64.b64decode(response['body']))
+            return
+
+        # Ключ записи - по исходному телу: подставленное состояние от прогона к прогону разное
+        forward_body = self.rewrite(method, url, body) if self.rewrite is not None else body
+        if self.limiter is not None:
+            self.limiter.acquire()
+        started = time.monotonic()
+        try:
+            status, headers, response_body = self._forward(method, url, handler.headers, forward_body)
+            if self.limiter is not None:
+                self.limiter.observe(time.monotonic() - started)
+        except Exception as e:
+            self._count('errors')
+            logger.debug(f"Ошибка проксирования {method} {url}: {e}")
+            self._send(handler, 502, [], str(e).encode('utf-8'))
+            return
+
+        if self.mode == MODE_RECORD:
+            self.store.put({
+                'kind': 'http',
+                'key': key,
+                'request': {'method': method, 'url': url,
+                            'body': base64.b64encode(body).decode('ascii')},
+                'response': {'status': status, 'headers': headers,
+                             'body': base64.b64encode(response_body).decode('ascii')},
+            })
+            self._count('recorded')
+
+        self._send(handler, status, headers, response_body)
+
+    def _forward(self, method: str, url: str, request_headers, body: bytes):
+        """Передача запроса в API"""
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise ValueError(f"Ожидался абсолютный http URL, получено: {url}")
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        # Content-Length считает http.client: тело могло измениться в rewrite
+        headers = {k: v for k, v in request_headers.items()
+                   if k.lower() not in HOP_BY_HOP_HEADERS and k.lower() != 'content-length'}
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=self.timeout)
+        try:
+            conn.request(method, path, body=body or None, headers=headers)
+            response = conn.getresponse()
+            response_body = response.read()
+            response_headers = [[k, v] for k, v in response.getheaders()
+                                if k.lower() not in HOP_BY_HOP_HEADERS and k.lower() != 'content-length']
+            return response.status, response_headers, response_body
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, headers: List, body: bytes):
+        handler.send_response(status)
+        for name, value in headers:
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        if handler.command != 'HEAD' and body:
+            handler.wfile.write(body)
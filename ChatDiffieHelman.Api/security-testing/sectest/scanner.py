@@ -0,0 +1,1222 @@
+"""
+Scanner - Автоматическое тестирование SQL-инъекций для всех эндпоинтов API
+Конфигурация передается явно (load_config), логирование настраивает CLI (main);
+модули этапов (фикстуры, потоки входа, пре-скрининг, sqlmapapi, WS-фаззинг)
+импортируются при первом использовании
+"""
+
+import gzip
+import io
+import json
+import os
+import subprocess
+import logging
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Union
+import sys
+
+from .config import ConfigError, load_config
+from .log_capture import CompressedLogWriter, run_captured
+from .rate_limiter import AdaptiveRateLimiter
+from .results_store import ResultsStore, redact
+from .scheduler import LaneScheduler
+from .scan_proxy import ExchangeStore, ScanProxy, MODES, MODE_LIVE, MODE_RECORD, MODE_REPLAY, job_key
+
+logger = logging.getLogger(__name__)
+
+
+# Признаки уязвимости в выводе SQLMap
+VULNERABILITY_INDICATORS = [
+    "sqlmap identified the following injection point",
+    "Parameter:",
+    "Type:",
+    "Title:",
+    "Payload:",
+    "vulnerable",
+    "injection"
+]
+
+
+def example_body(spec: Dict, endpoint_info: Dict, fixtures: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+    """Пример тела запроса по схеме: example или значение по типу поля
+
+    Поля фикстур получают идентификаторы созданных объектов. Общий для Scanner
+    и quick_test; KeyError - схема без application/json или неизвестная $ref.
+    """
+    from .fixtures import fixture_value
+    
+    if 'requestBody' not in endpoint_info:
+        return None
+    
+    schema = endpoint_info['requestBody']['content']['application/json']['schema']
+    # Если это ссылка на схему
+    if '$ref' in schema:
+        schema = spec['components']['schemas'][schema['$ref'].split('/')[-1]]
+    
+    body = {}
+    for prop_name, prop_info in schema.get('properties', {}).items():
+        if 'example' in prop_info:
+            body[prop_name] = prop_info['example']
+        elif prop_info.get('type') == 'string':
+            body[prop_name] = f"test_{prop_name}"
+        elif prop_info.get('type') == 'boolean':
+            body[prop_name] = True
+        elif prop_info.get('type') == 'number':
+            body[prop_name] = 1
+        # Идентификаторы созданных фикстур вместо примеров из схемы
+        fixture = fixture_value(fixtures or {}, prop_name, 'body')
+        if fixture:
+            body[prop_name] = fixture
+    return body or None
+
+
+class Scanner:
+    """Сканирование SQL-инъекций всех эндпоинтов Swagger спецификации
+
+    Параметры этапов и SQLMap берутся из config (по умолчанию - load_config()).
+    run() выполняет прогон и возвращает финальный отчет.
+    """
+    
+    def __init__(self, base_url: str, jwt_token: str, swagger_path: str, output_dir: str,
+                 scan_mode: str = MODE_LIVE, replay_dir: str = './sqlmap_replay',
+                 results_backend: str = 'sqlite', results_db: str = '', config: Optional[Dict] = None):
+        self.config = load_config() if config is None else config
+        self.base_url = base_url.rstrip('/')
+        self.jwt_token = jwt_token
+        self.swagger_path = swagger_path
+        self.output_dir = output_dir
+        self.test_results = []
+        self.fixtures: Dict[str, str] = {}
+        self.auth_flows = None
+        
+        # Создание директории для результатов
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # sqlite - одна база результатов, files - каталог на каждое задание
+        if results_backend not in ('sqlite', 'files'):
+            raise ConfigError(f"Неизвестный RESULTS_BACKEND: {results_backend} (допустимо: sqlite, files)")
+        self.results_store = None
+        self.run_id = None
+        if results_backend == 'sqlite':
+            self.results_store = ResultsStore(results_db or os.path.join(self.output_dir, 'results.sqlite3'))
+
+        # Режим record/replay для воспроизводимых прогонов
+        if scan_mode not in MODES:
+            raise ConfigError(f"Неизвестный SCAN_MODE: {scan_mode} (допустимо: {', '.join(MODES)})")
+        self.scan_mode = scan_mode
+        self.replay_dir = replay_dir
+
+        # Параллельные задания и общий лимит частоты запросов к API
+        self.max_jobs = max(1, int(self.config['SQLMAP_JOBS']))
+        self.rate_limiter = None
+        if float(self.config['REQUEST_RATE_LIMIT']) > 0:
+            self.rate_limiter = AdaptiveRateLimiter(
+                max_rate=float(self.config['REQUEST_RATE_LIMIT']),
+                burst=int(self.config['REQUEST_BURST']),
+                min_rate=float(self.config['REQUEST_RATE_MIN']),
+                latency_factor=float(self.config['LATENCY_BACKPRESSURE_FACTOR'])
+            )
+        elif self.max_jobs > 1:
+            logger.warning("SQLMAP_JOBS > 1 без REQUEST_RATE_LIMIT: суммарная нагрузка на API не ограничена")
+
+        # Исполнитель заданий: cli - процесс SQLMap на задание, api - пул серверов sqlmapapi
+        backend = self.config['SQLMAP_BACKEND']
+        if backend not in ('cli', 'api'):
+            raise ConfigError(f"Неизвестный SQLMAP_BACKEND: {backend} (допустимо: cli, api)")
+        if backend == 'api' and scan_mode == MODE_REPLAY:
+            # Записанные задания воспроизводятся без SQLMap, серверы не нужны
+            logger.warning("SQLMAP_BACKEND=api в режиме replay не используется, задания воспроизводятся из записи")
+            backend = 'cli'
+        self.api_pool = None
+        if backend == 'api':
+            from .sqlmap_api import SqlmapApiPool, api_command
+            api_cmd = self.config['SQLMAP_API_CMD'].split() or api_command(self.config.get('SQLMAP_CMD', 'sqlmap'))
+            self.api_pool = SqlmapApiPool(
+                cmd=api_cmd,
+                size=int(self.config['SQLMAP_API_SERVERS']),
+                adapter=self.config['SQLMAP_API_ADAPTER'],
+                poll_interval=float(self.config['SQLMAP_API_POLL'])
+            )
+        
+        # Пакетный режим: несколько эндпоинтов на процесс SQLMap (только live -
+        # записи record/replay ведутся по эндпоинтам)
+        self.bulk_size = max(1, int(self.config['SQLMAP_BULK']))
+        if self.bulk_size > 1 and scan_mode != MODE_LIVE:
+            logger.warning(f"SQLMAP_BULK работает только в SCAN_MODE=live, в режиме {scan_mode} - процесс на эндпоинт")
+            self.bulk_size = 1
+        if self.bulk_size > 1 and self.api_pool is not None:
+            logger.warning("SQLMAP_BULK работает только с SQLMAP_BACKEND=cli, задания уходят в sqlmapapi по одному")
+            self.bulk_size = 1
+        
+        # Снимок базы API: восстановление между группами заданий (по умолчанию
+        # группа - одна волна из SQLMAP_JOBS параллельных заданий)
+        self.db_snapshot = self._database_snapshot(self.config['DB_SNAPSHOT'])
+        group_size = max(0, int(self.config['DB_SNAPSHOT_GROUP'])) or self.max_jobs
+        
+        # B/E/U/S/Q параллельно, T - отдельной полосой после паузы
+        self.scheduler = LaneScheduler(
+            runner=self._run_sqlmap if self.api_pool is None else self._run_sqlmap_api,
+            fast_workers=self.max_jobs,
+            time_workers=int(self.config['SQLMAP_TIME_JOBS']),
+            quiet_period=float(self.config['SQLMAP_TIME_QUIET_PERIOD']),
+            isolate_time_based=bool(int(self.config['SQLMAP_TIME_ISOLATION'])),
+            batch_runner=self._run_sqlmap_batch,
+            batch_size=self.bulk_size,
+            between_groups=self._restore_database if self.db_snapshot is not None else None,
+            group_size=group_size
+        )
+        
+        # Загрузка Swagger спецификации
+        self.swagger_spec = self._load_swagger_spec()
+        
+    def _load_swagger_spec(self) -> Dict:
+        """Загрузка Swagger спецификации"""
+        try:
+            with open(self.swagger_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            raise ConfigError(f"Ошибка загрузки Swagger спецификации: {e}") from e
+    
+    def _get_example_body(self, endpoint_info: Dict) -> Dict:
+        """Генерация примеров тела запроса на основе схемы"""
+        try:
+            return example_body(self.swagger_spec, endpoint_info, self.fixtures)
+        except Exception as e:
+            logger.warning(f"Не удалось сгенерировать тело запроса: {e}")
+            return None
+    
+    def _get_path_parameters(self, path: str, endpoint_info: Dict) -> Dict[str, str]:
+        """Извлечение параметров пути"""
+        from .fixtures import fixture_value
+        
+        params = {}
+        if 'parameters' in endpoint_info:
+            for param in endpoint_info['parameters']:
+                if param['in'] == 'path':
+                    param_name = param['name']
+                    # Идентификатор фикстуры, без нее - тестовые значения
+                    if fixture_value(self.fixtures, param_name):
+                        params[param_name] = fixture_value(self.fixtures, param_name)
+                    elif param_name in ['id', 'userId', 'chatId']:
+                        params[param_name] = self.config['TEST_USER_ID']
+                    else:
+                        params[param_name] = "test-value"
+        return params
+    
+    def _replace_path_params(self, path: str, params: Dict[str, str]) -> str:
+        """Замена параметров в пути"""
+        for param_name, param_value in params.items():
+            path = path.replace(f"{{{param_name}}}", param_value)
+        return path
+    
+    def _run_sqlmap(self, method: str, url: str, data: Dict = None, 
+                    endpoint_name: str = "", description: str = "",
+                    technique: str = None, lane: str = None) -> Dict:
+        """Запуск SQLMap для конкретного эндпоинта"""
+        
+        technique = technique or self.config['SQLMAP_TECHNIQUES']
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if self.results_store is not None:
+            # Сессия SQLMap нужна только на время задания, результаты уходят в базу
+            output_subdir = tempfile.mkdtemp(prefix=f"{endpoint_name}_{technique}_")
+        else:
+            output_subdir = os.path.join(self.output_dir, f"{endpoint_name}_{technique}_{timestamp}")
+            os.makedirs(output_subdir, exist_ok=True)
+        
+        cmd = self._sqlmap_command(output_subdir, technique)
+        cmd.extend([
+            "-u", url,
+            "--method", method,
+        ])
+        headers = [f"Authorization: Bearer {self.jwt_token}"]
+        
+        # Добавление данных для POST/PUT/PATCH (опции --content-type у SQLMap нет - тип идет заголовком)
+        if data and method in ['POST', 'PUT', 'PATCH']:
+            data_json = json.dumps(data)
+            cmd.extend(["--data", data_json])
+            headers.append("Content-Type: application/json")
+        cmd.extend(["--headers", "\n".join(headers)])
+        
+        # Record/replay: обмены эндпоинта хранятся в REPLAY_DIR/<endpoint>.jsonl.gz
+        store = None
+        recorded_job = None
+        replay_key = job_key(method, url, data, {
+            "level": self.config['SQLMAP_LEVEL'],
+            "risk": self.config['SQLMAP_RISK'],
+            "technique": technique,
+        })
+        if self.scan_mode != MODE_LIVE:
+            store = ExchangeStore(self.replay_dir, endpoint_name)
+        if self.scan_mode == MODE_REPLAY:
+            recorded_job = store.get(replay_key)
+            if recorded_job is None:
+                logger.warning(f"Нет записи задания {endpoint_name} в {store.path}, SQLMap получит ответы из записанных обменов")
+        
+        # Прокси нужен для записи/воспроизведения, общего лимита частоты запросов
+        # и подстановки сессий в шаги потоков входа
+        proxy = None
+        if recorded_job is None and (store is not None or self.rate_limiter is not None or self._uses_flow(url)):
+            proxy = self._start_proxy(store)
+            cmd.extend(["--proxy", proxy.url])
+        
+        logger.info(f"\n{'='*80}")
+        logger.info(f"Тестирование: {endpoint_name}")
+        logger.info(f"Описание: {description}")
+        logger.info(f"URL: {url}")
+        logger.info(f"Метод: {method}")
+        logger.info(f"Техники: {technique}")
+        if data:
+            logger.info(f"Данные: {json.dumps(data, indent=2)}")
+        if self.scan_mode != MODE_LIVE:
+            logger.info(f"Режим: {self.scan_mode}")
+        logger.info(f"{'='*80}\n")
+        
+        # Сохранение информации о запросе
+        request_info = {
+            "endpoint": endpoint_name,
+            "description": description,
+            "url": url,
+            "method": method,
+            "data": data,
+            "technique": technique,
+            "timestamp": timestamp,
+            "command": redact(" ".join(cmd), [self.jwt_token])
+        }
+        
+        if self.results_store is None:
+            with open(os.path.join(output_subdir, "request_info.json"), 'w', encoding='utf-8') as f:
+                json.dump(request_info, f, indent=2, ensure_ascii=False)
+        
+        # Вывод сжимается по мере поступления: в каталог задания или в память для базы
+        if self.results_store is None:
+            stdout_file = open(os.path.join(output_subdir, "stdout.log.gz"), 'wb')
+            stderr_file = open(os.path.join(output_subdir, "stderr.log.gz"), 'wb')
+        else:
+            stdout_file, stderr_file = io.BytesIO(), io.BytesIO()
+        stdout_log = CompressedLogWriter(stdout_file)
+        stderr_log = CompressedLogWriter(stderr_file)
+        
+        # Признак уязвимости проверяется по каждой строке, весь вывод в памяти не держится
+        found = threading.Event()
+        
+        def on_line(line: str):
+            if not found.is_set() and self._analyze_line(line):
+                found.set()
+        
+        try:
+            if recorded_job is not None:
+                # Воспроизведение записанного вывода без запуска SQLMap и backend
+                logger.info("Воспроизведение записанного результата SQLMap...")
+                for log, text in ((stdout_log, recorded_job['stdout']), (stderr_log, recorded_job['stderr'])):
+                    for line in text.splitlines(keepends=True):
+                        log.write_line(line)
+                        on_line(line)
+                    log.close()
+                return_code = recorded_job['return_code']
+            else:
+                # Запуск SQLMap
+                logger.info("Запуск SQLMap...")
+                return_code = run_captured(
+                    cmd, stdout_log, stderr_log,
+                    timeout=self.config['SQLMAP_TIMEOUT'],  # Таймаут из конфига
+                    on_line=on_line
+                )
+            
+            if self.scan_mode == MODE_RECORD:
+                store.put({
+                    "kind": "job",
+                    "key": replay_key,
+                    "stdout": self._read_log(stdout_file),
+                    "stderr": self._read_log(stderr_file),
+                    "return_code": return_code
+                })
+            
+            # Анализ результатов
+            vulnerable = found.is_set()
+            
+            test_result = {
+                "endpoint": endpoint_name,
+                "url": url,
+                "method": method,
+                "technique": technique,
+                "lane": lane,
+                "timestamp": timestamp,
+                "vulnerable": vulnerable,
+                "output_dir": output_subdir,
+                "return_code": return_code
+            }
+            
+            if vulnerable:
+                logger.warning(f"⚠️  УЯЗВИМОСТЬ НАЙДЕНА: {endpoint_name}")
+            else:
+                logger.info(f"✓ Уязвимости не найдены: {endpoint_name}")
+            
+        except subprocess.TimeoutExpired:
+            logger.error(f"Таймаут при тестировании {endpoint_name}")
+            test_result = {
+                "endpoint": endpoint_name,
+                "url": url,
+                "method": method,
+                "technique": technique,
+                "lane": lane,
+                "timestamp": timestamp,
+                "vulnerable": False,
+                "error": "timeout",
+                "output_dir": output_subdir
+            }
+        except Exception as e:
+            logger.error(f"Ошибка при тестировании {endpoint_name}: {e}")
+            test_result = {
+                "endpoint": endpoint_name,
+                "url": url,
+                "method": method,
+                "technique": technique,
+                "lane": lane,
+                "timestamp": timestamp,
+                "vulnerable": False,
+                "error": str(e),
+                "output_dir": output_subdir
+            }
+        finally:
+            stdout_log.close()
+            stderr_log.close()
+            if proxy is not None:
+                proxy.stop()
+                logger.info(f"Прокси ({self.scan_mode}): {proxy.stats}")
+            if store is not None:
+                store.flush()
+        
+        # Смещения блоков найденных инъекций в stdout.log.gz - для фрагментов в HTML отчете
+        test_result['findings'] = stdout_log.findings
+        self._save_job(test_result, request_info, stdout_file, stderr_file, stdout_log.index)
+        return test_result
+    
+    def _uses_flow(self, url: str) -> bool:
+        """Шаг потока входа: запросы идут через прокси, он подставляет живую сессию"""
+        if self.auth_flows is None:
+            return False
+        from .auth_flows import flow_step
+        return flow_step(url) is not None
+    
+    def _start_proxy(self, store: ExchangeStore = None) -> ScanProxy:
+        rewrite = self.auth_flows.rewrite if self.auth_flows is not None else None
+        return ScanProxy(store, self.scan_mode, limiter=self.rate_limiter, rewrite=rewrite).start()
+    
+    def _sqlmap_command(self, output_subdir: str, technique: str) -> List[str]:
+        """Базовая команда SQLMap без целей: уровень, техники, каталог сессии"""
+        sqlmap_cmd = self.config.get('SQLMAP_CMD', 'sqlmap')
+        if isinstance(sqlmap_cmd, list):
+            cmd = sqlmap_cmd.copy()
+        else:
+            cmd = [sqlmap_cmd]
+        
+        # Эндпоинты берутся из спецификации, --crawl их только переоткрывал бы
+        cmd.extend([
+            "--batch",  # Не задавать вопросы
+            "--random-agent",  # Случайный User-Agent
+            "--level", str(self.config['SQLMAP_LEVEL']),  # Уровень тестирования
+            "--risk", str(self.config['SQLMAP_RISK']),  # Уровень риска
+            "--threads", str(self.config['SQLMAP_THREADS']),  # Количество потоков
+            "--output-dir", output_subdir,
+            "--flush-session",  # Очистка сессии
+            "--fresh-queries",  # Свежие запросы
+            "--technique", technique,  # Техники
+            "-v", "1",  # Вербозность
+        ])
+        
+        # Задержка ответа, по которой time-based техника считает инъекцию
+        if 'T' in technique:
+            cmd.extend(["--time-sec", str(self.config['SQLMAP_TIME_SEC'])])
+        return cmd
+    
+    def _run_sqlmap_batch(self, jobs: List[Dict]) -> List[Dict]:
+        """Пакет заданий одним процессом SQLMap: цели из лога Burp, вывод и находки - по заданиям"""
+        if len(jobs) == 1:
+            return [self._run_sqlmap(**jobs[0])]
+        from .bulk_scan import RoutedLog, TargetRouter, burp_log, read_results_csv, target_key
+        
+        technique = jobs[0]['technique'] or self.config['SQLMAP_TECHNIQUES']
+        lane = jobs[0]['lane']
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        batch_name = f"batch_{jobs[0]['endpoint_name']}_{technique}_{timestamp}"
+        if self.results_store is not None:
+            batch_dir = tempfile.mkdtemp(prefix=f"batch_{technique}_")
+        else:
+            batch_dir = os.path.join(self.output_dir, batch_name)
+            os.makedirs(batch_dir, exist_ok=True)
+        
+        targets_file = os.path.join(batch_dir, "targets.log")
+        with open(targets_file, 'w', encoding='utf-8') as f:
+            f.write(burp_log(jobs, {"Authorization": f"Bearer {self.jwt_token}"}))
+        results_file = os.path.join(batch_dir, "results.csv")
+        
+        cmd = self._sqlmap_command(batch_dir, technique)
+        cmd.extend(["-l", targets_file, "--results-file", results_file])
+        
+        proxy = None
+        if self.rate_limiter is not None or any(self._uses_flow(job['url']) for job in jobs):
+            proxy = self._start_proxy()
+            cmd.extend(["--proxy", proxy.url])
+        
+        logger.info(f"\n{'='*80}")
+        logger.info(f"Пакет {batch_name}: {len(jobs)} эндпоинтов, техники {technique}")
+        for job in jobs:
+            logger.info(f"  {job['method']} {job['url']} ({job['endpoint_name']})")
+        logger.info(f"{'='*80}\n")
+        
+        # Логи и request_info каждого задания пакета - как у отдельного запуска
+        outputs = []
+        for job in jobs:
+            request_info = {
+                "endpoint": job['endpoint_name'],
+                "description": job.get('description', ''),
+                "url": job['url'],
+                "method": job['method'],
+                "data": job.get('data'),
+                "technique": technique,
+                "timestamp": timestamp,
+                "batch": batch_name,
+                "command": redact(" ".join(cmd), [self.jwt_token])
+            }
+            if self.results_store is None:
+                output_subdir = os.path.join(self.output_dir, f"{job['endpoint_name']}_{technique}_{timestamp}")
+                os.makedirs(output_subdir, exist_ok=True)
+                with open(os.path.join(output_subdir, "request_info.json"), 'w', encoding='utf-8') as f:
+                    json.dump(request_info, f, indent=2, ensure_ascii=False)
+                stdout_file = open(os.path.join(output_subdir, "stdout.log.gz"), 'wb')
+                stderr_file = open(os.path.join(output_subdir, "stderr.log.gz"), 'wb')
+            else:
+                output_subdir = batch_dir
+                stdout_file, stderr_file = io.BytesIO(), io.BytesIO()
+            outputs.append((output_subdir, request_info, stdout_file, stderr_file))
+        stdout_logs = [CompressedLogWriter(output[2]) for output in outputs]
+        stderr_logs = [CompressedLogWriter(output[3]) for output in outputs]
+        
+        router = TargetRouter(jobs)
+        found = [False] * len(jobs)
+        
+        def on_line(line: str):
+            if not found[router.current] and self._analyze_line(line):
+                found[router.current] = True
+        
+        error = None
+        return_code = None
+        try:
+            logger.info("Запуск SQLMap...")
+            return_code = run_captured(
+                cmd, RoutedLog(router, stdout_logs), RoutedLog(router, stderr_logs, follow_markers=False),
+                timeout=self.config['SQLMAP_TIMEOUT'] * len(jobs),  # Таймаут эндпоинта на каждое задание пакета
+                on_line=on_line
+            )
+        except subprocess.TimeoutExpired:
+            logger.error(f"Таймаут пакета {batch_name}")
+            error = "timeout"
+        except Exception as e:
+            logger.error(f"Ошибка пакета {batch_name}: {e}")
+            error = str(e)
+        finally:
+            for log in stdout_logs + stderr_logs:
+                log.close()
+            if proxy is not None:
+                proxy.stop()
+                logger.info(f"Прокси ({self.scan_mode}): {proxy.stats}")
+            # В логе Burp токен открытым текстом: при RESULTS_BACKEND=files каталог пакета остается
+            try:
+                os.remove(targets_file)
+            except OSError:
+                pass
+        
+        # CSV результатов (--results-file): место и параметр каждой найденной инъекции
+        injections = read_results_csv(results_file)
+        
+        results = []
+        for index, (job, (output_subdir, request_info, stdout_file, stderr_file)) in enumerate(zip(jobs, outputs)):
+            job_injections = injections.get(target_key(job['url']), [])
+            test_result = {
+                "endpoint": job['endpoint_name'],
+                "url": job['url'],
+                "method": job['method'],
+                "technique": technique,
+                "lane": lane,
+                "timestamp": timestamp,
+                "vulnerable": found[index] or bool(job_injections),
+                "output_dir": output_subdir,
+                "return_code": return_code,
+                "batch": batch_name
+            }
+            if job_injections:
+                test_result['injections'] = job_injections
+            # По таймауту пакета успевшие задания (SQLMap перешел к следующим целям) не теряются
+            if error and not (error == "timeout" and router.finished(index)):
+                test_result['error'] = error
+            
+            if test_result['vulnerable']:
+                logger.warning(f"⚠️  УЯЗВИМОСТЬ НАЙДЕНА: {job['endpoint_name']}")
+            elif not test_result.get('error'):
+                logger.info(f"✓ Уязвимости не найдены: {job['endpoint_name']}")
+            
+            test_result['findings'] = stdout_logs[index].findings
+            self._save_job(test_result, request_info, stdout_file, stderr_file, stdout_logs[index].index)
+            results.append(test_result)
+        
+        if self.results_store is not None:
+            shutil.rmtree(batch_dir, ignore_errors=True)
+        return results
+    
+    def _sqlmap_options(self, technique: str) -> Dict:
+        """Параметры задачи sqlmapapi - те же, что у _sqlmap_command"""
+        options = {
+            "level": self.config['SQLMAP_LEVEL'],
+            "risk": self.config['SQLMAP_RISK'],
+            "threads": self.config['SQLMAP_THREADS'],
+            "technique": technique,
+            "randomAgent": True,
+            "flushSession": True,
+            "freshQueries": True,
+            "verbose": 1,
+        }
+        if 'T' in technique:
+            options["timeSec"] = self.config['SQLMAP_TIME_SEC']
+        return options
+    
+    def _run_sqlmap_api(self, method: str, url: str, data: Dict = None,
+                        endpoint_name: str = "", description: str = "",
+                        technique: str = None, lane: str = None) -> Dict:
+        """Задание на сервере пула sqlmapapi: находки - из структурных данных задачи, а не из вывода"""
+        from .sqlmap_api import SqlmapApiError, findings_text, injections, log_lines
+        technique = technique or self.config['SQLMAP_TECHNIQUES']
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if self.results_store is not None:
+            output_subdir = tempfile.mkdtemp(prefix=f"{endpoint_name}_{technique}_")
+        else:
+            output_subdir = os.path.join(self.output_dir, f"{endpoint_name}_{technique}_{timestamp}")
+            os.makedirs(output_subdir, exist_ok=True)
+        
+        headers = [f"Authorization: Bearer {self.jwt_token}"]
+        options = dict(self._sqlmap_options(technique), url=url, method=method)
+        if data and method in ['POST', 'PUT', 'PATCH']:
+            options["data"] = json.dumps(data)
+            headers.append("Content-Type: application/json")
+        options["headers"] = "\n".join(headers)
+        
+        # Record: обмены пишет прокси, вывод задания - как у процесса SQLMap (replay его воспроизводит)
+        store = ExchangeStore(self.replay_dir, endpoint_name) if self.scan_mode == MODE_RECORD else None
+        proxy = None
+        if store is not None or self.rate_limiter is not None or self._uses_flow(url):
+            proxy = self._start_proxy(store)
+            options["proxy"] = proxy.url
+        
+        logger.info(f"\n{'='*80}")
+        logger.info(f"Тестирование: {endpoint_name} (sqlmapapi)")
+        logger.info(f"Описание: {description}")
+        logger.info(f"URL: {url}")
+        logger.info(f"Метод: {method}")
+        logger.info(f"Техники: {technique}")
+        if data:
+            logger.info(f"Данные: {json.dumps(data, indent=2)}")
+        logger.info(f"{'='*80}\n")
+        
+        request_info = {
+            "endpoint": endpoint_name,
+            "description": description,
+            "url": url,
+            "method": method,
+            "data": data,
+            "technique": technique,
+            "timestamp": timestamp,
+            "command": redact(f"sqlmapapi {json.dumps(options, ensure_ascii=False)}", [self.jwt_token])
+        }
+        
+        if self.results_store is None:
+            with open(os.path.join(output_subdir, "request_info.json"), 'w', encoding='utf-8') as f:
+                json.dump(request_info, f, indent=2, ensure_ascii=False)
+            stdout_file = open(os.path.join(output_subdir, "stdout.log.gz"), 'wb')
+            stderr_file = open(os.path.join(output_subdir, "stderr.log.gz"), 'wb')
+        else:
+            stdout_file, stderr_file = io.BytesIO(), io.BytesIO()
+        stdout_log = CompressedLogWriter(stdout_file)
+        stderr_log = CompressedLogWriter(stderr_file)
+        
+        test_result = {
+            "endpoint": endpoint_name,
+            "url": url,
+            "method": method,
+            "technique": technique,
+            "lane": lane,
+            "timestamp": timestamp,
+            "vulnerable": False,
+            "output_dir": output_subdir
+        }
+        try:
+            scan = self.api_pool.scan(options, timeout=self.config['SQLMAP_TIMEOUT'])
+            
+            # Лог задачи и блок находок - в stdout, сообщения об ошибках - в stderr
+            stdout_lines = log_lines(scan['log']) + findings_text(scan['data'])
+            stderr_lines = [f"{error}\n" for error in scan['errors']]
+            for line in stdout_lines:
+                stdout_log.write_line(line)
+            for line in stderr_lines:
+                stderr_log.write_line(line)
+            
+            if self.scan_mode == MODE_RECORD:
+                store.put({
+                    "kind": "job",
+                    "key": job_key(method, url, data, {
+                        "level": self.config['SQLMAP_LEVEL'],
+                        "risk": self.config['SQLMAP_RISK'],
+                        "technique": technique,
+                    }),
+                    "stdout": "".join(stdout_lines),
+                    "stderr": "".join(stderr_lines),
+                    "return_code": scan['returncode']
+                })
+            
+            job_injections = injections(scan['data'])
+            test_result.update({
+                "vulnerable": bool(job_injections),
+                "return_code": scan['returncode'],
+                "server": scan['server']
+            })
+            if job_injections:
+                test_result['injections'] = job_injections
+            
+            if scan['timed_out']:
+                logger.error(f"Таймаут при тестировании {endpoint_name}")
+                test_result['error'] = "timeout"
+            if test_result['vulnerable']:
+                logger.warning(f"⚠️  УЯЗВИМОСТЬ НАЙДЕНА: {endpoint_name}")
+            elif not scan['timed_out']:
+                logger.info(f"✓ Уязвимости не найдены: {endpoint_name}")
+        
+        except (SqlmapApiError, OSError) as e:
+            logger.error(f"Ошибка sqlmapapi при тестировании {endpoint_name}: {e}")
+            test_result['error'] = str(e)
+        finally:
+            stdout_log.close()
+            stderr_log.close()
+            if proxy is not None:
+                proxy.stop()
+                logger.info(f"Прокси ({self.scan_mode}): {proxy.stats}")
+            if store is not None:
+                store.flush()
+        
+        test_result['findings'] = stdout_log.findings
+        self._save_job(test_result, request_info, stdout_file, stderr_file, stdout_log.index)
+        return test_result
+    
+    @staticmethod
+    def _read_log(log_file) -> str:
+        """Распаковка сжатого лога задания (для записи в REPLAY_DIR)"""
+        if isinstance(log_file, io.BytesIO):
+            return gzip.decompress(log_file.getvalue()).decode('utf-8', errors='replace')
+        log_file.flush()
+        with gzip.open(log_file.name, 'rt', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    
+    def _save_job(self, test_result: Dict, request_info: Dict, stdout_file, stderr_file, log_index: Dict):
+        """Сохранение результата задания: строка в базе или файлы в каталоге задания"""
+        output_subdir = test_result['output_dir']
+        if self.results_store is not None:
+            job_id = self.results_store.add_job(
+                self.run_id, test_result, request_info,
+                stdout_file.getvalue(), stderr_file.getvalue(), log_index
+            )
+            test_result['job_id'] = job_id
+            test_result['output_dir'] = f"{self.results_store.path}#job={job_id}"
+            shutil.rmtree(output_subdir, ignore_errors=True)
+            return
+        
+        stdout_file.close()
+        stderr_file.close()
+        with open(os.path.join(output_subdir, "stdout.idx.json"), 'w', encoding='utf-8') as f:
+            json.dump(log_index, f, indent=2)
+    
+    def _analyze_line(self, line: str) -> bool:
+        """Проверка строки вывода SQLMap на признаки уязвимости"""
+        line = line.lower()
+        return any(indicator.lower() in line for indicator in VULNERABILITY_INDICATORS)
+    
+    def _analyze_results(self, stdout: str, stderr: str) -> bool:
+        """Анализ результатов SQLMap"""
+        return any(self._analyze_line(line) for line in (stdout + "\n" + stderr).splitlines())
+    
+    def _build_jobs(self):
+        """Построение списка заданий SQLMap по Swagger спецификации"""
+        jobs = []
+        total_endpoints = 0
+        
+        for path, methods in self.swagger_spec['paths'].items():
+            for method, endpoint_info in methods.items():
+                if method.upper() not in ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']:
+                    continue
+                
+                total_endpoints += 1
+                
+                try:
+                    # Получение информации об эндпоинте
+                    operation_id = endpoint_info.get('operationId', 'unknown')
+                    summary = endpoint_info.get('summary', '')
+                    description = endpoint_info.get('description', '')
+                    
+                    # Обработка параметров пути
+                    path_params = self._get_path_parameters(path, endpoint_info)
+                    full_path = self._replace_path_params(path, path_params)
+                    full_url = f"{self.base_url}{full_path}"
+                    
+                    # Получение тела запроса
+                    request_body = self._get_example_body(endpoint_info) if method.upper() in ['POST', 'PUT', 'PATCH'] else None
+                    # Метку заменяет прокси (живые сессии) или она уже в записи replay; если
+                    # подготовка потоков не удалась, пример из схемы лучше фиктивного sid
+                    if self.config['AUTH_FLOWS'] and (self.auth_flows is not None or self.scan_mode == MODE_REPLAY):
+                        # Шаги Fiat-Shamir/BMC: метка сессии вместо sid, корректный hex в остальных полях
+                        from .auth_flows import flow_body
+                        request_body = flow_body(full_url, request_body)
+                    
+                    jobs.append({
+                        "method": method.upper(),
+                        "url": full_url,
+                        "data": request_body,
+                        "endpoint_name": operation_id,
+                        "description": summary or description
+                    })
+                    
+                except Exception as e:
+                    logger.error(f"Ошибка при обработке {method.upper()} {path}: {e}")
+        
+        return jobs, total_endpoints
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict] = None) -> 'Scanner':
+        """Сканер с URL, токеном, путями и режимом из конфигурации"""
+        config = load_config() if config is None else config
+        return cls(
+            base_url=config['API_BASE_URL'],
+            jwt_token=config['JWT_TOKEN'],
+            swagger_path=config['SWAGGER_SPEC_PATH'],
+            output_dir=config['OUTPUT_DIR'],
+            scan_mode=config['SCAN_MODE'],
+            replay_dir=config['REPLAY_DIR'],
+            results_backend=config['RESULTS_BACKEND'],
+            results_db=config['RESULTS_DB'],
+            config=config
+        )
+    
+    def run(self) -> Dict:
+        """Тестирование всех эндпоинтов из Swagger спецификации, результат - финальный отчет"""
+        logger.info("="*80)
+        logger.info("НАЧАЛО АВТОМАТИЗИРОВАННОГО ТЕСТИРОВАНИЯ SQL-ИНЪЕКЦИЙ")
+        logger.info(f"Базовый URL: {self.base_url}")
+        logger.info(f"Всего эндпоинтов: {len(self.swagger_spec['paths'])}")
+        logger.info(f"Параллельных заданий SQLMap: {self.max_jobs}")
+        if self.api_pool is not None:
+            logger.info(f"Серверов sqlmapapi: {len(self.api_pool.servers)}")
+        if self.rate_limiter is not None:
+            logger.info(f"Лимит запросов к API: {self.rate_limiter.max_rate:g} req/s")
+        if self.scheduler.isolate_time_based:
+            logger.info(f"Time-based полоса: параллельно {self.scheduler.time_workers}, пауза {self.scheduler.quiet_period:g} с")
+        if self.db_snapshot is not None:
+            logger.info(f"Снимок базы ({self.config['DB_SNAPSHOT']}): восстановление каждые {self.scheduler.group_size} заданий")
+        logger.info("="*80 + "\n")
+        
+        if self.config['FIXTURES']:
+            self._provision_fixtures()
+        
+        if self.config['AUTH_FLOWS'] and self.scan_mode != MODE_REPLAY:
+            self._provision_auth_flows()
+        
+        jobs, total_endpoints = self._build_jobs()
+        
+        if self.results_store is not None:
+            self.run_id = self.results_store.start_run(self.base_url)
+            logger.info(f"Прогон #{self.run_id}, результаты: {self.results_store.path}")
+        
+        if self.config['PRESCREEN']:
+            jobs = self._prescreen(jobs)
+        
+        # Снимок после фикстур и пользователей потоков входа: восстановление их сохраняет
+        if self.db_snapshot is not None:
+            self._take_snapshot()
+        
+        # Задания выполняются полосами планировщика, каждый поток ждет свой процесс SQLMap
+        # (или свою задачу на сервере sqlmapapi)
+        try:
+            if self.api_pool is not None:
+                with self.api_pool:
+                    self.test_results.extend(self.scheduler.run(jobs, self.config['SQLMAP_TECHNIQUES']))
+            else:
+                self.test_results.extend(self.scheduler.run(jobs, self.config['SQLMAP_TECHNIQUES']))
+        finally:
+            if self.auth_flows is not None:
+                self.auth_flows.stop()
+                logger.info(f"Потоки входа: {self.auth_flows.stats}")
+            if self.db_snapshot is not None:
+                self._drop_snapshot()
+        
+        # События Socket.IO шлюзов - без SQLMap, собственным фаззером
+        if self.config['WS_FUZZ'] and self._fuzz_websockets():
+            from .ws_fuzzer import EVENTS
+            total_endpoints += len(EVENTS)
+        
+        # Эндпоинт уязвим, если уязвимость нашло задание любой из полос
+        vulnerable_endpoints = len({result['endpoint'] for result in self.test_results if result.get('vulnerable', False)})
+        
+        if self.rate_limiter is not None:
+            logger.info(f"Rate limiter: {self.rate_limiter.stats()}")
+        
+        # Генерация финального отчета
+        return self._generate_final_report(total_endpoints, vulnerable_endpoints)
+    
+    def _provision_fixtures(self):
+        """Чат, сообщение и приглашение для path-параметров и полей тела - один раз за прогон"""
+        from .fixtures import FIXTURES_FILE, FixtureProvisioner
+        
+        fixtures_file = os.path.join(self.replay_dir, FIXTURES_FILE)
+        if self.scan_mode == MODE_REPLAY:
+            # Записанные обмены сопоставляются по URL - нужны те же идентификаторы, что при записи
+            if os.path.exists(fixtures_file):
+                with open(fixtures_file, 'r', encoding='utf-8') as f:
+                    self.fixtures = json.load(f)
+            else:
+                logger.warning(f"{fixtures_file} не найден: path-параметры получают тестовые значения")
+            return
+        
+        provisioner = FixtureProvisioner(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.jwt_token}"}
+        )
+        self.fixtures = provisioner.run()
+        logger.info(f"Фикстуры: {', '.join(f'{k}={v}' for k, v in self.fixtures.items()) or 'не созданы'}")
+        
+        if self.scan_mode == MODE_RECORD:
+            os.makedirs(self.replay_dir, exist_ok=True)
+            with open(fixtures_file, 'w', encoding='utf-8') as f:
+                json.dump(self.fixtures, f, indent=2)
+    
+    def _provision_auth_flows(self):
+        """Пользователи с Fiat-Shamir и BMC и пулы их сессий для шагов start/finish"""
+        from .auth_flows import AuthFlows
+        
+        self.auth_flows = AuthFlows(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.jwt_token}"},
+            pool_size=self.config['AUTH_FLOW_POOL'],
+            limiter=self.rate_limiter
+        )
+        if not self.auth_flows.setup():
+            self.auth_flows = None
+    
+    def _database_snapshot(self, kind: str):
+        """Снимок базы API по DB_SNAPSHOT: none, postgres (база-шаблон) или file (копия файла)"""
+        if kind not in ('none', 'postgres', 'file'):
+            raise ConfigError(f"Неизвестный DB_SNAPSHOT: {kind} (допустимо: none, postgres, file)")
+        if kind == 'none':
+            return None
+        if self.scan_mode == MODE_REPLAY:
+            logger.warning("DB_SNAPSHOT в режиме replay не используется: запросы к API не отправляются")
+            return None
+        from .db_snapshot import FileSnapshot, PostgresTemplateSnapshot
+        if kind == 'file':
+            if not self.config['DB_FILE']:
+                raise ConfigError("DB_SNAPSHOT=file: не задан DB_FILE")
+            return FileSnapshot(self.config['DB_FILE'])
+        return PostgresTemplateSnapshot(
+            database=self.config['DB_NAME'],
+            host=self.config['DB_HOST'],
+            port=int(self.config['DB_PORT']),
+            user=self.config['DB_USER'],
+            password=self.config['DB_PASSWORD'],
+            psql=self.config['DB_PSQL']
+        )
+    
+    def _take_snapshot(self):
+        from .db_snapshot import SnapshotError
+        started = time.monotonic()
+        try:
+            self.db_snapshot.take()
+        except SnapshotError as e:
+            logger.error(f"Снимок базы не создан, задания выполняются без восстановления: {e}")
+            self.db_snapshot = None
+            self.scheduler.group_size = 0
+            return
+        logger.info(f"Снимок базы создан за {time.monotonic() - started:.2f} с")
+    
+    def _restore_database(self):
+        """Хук планировщика между группами заданий"""
+        from .db_snapshot import SnapshotError
+        try:
+            self.db_snapshot.restore()
+        except SnapshotError as e:
+            # Прогон не прерывается: следующая группа сканируется на измененных данных
+            logger.error(f"База не восстановлена из снимка: {e}")
+    
+    def _drop_snapshot(self):
+        """Последнее восстановление (база остается как перед сканированием) и удаление снимка"""
+        from .db_snapshot import SnapshotError
+        self._restore_database()
+        try:
+            self.db_snapshot.drop()
+        except SnapshotError as e:
+            logger.warning(f"Снимок базы не удален: {e}")
+        logger.info(f"Снимок базы: {self.db_snapshot.summary()}")
+    
+    def _prescreen(self, jobs: List[Dict]) -> List[Dict]:
+        """Пре-скрининг: в SQLMap уходят только задания с аномалиями ответа"""
+        from .prescreen import PreScreener, needs_sqlmap
+        
+        if self.scan_mode != MODE_LIVE:
+            logger.warning(f"PRESCREEN работает только в SCAN_MODE=live, в режиме {self.scan_mode} пропускается")
+            return jobs
+        
+        screener = PreScreener(
+            headers={"Authorization": f"Bearer {self.jwt_token}"},
+            concurrency=self.config['PRESCREEN_CONCURRENCY'],
+            timeout=self.config['PRESCREEN_TIMEOUT'],
+            limiter=self.rate_limiter,
+            probe_headers=self.config['SQLMAP_LEVEL'] >= 3  # User-Agent/Referer SQLMap проверяет с --level 3
+        )
+        # Пробы пре-скрининга идут мимо прокси: шаги потоков входа без живой сессии
+        # не дойдут до базы, их проверяет только SQLMap
+        flow_jobs = [job for job in jobs if self._uses_flow(job['url'])]
+        jobs = [job for job in jobs if not self._uses_flow(job['url'])]
+        started = time.monotonic()
+        results = screener.run(jobs)
+        
+        selected = list(flow_jobs)
+        for job, result in zip(jobs, results):
+            if needs_sqlmap(result):
+                selected.append(job)
+                for anomaly in result['anomalies']:
+                    logger.warning(f"Аномалия {job['endpoint_name']}: {anomaly['point']} "
+                                   f"({anomaly['probe']}) {anomaly['reason']}: {anomaly['detail']}")
+                if result['error']:
+                    logger.warning(f"Пре-скрининг {job['endpoint_name']} не удался ({result['error']}), задание уходит в SQLMap")
+            else:
+                self._save_prescreened(job, result)
+        
+        logger.info(f"Пре-скрининг за {time.monotonic() - started:.1f} с: в SQLMap {len(selected)} из {len(jobs) + len(flow_jobs)} эндпоинтов")
+        return selected
+    
+    def _save_prescreened(self, job: Dict, prescreen: Dict):
+        """Результат эндпоинта, отсеянного пре-скринингом (SQLMap не запускался)"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        test_result = {
+            "endpoint": job['endpoint_name'],
+            "url": job['url'],
+            "method": job['method'],
+            "technique": None,
+            "lane": "prescreen",
+            "timestamp": timestamp,
+            "vulnerable": False,
+            "prescreen": prescreen,
+            "output_dir": ""
+        }
+        self._save_result(test_result, dict(job, timestamp=timestamp, prescreen=prescreen))
+        logger.info(f"✓ Пре-скрининг без аномалий, SQLMap пропущен: {job['endpoint_name']}")
+    
+    def _save_result(self, test_result: Dict, request_info: Dict, log_index: Dict = None):
+        """Сохранение результата без вывода SQLMap: запись в базе или каталог с request_info.json"""
+        if self.results_store is not None:
+            test_result['job_id'] = self.results_store.add_job(self.run_id, test_result, request_info,
+                                                               log_index=log_index)
+            test_result['output_dir'] = f"{self.results_store.path}#job={test_result['job_id']}"
+        else:
+            test_result['output_dir'] = os.path.join(
+                self.output_dir, f"{test_result['endpoint']}_{test_result['lane']}_{test_result['timestamp']}"
+            )
+            os.makedirs(test_result['output_dir'], exist_ok=True)
+            with open(os.path.join(test_result['output_dir'], "request_info.json"), 'w', encoding='utf-8') as f:
+                json.dump(request_info, f, indent=2, ensure_ascii=False)
+        
+        self.test_results.append(test_result)
+    
+    def _fuzz_websockets(self) -> bool:
+        """Фаззинг событий ChatGateway и DiffieHelmanGateWay через пул Socket.IO соединений"""
+        from .ws_fuzzer import EVENTS, WsFuzzer, is_vulnerable
+        
+        if self.scan_mode != MODE_LIVE:
+            logger.warning(f"WS_FUZZ работает только в SCAN_MODE=live, в режиме {self.scan_mode} пропускается")
+            return False
+        
+        logger.info(f"WS-фаззинг: {len(EVENTS)} событий, {self.config['WS_FUZZ_CONNECTIONS']} соединений")
+        fuzzer = WsFuzzer(
+            url=self.base_url,
+            token=self.jwt_token,
+            connections=self.config['WS_FUZZ_CONNECTIONS'],
+            timeout=self.config['WS_FUZZ_TIMEOUT'],
+            window=self.config['WS_FUZZ_WINDOW'],
+            time_sec=self.config['SQLMAP_TIME_SEC'],
+            limiter=self.rate_limiter
+        )
+        started = time.monotonic()
+        results = fuzzer.run()
+        
+        ws_url = re.sub(r'^http', 'ws', self.base_url)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        for result in results:
+            endpoint = f"{result['gateway']}_{result['event']}"
+            test_result = {
+                "endpoint": endpoint,
+                "url": f"{ws_url}{result['namespace']}",
+                "method": "WS",
+                "technique": "ws-fuzz",
+                "lane": "websocket",
+                "timestamp": timestamp,
+                "vulnerable": is_vulnerable(result),
+                "probes": result['probes'],
+                "anomalies": result['anomalies'],
+                "output_dir": ""
+            }
+            if result['error']:
+                test_result['error'] = result['error']
+                logger.warning(f"WS-фаззинг {endpoint}: {result['error']}")
+            for anomaly in result['anomalies']:
+                logger.warning(f"Аномалия {endpoint}: {anomaly['point']} "
+                               f"({anomaly['probe']}) {anomaly['reason']}: {anomaly['detail']}")
+            request_info = dict(result, timestamp=timestamp)
+            self._save_result(test_result, request_info, log_index={"anomalies": result['anomalies']})
+        
+        logger.info(f"WS-фаззинг за {time.monotonic() - started:.1f} с: "
+                    f"{sum(r['probes'] for r in results)} проб, "
+                    f"уязвимых событий {sum(is_vulnerable(r) for r in results)}")
+        return True
+    
+    def _generate_final_report(self, total: int, vulnerable: int) -> Dict:
+        """Генерация финального отчета"""
+        logger.info("\n" + "="*80)
+        logger.info("ФИНАЛЬНЫЙ ОТЧЕТ")
+        logger.info("="*80)
+        logger.info(f"Всего протестировано эндпоинтов: {total}")
+        logger.info(f"Найдено уязвимых эндпоинтов: {vulnerable}")
+        logger.info(f"Безопасных эндпоинтов: {total - vulnerable}")
+        logger.info("="*80 + "\n")
+        
+        # Сохранение результатов в JSON
+        report_file = os.path.join(self.output_dir, f"final_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        
+        report = {
+            "summary": {
+                "total_endpoints": total,
+                "vulnerable_endpoints": vulnerable,
+                "safe_endpoints": total - vulnerable,
+                "test_date": datetime.now().isoformat(),
+                "base_url": self.base_url
+            },
+            "fixtures": self.fixtures,
+            "results": self.test_results
+        }
+        
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        
+        if self.results_store is not None:
+            self.results_store.finish_run(self.run_id, report['summary'])
+        
+        logger.info(f"Отчет сохранен: {report_file}")
+        
+        # Список уязвимых эндпоинтов
+        if vulnerable > 0:
+            logger.warning("\n⚠️  УЯЗВИМЫЕ ЭНДПОИНТЫ:")
+            for result in self.test_results:
+                if result.get('vulnerable', False):
+                    logger.warning(f"  - {result['method']} {result['url']}")
+                    logger.warning(f"    Эндпоинт: {result['endpoint']}")
+                    logger.warning(f"    Техники: {result.get('technique', '')}")
+                    logger.warning(f"    Результаты: {result['output_dir']}\n")
+        
+        return report
+
+
+def setup_logging(log_file: str):
+    """Лог в файл и stdout - настраивает только CLI, импорт пакета логирование не трогает"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+
+def find_sqlmap() -> Optional[Union[str, List[str]]]:
+    """Команда SQLMap: sqlmap из PATH, python3 sqlmap или ~/Рабочий стол/sqlmap"""
+    try:
+        # Попытка 1: sqlmap как команда
+        result = subprocess.run(["sqlmap", "--version"], capture_output=True, timeout=5)
+        if result.returncode == 0 or "sqlmap" in result.stdout.decode().lower():
+            return "sqlmap"
+    except (OSError, subprocess.SubprocessError):
+        pass
+    
+    try:
+        # Попытка 2: python3 sqlmap
+        result = subprocess.run(["python3", "sqlmap", "--version"], capture_output=True, timeout=5)
+        if result.returncode == 0 or "sqlmap" in result.stdout.decode().lower():
+            return ["python3", "sqlmap"]
+    except (OSError, subprocess.SubprocessError):
+        pass
+    
+    try:
+        # Попытка 3: поиск в ~/Рабочий стол/sqlmap
+        home_dir = os.path.expanduser("~")
+        desktop_sqlmap = os.path.join(home_dir, "Рабочий стол", "sqlmap", "sqlmap.py")
+        if os.path.exists(desktop_sqlmap):
+            result = subprocess.run(["python3", desktop_sqlmap, "--version"], capture_output=True, timeout=5)
+            if "sqlmap" in result.stdout.decode().lower():
+                return ["python3", desktop_sqlmap]
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return None
+
+
+def main():
+    """Главная функция"""
+    config = load_config()
+    setup_logging(config['LOG_FILE'])
+    logger.info("SQLMap Automation Script v1.0")
+    logger.info(f"Запуск: {datetime.now()}\n")
+    
+    # Проверка наличия SQLMap
+    sqlmap_cmd = find_sqlmap()
+    if sqlmap_cmd:
+        logger.info(f"SQLMap найден: {' '.join(sqlmap_cmd) if isinstance(sqlmap_cmd, list) else sqlmap_cmd}")
+    
+    if not sqlmap_cmd and config['SCAN_MODE'] == MODE_REPLAY:
+        # В режиме replay записанные задания воспроизводятся без SQLMap
+        logger.warning("SQLMap не найден: будут воспроизведены только записанные задания")
+        sqlmap_cmd = "sqlmap"
+    
+    if not sqlmap_cmd:
+        logger.error("SQLMap не установлен или недоступен")
+        logger.error("Варианты установки:")
+        logger.error("  1. sudo apt-get install sqlmap")
+        logger.error("  2. git clone --depth 1 https://github.com/sqlmapproject/sqlmap.git")
+        logger.error("  3. Укажите путь в переменной SQLMAP_PATH")
+        sys.exit(1)
+    
+    # Сохранение команды SQLMap в конфиг
+    config['SQLMAP_CMD'] = sqlmap_cmd
+    
+    # Создание сканера и запуск тестирования
+    try:
+        Scanner.from_config(config).run()
+    except ConfigError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    except KeyboardInterrupt:
+        logger.warning("\n\nТестирование прервано пользователем")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"\n\nКритическая ошибка: {e}")
+        sys.exit(1)
+    
+    logger.info("\nТестирование завершено успешно!")
+
+
+if __name__ == "__main__":
+    main()
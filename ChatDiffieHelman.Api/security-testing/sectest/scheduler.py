@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Scan Scheduler - Планировщик заданий SQLMap по техникам
+Time-based техника (T) выполняется отдельной полосой с низкой параллельностью
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TIME_BASED_TECHNIQUE = 'T'
+
+LANE_FAST = 'fast'
+LANE_TIME = 'time'
+
+
+def split_techniques(techniques: str) -> Tuple[str, str]:
+    """Разделение техник SQLMap: (B/E/U/S/Q, T)"""
+    techniques = techniques.upper()
+    fast = ''.join(t for t in techniques if t != TIME_BASED_TECHNIQUE)
+    time_based = TIME_BASED_TECHNIQUE if TIME_BASED_TECHNIQUE in techniques else ''
+    return fast, time_based
+
+
+def make_batches(jobs: List[Dict], size: int) -> List[List[Dict]]:
+    """Пакеты до size заданий для одного процесса SQLMap
+
+    Задания с одинаковым URL (GET и POST /messages/{chatId}) расходятся по
+    разным пакетам: повторный URL SQLMap из лога целей отбрасывает.
+    """
+    batches: List[List[Dict]] = []
+    for job in jobs:
+        for batch in batches:
+            if len(batch) < size and all(other['url'] != job['url'] for other in batch):
+                batch.append(job)
+                break
+        else:
+            batches.append([job])
+    return batches
+
+
+class LaneScheduler:
+    """Двухполосный планировщик заданий
+
+    Полоса fast: техники B/E/U/S/Q всех эндпоинтов, fast_workers заданий одновременно.
+    Полоса time: техника T, запускается после fast и паузы quiet_period секунд
+    (API успевает разгрузиться), time_workers заданий одновременно.
+    С batch_runner и batch_size > 1 задания полосы идут пакетами: один
+    процесс SQLMap на пакет, воркеры полосы выполняют пакеты параллельно.
+    С between_groups и group_size > 0 задания (пакеты) полосы идут группами
+    по group_size: следующая группа стартует после завершения предыдущей и
+    вызова between_groups (например, восстановления базы из снимка).
+    """
+
+    def __init__(self, runner: Callable[..., Dict], fast_workers: int = 1,
+                 time_workers: int = 1, quiet_period: float = 0.0, isolate_time_based: bool = True,
+                 batch_runner: Optional[Callable[[List[Dict]], List[Dict]]] = None, batch_size: int = 1,
+                 between_groups: Optional[Callable[[], None]] = None, group_size: int = 0):
+        self.runner = runner
+        self.batch_runner = batch_runner
+        self.batch_size = max(1, batch_size) if batch_runner is not None else 1
+        self.between_groups = between_groups
+        self.group_size = max(0, group_size) if between_groups is not None else 0
+        self.fast_workers = max(1, fast_workers)
+        self.time_workers = max(1, time_workers)
+        self.quiet_period = max(0.0, quiet_period)
+        self.isolate_time_based = isolate_time_based
+
+    def plan(self, jobs: List[Dict], techniques: str) -> Tuple[List[Dict], List[Dict]]:
+        """Разбиение заданий эндпоинтов на задания полос fast и time"""
+        fast, time_based = split_techniques(techniques)
+        if not self.isolate_time_based or not fast or not time_based:
+            # Разделять нечего: одна полоса со всеми техниками
+            return [dict(job, technique=techniques.upper(), lane=LANE_FAST) for job in jobs], []
+
+        fast_jobs = [dict(job, technique=fast, lane=LANE_FAST) for job in jobs]
+        time_jobs = [dict(job, technique=time_based, lane=LANE_TIME) for job in jobs]
+        return fast_jobs, time_jobs
+
+    def _run_groups(self, items: List, worker: Callable, workers: int) -> List:
+        """Задания (пакеты) группами по group_size с between_groups между группами"""
+        size = self.group_size or len(items) or 1
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(items), size):
+                if start:
+                    self.between_groups()
+                results.extend(executor.map(worker, items[start:start + size]))
+        return results
+
+    def _run_lane(self, lane: str, jobs: List[Dict], workers: int) -> List[Dict]:
+        groups = f", группами по {self.group_size}" if self.group_size else ''
+        if self.batch_size > 1:
+            batches = make_batches(jobs, self.batch_size)
+            logger.info(f"Полоса {lane}: {len(jobs)} заданий в {len(batches)} пакетах, параллельно {workers}{groups}")
+            return [result for results in self._run_groups(batches, self.batch_runner, workers) for result in results]
+
+        logger.info(f"Полоса {lane}: {len(jobs)} заданий, параллельно {workers}{groups}")
+        return self._run_groups(jobs, lambda job: self.runner(**job), workers)
+
+    def run(self, jobs: List[Dict], techniques: str) -> List[Dict]:
+        fast_jobs, time_jobs = self.plan(jobs, techniques)
+        results = self._run_lane(LANE_FAST, fast_jobs, self.fast_workers) if fast_jobs else []
+
+        if time_jobs:
+            if fast_jobs and self.group_size:
+                self.between_groups()
+            if fast_jobs and self.quiet_period > 0:
+                logger.info(f"Пауза {self.quiet_period:g} с перед time-based полосой")
+                time.sleep(self.quiet_period)
+            results += self._run_lane(LANE_TIME, time_jobs, self.time_workers)
+
+        return results
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Socket.IO Client - Минимальный asyncio клиент Socket.IO v5 (Engine.IO v4) поверх WebSocket
+Без внешних зависимостей: тысячи соединений из одного процесса для нагрузочных тестов шлюзов
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import ssl
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Коды кадров WebSocket
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+# Пакеты Engine.IO
+EIO_OPEN, EIO_CLOSE, EIO_PING, EIO_PONG, EIO_MESSAGE, EIO_NOOP = '0', '1', '2', '3', '4', '6'
+
+# Пакеты Socket.IO (внутри сообщения Engine.IO)
+SIO_CONNECT, SIO_DISCONNECT, SIO_EVENT, SIO_ACK, SIO_CONNECT_ERROR = '0', '1', '2', '3', '4'
+
+
+class SocketIOError(Exception):
+    """Ошибка рукопожатия, отказ namespace или разрыв соединения"""
+
+
+def mask_payload(payload: bytes, mask: bytes) -> bytes:
+    """XOR с маской клиента одной операцией над целыми числами"""
+    if not payload:
+        return payload
+    length = len(payload)
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+
+
+def encode_frame(opcode: int, payload: bytes) -> bytes:
+    mask = os.urandom(4)
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, 0x80 | length))
+    elif length < 1 << 16:
+        header = bytes((0x80 | opcode, 0x80 | 126)) + length.to_bytes(2, 'big')
+    else:
+        header = bytes((0x80 | opcode, 0x80 | 127)) + length.to_bytes(8, 'big')
+    return header + mask + mask_payload(payload, mask)
+
+
+def encode_packet(packet_type: str, namespace: str = '/', data=None) -> str:
+    """Пакет Socket.IO: <тип>[<namespace>,][<json>]"""
+    text = packet_type
+    if namespace != '/':
+        text += namespace + ','
+    if data is not None:
+        text += json.dumps(data, separators=(',', ':'))
+    return text
+
+
+def decode_packet(text: str) -> Tuple[str, str, object]:
+    """(тип, namespace, данные) пакета Socket.IO"""
+    packet_type, rest = text[0], text[1:]
+    namespace = '/'
+    if rest.startswith('/'):
+        namespace, _, rest = rest.partition(',')
+    # Идентификатор подтверждения (ack) перед данными не используется
+    index = 0
+    while index < len(rest) and rest[index].isdigit():
+        index += 1
+    rest = rest[index:]
+    return packet_type, namespace, json.loads(rest) if rest else None
+
+
+class SocketIOClient:
+    """Одно соединение Engine.IO (WebSocket) с одним или несколькими namespace
+
+    Токен передается и в заголовке Authorization рукопожатия, и в
+    handshake.auth.token каждого namespace - шлюзы API принимают любой из них.
+    Обработчики событий - обычные функции, вызываются из цикла чтения.
+    """
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 10.0,
+                 path: str = '/socket.io/'):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+        self.path = path
+        self.sid = None
+        self.connected = False
+        self.ping_interval = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._handlers: Dict[Tuple[str, str], List[Callable]] = {}
+        self._namespaces: Dict[str, asyncio.Future] = {}
+        self._receive_task: Optional[asyncio.Task] = None
+
+    def on(self, event: str, handler: Callable, namespace: str = '/'):
+        """Обработчик события; '*' - все события namespace, обработчик получает (event, *args)"""
+        self._handlers.setdefault((namespace, event), []).append(handler)
+
+    async def connect(self, namespaces: Iterable[str] = ('/',)):
+        await asyncio.wait_for(self._handshake(), self.timeout)
+        self._receive_task = asyncio.create_task(self._receive_loop())
+        loop = asyncio.get_running_loop()
+        auth = {'token': self.token} if self.token else None
+        for namespace in namespaces:
+            self._namespaces[namespace] = loop.create_future()
+            self._send_text(EIO_MESSAGE + encode_packet(SIO_CONNECT, namespace, auth))
+        await self._writer.drain()
+        await asyncio.wait_for(asyncio.gather(*self._namespaces.values()), self.timeout)
+        self.connected = True
+
+    async def _handshake(self):
+        parts = urlsplit(self.url)
+        secure = parts.scheme in ('https', 'wss')
+        port = parts.port or (443 if secure else 80)
+        self._reader, self._writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=ssl.create_default_context() if secure else None
+        )
+
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        headers = {
+            'Host': parts.netloc,
+            'Upgrade': 'websocket',
+            'Connection': 'Upgrade',
+            'Sec-WebSocket-Key': key,
+            'Sec-WebSocket-Version': '13',
+        }
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        request = f"GET {self.path}?EIO=4&transport=websocket HTTP/1.1\r\n"
+        request += ''.join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+        self._writer.write(request.encode('latin-1'))
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        response_headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        if b' 101 ' not in status_line:
+            raise SocketIOError(f"рукопожатие WebSocket отклонено: {status_line.decode('latin-1').strip()}")
+        expected = base64.b64encode(hashlib.sha1((key + WS_GUID).encode('ascii')).digest()).decode('ascii')
+        if response_headers.get('sec-websocket-accept') != expected:
+            raise SocketIOError("неверный Sec-WebSocket-Accept")
+
+        # Первый пакет Engine.IO - open с sid и интервалами ping
+        opcode, payload = await self._read_frame()
+        text = payload.decode('utf-8')
+        if not text.startswith(EIO_OPEN):
+            raise SocketIOError(f"ожидался пакет open Engine.IO: {text[:50]!r}")
+        info = json.loads(text[1:])
+        self.sid = info.get('sid')
+        self.ping_interval = info.get('pingInterval')
+
+    def _send_text(self, text: str):
+        self._writer.write(encode_frame(OP_TEXT, text.encode('utf-8')))
+
+    async def emit(self, event: str, data=None, namespace: str = '/'):
+        args = [event] if data is None else [event, data]
+        self._send_text(EIO_MESSAGE + encode_packet(SIO_EVENT, namespace, args))
+        await self._writer.drain()
+
+    async def _read_frame(self) -> Tuple[int, bytes]:
+        """Кадр целиком (фрагменты склеиваются); управляющие кадры возвращаются как есть"""
+        message_opcode, chunks = None, []
+        while True:
+            head = await self._reader.readexactly(2)
+            fin, opcode = head[0] & 0x80, head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = int.from_bytes(await self._reader.readexactly(2), 'big')
+            elif length == 127:
+                length = int.from_bytes(await self._reader.readexactly(8), 'big')
+            if head[1] & 0x80:
+                mask = await self._reader.readexactly(4)
+                payload = mask_payload(await self._reader.readexactly(length), mask)
+            else:
+                payload = await self._reader.readexactly(length)
+            if opcode >= OP_CLOSE:
+                return opcode, payload
+            if opcode != OP_CONTINUATION:
+                message_opcode = opcode
+            chunks.append(payload)
+            if fin:
+                return message_opcode, b''.join(chunks)
+
+    async def _receive_loop(self):
+        try:
+            while True:
+                opcode, payload = await self._read_frame()
+                if opcode == OP_PING:
+                    self._writer.write(encode_frame(OP_PONG, payload))
+                    continue
+                if opcode == OP_CLOSE:
+                    break
+                if opcode != OP_TEXT or not payload:
+                    continue
+                text = payload.decode('utf-8')
+                if text[0] == EIO_PING:
+                    self._send_text(EIO_PONG)
+                elif text[0] == EIO_MESSAGE:
+                    self._dispatch(text[1:])
+                elif text[0] == EIO_CLOSE:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            self.connected = False
+            for future in self._namespaces.values():
+                if not future.done():
+                    future.set_exception(SocketIOError("соединение закрыто до подключения namespace"))
+            for namespace in self._namespaces:
+                self._fire(namespace, 'disconnect', [])
+
+    def _dispatch(self, text: str):
+        packet_type, namespace, data = decode_packet(text)
+        if packet_type == SIO_EVENT and isinstance(data, list) and data:
+            self._fire(namespace, data[0], data[1:])
+        elif packet_type in (SIO_CONNECT, SIO_CONNECT_ERROR):
+            future = self._namespaces.get(namespace)
+            if future is not None and not future.done():
+                if packet_type == SIO_CONNECT:
+                    future.set_result(data)
+                else:
+                    message = data.get('message') if isinstance(data, dict) else data
+                    future.set_exception(SocketIOError(f"namespace {namespace}: {message}"))
+        elif packet_type == SIO_DISCONNECT:
+            self._fire(namespace, 'disconnect', [])
+
+    def _fire(self, namespace: str, event: str, args: list):
+        for handler in self._handlers.get((namespace, event), ()):
+            handler(*args)
+        for handler in self._handlers.get((namespace, '*'), ()):
+            handler(event, *args)
+
+    async def close(self):
+        if self._writer is None:
+            return
+        try:
+            self._send_text(EIO_CLOSE)
+            self._writer.write(encode_frame(OP_CLOSE, (1000).to_bytes(2, 'big')))
+            await self._writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        self._writer.close()
+        if self._receive_task is not None:
+            self._receive_task.cancel()
+            try:
+                await self._receive_task
+            except asyncio.CancelledError:
+                pass
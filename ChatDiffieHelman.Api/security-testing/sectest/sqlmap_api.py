@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+SQLMap API - Пул локальных серверов sqlmapapi как исполнитель заданий
+Задания уходят в REST API серверов (/task/new, /scan/<id>/start), статус
+опрашивается по постоянным соединениям, находки - структурно из /scan/<id>/data
+"""
+
+import base64
+import http.client
+import json
+import logging
+import os
+import secrets
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Тип записи в /scan/<id>/data (lib/core/enums.py: CONTENT_TYPE)
+CONTENT_TYPE_TECHNIQUES = 1
+
+# Техника SQLMap: номер (PAYLOAD.TECHNIQUE) и название -> буква --technique
+TECHNIQUES = {
+    1: ('B', 'boolean-based blind'),
+    2: ('E', 'error-based'),
+    3: ('Q', 'inline query'),
+    4: ('S', 'stacked queries'),
+    5: ('T', 'time-based blind'),
+    6: ('U', 'UNION query'),
+}
+TECHNIQUE_LETTERS = {name: letter for letter, name in TECHNIQUES.values()}
+
+
+class SqlmapApiError(Exception):
+    """Сервер sqlmapapi недоступен или отклонил запрос"""
+
+
+def api_command(sqlmap_cmd: Union[str, List[str]]) -> List[str]:
+    """Команда sqlmapapi рядом с найденной командой SQLMap
+
+    "sqlmap" -> "sqlmapapi" из PATH, ["python3", ".../sqlmap.py"] ->
+    ["python3", ".../sqlmapapi.py"] (каталог с исходниками тоже подходит).
+    """
+    if isinstance(sqlmap_cmd, str):
+        return [shutil.which('sqlmapapi') or 'sqlmapapi']
+    cmd = list(sqlmap_cmd)
+    script = cmd[-1]
+    if os.path.isdir(script):
+        cmd[-1] = os.path.join(script, 'sqlmapapi.py')
+    else:
+        cmd[-1] = os.path.join(os.path.dirname(script), 'sqlmapapi.py')
+    return cmd
+
+
+def free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def technique_letter(technique: Union[int, str]) -> str:
+    if str(technique).isdigit():
+        return TECHNIQUES.get(int(technique), ('?', ''))[0]
+    return TECHNIQUE_LETTERS.get(technique, '?')
+
+
+def technique_entries(injection: Dict) -> List[Dict]:
+    """Техники инъекции: словарь по номеру (старые версии) или список с названиями"""
+    data = injection.get('data') or {}
+    if isinstance(data, dict):
+        return [dict(details, technique=TECHNIQUES.get(int(key), ('', key))[1])
+                for key, details in sorted(data.items(), key=lambda item: int(item[0]))]
+    return list(data)
+
+
+def injections(data: List[Dict]) -> List[Dict]:
+    """Инъекции из /scan/<id>/data в виде строк CSV результатов пакетного режима"""
+    found = []
+    for entry in data:
+        if entry.get('type') != CONTENT_TYPE_TECHNIQUES:
+            continue
+        for injection in entry.get('value') or []:
+            entries = technique_entries(injection)
+            found.append({
+                "place": injection.get('place', ''),
+                "parameter": injection.get('parameter', ''),
+                "techniques": ''.join(technique_letter(e.get('technique', '')) for e in entries),
+                "note": ', '.join(injection.get('notes') or []),
+            })
+    return found
+
+
+def findings_text(data: List[Dict]) -> List[str]:
+    """Блок найденных инъекций в формате консоли SQLMap - для индекса находок лога"""
+    lines = []
+    for entry in data:
+        if entry.get('type') != CONTENT_TYPE_TECHNIQUES or not entry.get('value'):
+            continue
+        lines.append("sqlmap identified the following injection point(s):\n")
+        lines.append("---\n")
+        for injection in entry['value']:
+            lines.append(f"Parameter: {injection.get('parameter', '')} ({injection.get('place', '')})\n")
+            for details in technique_entries(injection):
+                lines.append(f"    Type: {details.get('technique', '')}\n")
+                lines.append(f"    Title: {details.get('title', '')}\n")
+                lines.append(f"    Payload: {details.get('payload', '')}\n")
+                lines.append("\n")
+        if lines[-1] == "\n":
+            lines.pop()
+        lines.append("---\n")
+    return lines
+
+
+def log_lines(log: List[Dict]) -> List[str]:
+    """Сообщения /scan/<id>/log в формате консоли SQLMap: [время] [уровень] текст"""
+    return [f"[{entry.get('time', '')}] [{entry.get('level', '')}] {entry.get('message', '')}\n" for entry in log]
+
+
+class SqlmapApiServer:
+    """Один процесс sqlmapapi -s на локальном порту
+
+    Соединение с сервером у каждого потока свое и переиспользуется между
+    запросами (опрос статуса не открывает соединение каждый раз). Адаптер
+    wsgiref закрывает соединение после ответа - тогда http.client молча
+    открывает новое, keep-alive работает с адаптерами tornado, waitress и т.п.
+    Новые версии sqlmapapi требуют Basic-аутентификацию - логин и пароль
+    генерируются на каждый запуск сервера.
+    """
+
+    def __init__(self, cmd: List[str], host: str = '127.0.0.1', adapter: str = '',
+                 startup_timeout: float = 30.0, timeout: float = 30.0):
+        self.cmd = cmd
+        self.host = host
+        self.adapter = adapter
+        self.startup_timeout = startup_timeout
+        self.timeout = timeout
+        self.port = None
+        self.active = 0            # Заданий в работе - для балансировки пула
+        self.process = None
+        self._auth = ''
+        self._local = threading.local()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'SqlmapApiServer':
+        self.port = free_port(self.host)
+        username, password = 'sectest', secrets.token_urlsafe(16)
+        self._auth = base64.b64encode(f"{username}:{password}".encode('utf-8')).decode('ascii')
+        cmd = self.cmd + ['-s', '-H', self.host, '-p', str(self.port), '--username', username, '--password', password]
+        if self.adapter:
+            cmd += ['--adapter', self.adapter]
+        # Движок задания sqlmapapi ищет sqlmap.py в рабочем каталоге
+        script = self.cmd[-1]
+        cwd = os.path.dirname(os.path.abspath(script)) if os.path.isfile(script) else None
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=cwd)
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise SqlmapApiError(f"sqlmapapi завершился при запуске (код {self.process.returncode}): {' '.join(self.cmd)}")
+            try:
+                self.call('GET', '/version')
+                return self
+            except SqlmapApiError:
+                # /version есть не во всех версиях: любой ответ API значит, что сервер поднят
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise SqlmapApiError(f"sqlmapapi не ответил за {self.startup_timeout:g} с: {' '.join(self.cmd)}")
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or conn.port != self.port:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def call(self, method: str, path: str, body: Optional[Dict] = None) -> Dict:
+        """Запрос к API; SqlmapApiError, если сервер ответил success: false"""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Authorization': f"Basic {self._auth}"}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                # Сервер закрыл простаивавшее соединение - один повтор по новому
+                if attempt or not isinstance(e, (ConnectionResetError, BrokenPipeError)):
+                    raise
+        try:
+            result = json.loads(payload.decode('utf-8'))
+        except ValueError as e:
+            raise SqlmapApiError(f"{method} {path}: ответ не JSON ({response.status})") from e
+        if not result.get('success', False):
+            raise SqlmapApiError(f"{method} {path}: {result.get('message', response.status)}")
+        return result
+
+
+class SqlmapApiPool:
+    """Пул серверов sqlmapapi: задание уходит на наименее загруженный сервер
+
+    Упавший сервер перезапускается при следующем выборе. Задание - задача
+    sqlmapapi от /task/new до /task/<id>/delete.
+    """
+
+    def __init__(self, cmd: List[str], size: int = 2, host: str = '127.0.0.1',
+                 adapter: str = '', poll_interval: float = 1.0):
+        self.servers = [SqlmapApiServer(cmd, host=host, adapter=adapter) for _ in range(max(1, size))]
+        self.poll_interval = max(0.1, poll_interval)
+        self._lock = threading.Lock()
+
+    def start(self) -> 'SqlmapApiPool':
+        for server in self.servers:
+            server.start()
+            logger.info(f"sqlmapapi запущен: {server.url}")
+        return self
+
+    def stop(self):
+        for server in self.servers:
+            server.stop()
+
+    def __enter__(self) -> 'SqlmapApiPool':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @contextmanager
+    def acquire(self):
+        with self._lock:
+            server = min(self.servers, key=lambda s: s.active)
+            if not server.alive():
+                logger.warning(f"sqlmapapi {server.url} завершился, перезапуск")
+                server.start()
+            server.active += 1
+        try:
+            yield server
+        finally:
+            with self._lock:
+                server.active -= 1
+
+    def scan(self, options: Dict, timeout: float) -> Dict:
+        """Задание на сервере пула: запуск, опрос статуса до завершения, данные и лог
+
+        По таймауту задача останавливается (/scan/<id>/kill), собранные
+        к этому моменту данные и лог возвращаются с timed_out.
+        """
+        with self.acquire() as server:
+            taskid = server.call('GET', '/task/new')['taskid']
+            try:
+                server.call('POST', f'/scan/{taskid}/start', options)
+                deadline = time.monotonic() + timeout
+                timed_out = False
+                while True:
+                    status = server.call('GET', f'/scan/{taskid}/status')
+                    if status['status'] == 'terminated':
+                        break
+                    if time.monotonic() >= deadline:
+                        server.call('GET', f'/scan/{taskid}/kill')
+                        timed_out = True
+                        break
+                    time.sleep(self.poll_interval)
+                data = server.call('GET', f'/scan/{taskid}/data')
+                log = server.call('GET', f'/scan/{taskid}/log')
+            finally:
+                try:
+                    server.call('GET', f'/task/{taskid}/delete')
+                except (SqlmapApiError, OSError) as e:
+                    logger.warning(f"Задача {taskid} на {server.url} не удалена: {e}")
+        return {
+            "server": server.url,
+            "taskid": taskid,
+            "returncode": status.get('returncode'),
+            "timed_out": timed_out,
+            "data": data.get('data') or [],
+            "errors": data.get('error') or [],
+            "log": log.get('log') or [],
+        }
